@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Habitacion, Reserva, PerfilUsuario
+from .models import Habitacion, Reserva, PerfilUsuario, ImportacionReserva
 
 # Register your models here.
 @admin.register(Habitacion)
@@ -21,3 +21,10 @@ class PerfilUsuarioAdmin(admin.ModelAdmin):
     list_filter = ['rol', 'turno', 'activo', 'fecha_creacion']
     search_fields = ['usuario__username', 'usuario__first_name', 'usuario__last_name']
     readonly_fields = ['fecha_creacion']
+
+@admin.register(ImportacionReserva)
+class ImportacionReservaAdmin(admin.ModelAdmin):
+    list_display = ['nombre_archivo', 'estado', 'procesadas', 'creadas', 'errores', 'usuario', 'fecha_creacion']
+    list_filter = ['estado', 'formato', 'fecha_creacion']
+    search_fields = ['nombre_archivo', 'usuario__username']
+    readonly_fields = ['fecha_creacion', 'fecha_inicio', 'fecha_fin', 'resultado']
@@ -8,11 +8,13 @@ from .api_views import (
     EstadisticasView,
     EstadisticasKpiView,
     DashboardView,
+    CacheRespuestasView,
     AuthView,
     CsrfTokenView,
     FixAdminView,
     UsuarioViewSet,
     PlanningViewSet,
+    ImportacionReservaViewSet,
 )
 
 
@@ -39,6 +41,9 @@ router.register(r"reservas", ReservaViewSet, basename="reservas")
 router.register(r"perfiles", PerfilUsuarioViewSet)
 router.register(r"usuarios", UsuarioViewSet)
 router.register(r"planning", PlanningViewSet, basename="planning")
+router.register(
+    r"importaciones", ImportacionReservaViewSet, basename="importaciones"
+)
 
 # URLs de la API
 urlpatterns = [
@@ -57,6 +62,11 @@ urlpatterns = [
         EstadisticasKpiView.as_view(),
         name="api_estadisticas_kpis",
     ),
+    path(
+        "estadisticas/cache/",
+        CacheRespuestasView.as_view(),
+        name="api_estadisticas_cache",
+    ),
     path("dashboard/", DashboardView.as_view(), name="api_dashboard"),
     # Endpoints adicionales
     path(
@@ -64,6 +74,11 @@ urlpatterns = [
         HabitacionViewSet.as_view({"get": "disponibles"}),
         name="api_habitaciones_disponibles",
     ),
+    path(
+        "habitaciones/disponibles-lote/",
+        HabitacionViewSet.as_view({"post": "disponibles_lote"}),
+        name="api_habitaciones_disponibles_lote",
+    ),
     path(
         "habitaciones/ocupadas/",
         HabitacionViewSet.as_view({"get": "ocupadas"}),
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.negotiation import DefaultContentNegotiation
 from django.contrib.auth import authenticate, login, logout
 from django.db.models import Q, Sum, Count
 from django.db import transaction
@@ -11,7 +12,7 @@ from datetime import date, timedelta, datetime
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.middleware.csrf import get_token
-from .models import Reserva, Habitacion, PerfilUsuario
+from .models import Reserva, Habitacion, PerfilUsuario, ImportacionReserva
 from .serializers import (
     ReservaSerializer,
     HabitacionSerializer,
@@ -22,27 +23,47 @@ from .serializers import (
     HabitacionListSerializer,
     EstadisticasSerializer,
     KpiRangoSerializer,
+    KpiIntervaloSerializer,
     ReservaCreateSerializer,
     UsuarioListSerializer,
+    ImportacionReservaSerializer,
+)
+from .cache_respuestas import contadores, respuesta_cacheada
+from .campos import CamposParcialesMixin, optimizar_queryset
+from .condicional import RespuestaCondicionalMixin
+from .disponibilidad import IndiceDisponibilidad, indice_disponibilidad
+from .estado_habitaciones import estado_habitacion, habitaciones_con_estado
+from .exportacion_vouchers import (
+    FORMATOS,
+    PDF_COMBINADO_DISPONIBLE,
+    exportar_vouchers,
+    reservas_para_exportar,
+)
+from .filas import DEFINICIONES, serializar_filas
+from .importacion import XLSX_DISPONIBLE, parse_bool, parse_number
+from .kpis import (
+    GRANULARIDADES,
+    MAX_PUNTOS_SERIE,
+    calcular_kpis,
+    cantidad_intervalos,
+    serie_kpis,
+)
+from .limpieza import MAX_DIAS_LIMPIEZA, reporte_limpieza
+from .paginacion import ReservaCursorPagination, filtrar_reservas, usa_cursor
+from .tareas_importacion import crear_importacion, encolar_importacion
+from .vouchers import voucher_multi_pdf, voucher_pdf
+from .planning import (
+    DIAS_PLANNING,
+    MAX_DIAS_PLANNING,
+    construir_planning,
+    construir_planning_runs,
 )
-import csv
 import os
-import io
-from typing import Any, Dict, List
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, Http404, StreamingHttpResponse
 from django.conf import settings
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.utils import ImageReader
 
-try:
-    from openpyxl import load_workbook
-except Exception:  # pragma: no cover
-    load_workbook = None
+# Límite de búsquedas por llamada en habitaciones/disponibles-lote
+MAX_CONSULTAS_LOTE = 50
 
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
@@ -203,7 +224,9 @@ class FixAdminView(APIView):
         )
 
 
-class HabitacionViewSet(viewsets.ModelViewSet):
+class HabitacionViewSet(
+    CamposParcialesMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet
+):
     """ViewSet para el modelo Habitacion"""
 
     # Orden estable para evitar que elementos "desaparezcan" de la primera página al editar
@@ -274,8 +297,9 @@ class HabitacionViewSet(viewsets.ModelViewSet):
         fecha_egreso_str = request.query_params.get("fecha_egreso")
         personas_str = request.query_params.get("personas")
 
-        # Base queryset
-        habitaciones = Habitacion.objects.all()
+        personas = None
+        fecha_ingreso = None
+        fecha_egreso = None
 
         # Filtrar por capacidad via tipo según cantidad de personas
         if personas_str:
@@ -287,18 +311,6 @@ class HabitacionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Mapeo personas -> tipos permitidos (sugerir iguales o más grandes, nunca más chicas)
-            if personas <= 2:
-                tipos_filtrados = ["doble", "triple", "cuadruple", "quintuple"]
-            elif personas == 3:
-                tipos_filtrados = ["triple", "cuadruple", "quintuple"]
-            elif personas == 4:
-                tipos_filtrados = ["cuadruple", "quintuple"]
-            else:
-                tipos_filtrados = ["quintuple"]
-
-            habitaciones = habitaciones.filter(tipo__in=tipos_filtrados)
-
         # Filtrar por disponibilidad en rango
         if fecha_ingreso_str and fecha_egreso_str:
             try:
@@ -316,25 +328,109 @@ class HabitacionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Excluir habitaciones con solapamiento en el rango
-            habitaciones_ocupadas_ids = (
-                Reserva.objects.filter(
-                    fecha_ingreso__lt=fecha_egreso,
-                    fecha_egreso__gt=fecha_ingreso,
-                )
-                .values_list("nhabitacion_id", flat=True)
-                .distinct()
-            )
-            habitaciones = habitaciones.exclude(id__in=habitaciones_ocupadas_ids)
+        # Resolver con el índice en memoria (sin consultas si está vigente)
+        habitaciones = indice_disponibilidad.disponibles(
+            fecha_ingreso, fecha_egreso, personas
+        )
 
         serializer = self.get_serializer(habitaciones, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["post"], url_path="disponibles-lote")
+    def disponibles_lote(self, request):
+        """Resolver varias búsquedas de disponibilidad en una sola llamada.
+
+        Body: {"consultas": [{"fecha_ingreso", "fecha_egreso", "personas"}, ...]}
+        (también se acepta la lista directamente). personas es opcional.
+
+        Carga una sola vez las reservas que cubren la unión de los rangos y
+        responde cada consulta desde esa carga.
+        """
+        consultas = request.data
+        if isinstance(consultas, dict):
+            consultas = consultas.get("consultas")
+        if not isinstance(consultas, list) or len(consultas) == 0:
+            return Response(
+                {"error": "Se requiere una lista de consultas"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(consultas) > MAX_CONSULTAS_LOTE:
+            return Response(
+                {"error": f"Máximo {MAX_CONSULTAS_LOTE} consultas por llamada"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        normalizadas = []
+        for idx, consulta in enumerate(consultas):
+            try:
+                fecha_ingreso = datetime.strptime(
+                    str(consulta.get("fecha_ingreso")), "%Y-%m-%d"
+                ).date()
+                fecha_egreso = datetime.strptime(
+                    str(consulta.get("fecha_egreso")), "%Y-%m-%d"
+                ).date()
+            except (AttributeError, ValueError):
+                return Response(
+                    {"error": "Formato de fecha inválido (YYYY-MM-DD)", "index": idx},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if fecha_ingreso >= fecha_egreso:
+                return Response(
+                    {
+                        "error": "fecha_ingreso debe ser anterior a fecha_egreso",
+                        "index": idx,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            personas = consulta.get("personas")
+            if personas not in (None, ""):
+                try:
+                    personas = int(personas)
+                except (TypeError, ValueError):
+                    return Response(
+                        {
+                            "error": "El parámetro personas debe ser numérico",
+                            "index": idx,
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+            else:
+                personas = None
+            normalizadas.append((fecha_ingreso, fecha_egreso, personas))
+
+        # Una sola carga: habitaciones + reservas que tocan la unión de rangos
+        desde = min(c[0] for c in normalizadas)
+        hasta = max(c[1] for c in normalizadas)
+        reservas = Reserva.objects.filter(
+            fecha_ingreso__lt=hasta, fecha_egreso__gt=desde
+        ).values_list("nhabitacion_id", "fecha_ingreso", "fecha_egreso", "id")
+        indice = IndiceDisponibilidad.desde_datos(
+            Habitacion.objects.all().order_by("id"), reservas
+        )
+
+        serializadas = {}
+        resultados = []
+        for fecha_ingreso, fecha_egreso, personas in normalizadas:
+            habitaciones = indice.disponibles(fecha_ingreso, fecha_egreso, personas)
+            for habitacion in habitaciones:
+                if habitacion.id not in serializadas:
+                    serializadas[habitacion.id] = HabitacionSerializer(habitacion).data
+            resultados.append(
+                {
+                    "fecha_ingreso": fecha_ingreso.isoformat(),
+                    "fecha_egreso": fecha_egreso.isoformat(),
+                    "personas": personas,
+                    "habitaciones": [serializadas[h.id] for h in habitaciones],
+                }
+            )
+
+        return Response({"resultados": resultados})
+
     @action(detail=False, methods=["get"])
     def ocupadas(self, request):
         """Obtener habitaciones ocupadas"""
         # Por ahora retornamos todas las habitaciones ya que no hay campo estado
-        habitaciones = Habitacion.objects.all()
+        habitaciones = self.reducir_queryset(Habitacion.objects.all())
         serializer = self.get_serializer(habitaciones, many=True)
         return Response(serializer.data)
 
@@ -346,12 +442,15 @@ class HabitacionViewSet(viewsets.ModelViewSet):
             habitaciones = Habitacion.objects.filter(tipo=tipo)
         else:
             habitaciones = Habitacion.objects.all()
+        habitaciones = self.reducir_queryset(habitaciones)
 
         serializer = self.get_serializer(habitaciones, many=True)
         return Response(serializer.data)
 
 
-class ReservaViewSet(viewsets.ModelViewSet):
+class ReservaViewSet(
+    CamposParcialesMixin, RespuestaCondicionalMixin, viewsets.ModelViewSet
+):
     """ViewSet para el modelo Reserva"""
 
     queryset = Reserva.objects.all().order_by("-id")
@@ -370,6 +469,39 @@ class ReservaViewSet(viewsets.ModelViewSet):
             return ReservaCreateSerializer
         return ReservaSerializer
 
+    @property
+    def paginator(self):
+        """PageNumberPagination por defecto; por cursor con ?paginacion=cursor"""
+        if not hasattr(self, "_paginator"):
+            if usa_cursor(self.request):
+                self._paginator = ReservaCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        """Listado paginado con filtros (ver paginacion.py)"""
+        try:
+            queryset = filtrar_reservas(
+                self.filter_queryset(self.get_queryset().select_related("nhabitacion")),
+                request.query_params,
+            )
+            page = self.paginate_queryset(queryset)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def _filas(self, queryset, serializer_class=None):
+        """Serialización rápida desde .values() (ver filas.py), con los
+        campos de ?fields= / ?exclude="""
+        campos, excluir = self._campos_pedidos()
+        definicion = DEFINICIONES[serializer_class or self.get_serializer_class()]
+        return serializar_filas(queryset, definicion, campos or None, excluir)
+
     def update(self, request, *args, **kwargs):
         """Actualizar reserva - solo supervisores"""
         if not self._is_supervisor(request.user):
@@ -437,8 +569,8 @@ class ReservaViewSet(viewsets.ModelViewSet):
                 )
 
             # Prorrateo de montos y seña
-            total_monto = self._parse_number(request.data.get("monto_total"))
-            total_senia = self._parse_number(request.data.get("senia"))
+            total_monto = parse_number(request.data.get("monto_total"))
+            total_senia = parse_number(request.data.get("senia"))
             n_items = len(dedup_items)
             base_monto = round((total_monto or 0.0) / n_items, 2)
             base_senia = round((total_senia or 0.0) / n_items, 2)
@@ -517,8 +649,8 @@ class ReservaViewSet(viewsets.ModelViewSet):
             created_reservas = []
             errors = []
             # Prorrateo de montos y seña
-            total_monto = self._parse_number(request.data.get("monto_total"))
-            total_senia = self._parse_number(request.data.get("senia"))
+            total_monto = parse_number(request.data.get("monto_total"))
+            total_senia = parse_number(request.data.get("senia"))
             n_items = len(habitacion_ids)
             base_monto = round((total_monto or 0.0) / n_items, 2)
             base_senia = round((total_senia or 0.0) / n_items, 2)
@@ -594,156 +726,10 @@ class ReservaViewSet(viewsets.ModelViewSet):
         if not reservas:
             raise Http404("Reservas no encontradas")
 
-        # Preparar respuesta PDF
-        response = HttpResponse(content_type="application/pdf")
-        filename = (
-            f"voucher_reserva_multi_{','.join([str(r.id) for r in reservas])}.pdf"
-        )
+        pdf = voucher_multi_pdf(reservas)
+        response = HttpResponse(pdf, content_type="application/pdf")
+        filename = f"voucher_reserva_multi_{','.join(str(r.id) for r in reservas)}.pdf"
         response["Content-Disposition"] = f'inline; filename="{filename}"'
-
-        doc = SimpleDocTemplate(
-            response,
-            pagesize=A4,
-            leftMargin=18 * mm,
-            rightMargin=18 * mm,
-            topMargin=18 * mm,
-            bottomMargin=18 * mm,
-        )
-        styles = getSampleStyleSheet()
-        elements = []
-
-        titulo = Paragraph(
-            "<para align='center'><b>Voucher de Reserva</b></para>",
-            styles["Title"],
-        )
-        subtitulo = Paragraph(
-            f"<para align='center'>Reservas: {', '.join([str(r.id) for r in reservas])}</para>",
-            styles["Normal"],
-        )
-        elements.extend([titulo, Spacer(1, 6), subtitulo, Spacer(1, 12)])
-
-        # Datos generales (tomar del primero)
-        r0 = reservas[0]
-        huesped_data = [
-            ["Nombre", f"{r0.nombre} {r0.apellido}"],
-            ["Teléfono", r0.telefono],
-            ["Origen", r0.origen],
-            ["Encargado", r0.encargado],
-        ]
-
-        def build_table(title: str, data: list) -> Table:
-            header = Paragraph(f"<b>{title}</b>", styles["Heading3"])
-            elements.extend([header, Spacer(1, 6)])
-            table = Table(data, colWidths=[60 * mm, 100 * mm])
-            table.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 10),
-                        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-                        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
-                        (
-                            "ROWBACKGROUNDS",
-                            (0, 1),
-                            (-1, -1),
-                            [colors.HexColor("#ffffff"), colors.HexColor("#f3f4f6")],
-                        ),
-                        ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#e5e7eb")),
-                        (
-                            "INNERGRID",
-                            (0, 0),
-                            (-1, -1),
-                            0.5,
-                            colors.HexColor("#e5e7eb"),
-                        ),
-                    ]
-                )
-            )
-            return table
-
-        elements.append(build_table("Datos del huésped", huesped_data))
-        elements.append(Spacer(1, 10))
-
-        # Tabla por habitación
-        detalle_header = [
-            "Habitación",
-            "Tipo",
-            "Personas",
-            "Ingreso",
-            "Egreso",
-            "Monto",
-            "Seña",
-            "Resto",
-        ]
-        detalle_rows = [detalle_header]
-        total_monto = 0.0
-        total_senia = 0.0
-        total_resto = 0.0
-        for r in reservas:
-            total_monto += float(r.monto_total)
-            total_senia += float(r.senia)
-            total_resto += float(r.resto)
-            detalle_rows.append(
-                [
-                    r.nhabitacion.numero,
-                    r.nhabitacion.tipo,
-                    str(r.personas),
-                    r.fecha_ingreso.strftime("%d/%m/%Y"),
-                    r.fecha_egreso.strftime("%d/%m/%Y"),
-                    f"$ {float(r.monto_total):,.2f}".replace(",", "."),
-                    f"$ {float(r.senia):,.2f}".replace(",", "."),
-                    f"$ {float(r.resto):,.2f}".replace(",", "."),
-                ]
-            )
-
-        table = Table(
-            detalle_rows,
-            colWidths=[
-                22 * mm,
-                22 * mm,
-                18 * mm,
-                22 * mm,
-                22 * mm,
-                24 * mm,
-                24 * mm,
-                24 * mm,
-            ],
-        )
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#eef2ff")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 9),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-                    (
-                        "ROWBACKGROUNDS",
-                        (0, 1),
-                        (-1, -1),
-                        [colors.white, colors.HexColor("#fafafa")],
-                    ),
-                    ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#e5e7eb")),
-                    ("INNERGRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#e5e7eb")),
-                ]
-            )
-        )
-        elements.append(table)
-        elements.append(Spacer(1, 10))
-
-        # Totales
-        totales = [
-            ["Total Monto", f"$ {total_monto:,.2f}".replace(",", ".")],
-            ["Total Seña", f"$ {total_senia:,.2f}".replace(",", ".")],
-            ["Total Resto", f"$ {total_resto:,.2f}".replace(",", ".")],
-        ]
-        elements.append(build_table("Totales", totales))
-
-        doc.build(elements)
         return response
 
     @action(detail=True, methods=["get"], url_path="voucher")
@@ -754,149 +740,71 @@ class ReservaViewSet(viewsets.ModelViewSet):
         except Reserva.DoesNotExist:
             raise Http404("Reserva no encontrada")
 
-        # Preparar respuesta PDF
-        response = HttpResponse(content_type="application/pdf")
+        response = HttpResponse(voucher_pdf(reserva), content_type="application/pdf")
         filename = f"voucher_reserva_{reserva.id}.pdf"
         response["Content-Disposition"] = f'inline; filename="{filename}"'
+        return response
 
-        # Construcción del PDF con ReportLab (Platypus)
-        doc = SimpleDocTemplate(
-            response,
-            pagesize=A4,
-            leftMargin=18 * mm,
-            rightMargin=18 * mm,
-            topMargin=18 * mm,
-            bottomMargin=18 * mm,
-        )
-
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Encabezado estilizado
-        titulo = Paragraph(
-            "<para align='center'><b>Voucher de Reserva</b></para>", styles["Title"]
-        )
-        subtitulo = Paragraph(
-            f"<para align='center'>Reserva #{reserva.id} · Habitación {reserva.nhabitacion.numero} ({reserva.nhabitacion.tipo})</para>",
-            styles["Normal"],
-        )
-        elements.extend([titulo, Spacer(1, 6), subtitulo, Spacer(1, 12)])
+    @action(detail=False, methods=["get"], url_path="vouchers-exportar")
+    def vouchers_exportar(self, request):
+        """Vouchers de muchas reservas en un ZIP (un PDF por reserva) o en un
+        solo PDF, generados en paralelo (ver exportacion_vouchers.py) y
+        devueltos en bloques. Sólo supervisores.
+
+        Query params:
+        - ids: lista separada por comas de IDs de reservas, o
+        - fecha_desde / fecha_hasta (YYYY-MM-DD): reservas que ingresan en
+          ese rango (sin fecha_hasta, sólo las de fecha_desde)
+        - formato: zip (por defecto) o pdf
+        """
+        if not self._is_supervisor(request.user):
+            return Response(
+                {"error": "Acceso denegado. Solo supervisores pueden exportar."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
 
-        # Callback para dibujar logo en esquina superior derecha
-        def draw_header(canvas_obj, doc_obj):
-            try:
-                logo_path = os.path.join(
-                    settings.BASE_DIR, "staticfiles", "images", "logo.png"
-                )
-                if os.path.exists(logo_path):
-                    img = ImageReader(logo_path)
-                    desired_width = 35 * mm
-                    iw, ih = img.getSize()
-                    scale = desired_width / float(iw)
-                    desired_height = ih * scale
-                    x = doc_obj.pagesize[0] - doc_obj.rightMargin - desired_width
-                    y = doc_obj.pagesize[1] - doc_obj.topMargin - desired_height
-                    canvas_obj.drawImage(
-                        img,
-                        x,
-                        y,
-                        width=desired_width,
-                        height=desired_height,
-                        preserveAspectRatio=True,
-                        mask="auto",
-                    )
-            except Exception as e:
-                # No interrumpir por errores de imagen
-                pass
-
-        # Datos del huésped
-        huesped_data = [
-            ["Nombre", f"{reserva.nombre} {reserva.apellido}"],
-            ["Teléfono", reserva.telefono],
-            ["Origen", reserva.origen],
-            ["Encargado", reserva.encargado],
-        ]
-
-        fechas_data = [
-            ["Fecha de ingreso", reserva.fecha_ingreso.strftime("%d/%m/%Y")],
-            ["Fecha de salida", reserva.fecha_egreso.strftime("%d/%m/%Y")],
-            ["Noches", str(reserva.noches)],
-            ["Personas", str(reserva.personas)],
-        ]
-
-        montos_data = [
-            ["Monto total", f"$ {reserva.monto_total:,.2f}".replace(",", ".")],
-            ["Seña", f"$ {reserva.senia:,.2f}".replace(",", ".")],
-            ["Resto", f"$ {reserva.resto:,.2f}".replace(",", ".")],
-            [
-                "Precio por noche",
-                f"$ {reserva.precio_por_noche:,.2f}".replace(",", "."),
-            ],
-        ]
-
-        def build_table(title: str, data: list) -> Table:
-            header = Paragraph(f"<b>{title}</b>", styles["Heading3"])
-            elements.extend([header, Spacer(1, 6)])
-            table = Table(data, colWidths=[60 * mm, 100 * mm])
-            table.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 10),
-                        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-                        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
-                        (
-                            "ROWBACKGROUNDS",
-                            (0, 1),
-                            (-1, -1),
-                            [colors.HexColor("#ffffff"), colors.HexColor("#f3f4f6")],
-                        ),
-                        ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#e5e7eb")),
-                        (
-                            "INNERGRID",
-                            (0, 0),
-                            (-1, -1),
-                            0.5,
-                            colors.HexColor("#e5e7eb"),
-                        ),
-                    ]
-                )
+        params = request.query_params
+        formato = params.get("formato", "zip")
+        if formato not in FORMATOS:
+            return Response(
+                {"error": "Formato inválido (zip o pdf)"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            return table
-
-        # Construir tablas
-        elements.append(build_table("Datos del huésped", huesped_data))
-        elements.append(Spacer(1, 10))
-        elements.append(build_table("Estadía", fechas_data))
-        elements.append(Spacer(1, 10))
-        elements.append(build_table("Montos", montos_data))
-        elements.append(Spacer(1, 14))
-
-        # Notas importantes
-        notas = [
-            "Check-in a partir de las 12:00 del mediodía.",
-            "Check-out a las 10:00 de la mañana.",
-            "La totalidad de la reserva debe estar abonada para ingresar a la habitación.",
-        ]
-        for nota in notas:
-            elements.append(
-                Paragraph(f"<font color='#111827'>• {nota}</font>", styles["Normal"])
+        if formato == "pdf" and not PDF_COMBINADO_DISPONIBLE:
+            return Response(
+                {"error": "pypdf no instalado en el servidor"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-            elements.append(Spacer(1, 4))
-
-        # Observaciones
-        if reserva.observaciones:
-            elements.append(Spacer(1, 6))
-            elements.append(Paragraph("<b>Observaciones</b>", styles["Heading3"]))
-            elements.append(Spacer(1, 4))
-            elements.append(Paragraph(reserva.observaciones, styles["Normal"]))
-
-        # Renderizar
-        doc.build(elements, onFirstPage=draw_header, onLaterPages=draw_header)
+        try:
+            ids = [int(x) for x in params.get("ids", "").split(",") if x.strip()]
+        except ValueError:
+            return Response(
+                {"error": "Formato de ids inválido"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            desde, hasta = [
+                datetime.strptime(valor, "%Y-%m-%d").date() if valor else None
+                for valor in (params.get("fecha_desde"), params.get("fecha_hasta"))
+            ]
+        except ValueError:
+            return Response(
+                {"error": "Formato de fecha inválido (YYYY-MM-DD)"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            reservas = reservas_para_exportar(ids, desde, hasta)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not reservas:
+            raise Http404("Reservas no encontradas")
 
+        response = StreamingHttpResponse(
+            exportar_vouchers(reservas, formato),
+            content_type="application/zip" if formato == "zip" else "application/pdf",
+        )
+        nombre = f"vouchers_{desde.isoformat()}" if desde and not ids else "vouchers"
+        response["Content-Disposition"] = f'attachment; filename="{nombre}.{formato}"'
         return response
 
     @action(detail=False, methods=["get"])
@@ -904,24 +812,21 @@ class ReservaViewSet(viewsets.ModelViewSet):
         """Obtener reservas de hoy"""
         hoy = date.today()
         reservas = Reserva.objects.filter(Q(fecha_ingreso=hoy) | Q(fecha_egreso=hoy))
-        serializer = self.get_serializer(reservas, many=True)
-        return Response(serializer.data)
+        return Response(self._filas(reservas))
 
     @action(detail=False, methods=["get"])
     def checkins_hoy(self, request):
         """Obtener check-ins de hoy"""
         hoy = date.today()
         reservas = Reserva.objects.filter(fecha_ingreso=hoy)
-        serializer = self.get_serializer(reservas, many=True)
-        return Response(serializer.data)
+        return Response(self._filas(reservas))
 
     @action(detail=False, methods=["get"])
     def checkouts_hoy(self, request):
         """Obtener check-outs de hoy"""
         hoy = date.today()
         reservas = Reserva.objects.filter(fecha_egreso=hoy)
-        serializer = self.get_serializer(reservas, many=True)
-        return Response(serializer.data)
+        return Response(self._filas(reservas))
 
     @action(
         detail=False,
@@ -935,7 +840,10 @@ class ReservaViewSet(viewsets.ModelViewSet):
 
         Espera un campo 'file' en multipart/form-data.
         Crea habitaciones inexistentes automáticamente.
-        Devuelve un resumen de la importación.
+        Responde 202 con la importación pendiente; el resumen queda en
+        `resultado` al consultar /importaciones/<id>/.
+        Con dry_run=true sólo valida el archivo (no crea nada) y devuelve el
+        mismo resumen.
         """
         if not self._is_supervisor(request.user):
             return Response(
@@ -953,229 +861,47 @@ class ReservaViewSet(viewsets.ModelViewSet):
         filename = getattr(uploaded, "name", "").lower()
         ext = os.path.splitext(filename)[1]
 
-        try:
-            if ext == ".csv" or uploaded.content_type in (
-                "text/csv",
-                "application/csv",
-            ):
-                data = uploaded.read().decode("utf-8", errors="ignore")
-                rows = self._read_csv(io.StringIO(data))
-            elif ext in (".xlsx", ".xlsm") or (
-                uploaded.content_type
-                in (
-                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    "application/vnd.ms-excel",
-                )
-            ):
-                if load_workbook is None:
-                    return Response(
-                        {"error": "openpyxl no instalado en el servidor"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-                rows = self._read_xlsx(uploaded)
-            else:
+        if ext == ".csv" or uploaded.content_type in (
+            "text/csv",
+            "application/csv",
+        ):
+            formato = "csv"
+        elif ext in (".xlsx", ".xlsm") or (
+            uploaded.content_type
+            in (
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                "application/vnd.ms-excel",
+            )
+        ):
+            if not XLSX_DISPONIBLE:
                 return Response(
-                    {"error": "Formato no soportado. Use .csv o .xlsx"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-        finally:
-            try:
-                uploaded.seek(0)
-            except Exception:
-                pass
-
-        resumen = {
-            "procesadas": 0,
-            "creadas": 0,
-            "errores": 0,
-            "habitaciones_creadas": 0,
-            "detalles_error": [],
-        }
-
-        for row in rows:
-            resumen["procesadas"] += 1
-            try:
-                normalized = self._normalize_row(row)
-
-                habitacion, hab_created = Habitacion.objects.get_or_create(
-                    numero=normalized["habitacion_numero"],
-                    defaults={
-                        "tipo": normalized.get("habitacion_tipo", "doble"),
-                        "piso": normalized.get("habitacion_piso", "planta baja"),
-                    },
-                )
-                if hab_created:
-                    resumen["habitaciones_creadas"] += 1
-
-                fecha_ingreso = self._parse_date(
-                    normalized["check_in"]
-                )  # dd/mm/YYYY o YYYY-MM-DD
-                fecha_egreso = self._parse_date(normalized["check_out"])  # idem
-
-                # Validar solapamiento
-                if Reserva.objects.filter(
-                    nhabitacion=habitacion,
-                    fecha_ingreso__lt=fecha_egreso,
-                    fecha_egreso__gt=fecha_ingreso,
-                ).exists():
-                    raise ValueError(
-                        f"Solapamiento: ya existe una reserva en {habitacion.numero} entre {fecha_ingreso} y {fecha_egreso}"
-                    )
-
-                # Duplicado exacto
-                if Reserva.objects.filter(
-                    nhabitacion=habitacion,
-                    nombre=normalized["nombre"],
-                    apellido=normalized["apellido"],
-                    fecha_ingreso=fecha_ingreso,
-                    fecha_egreso=fecha_egreso,
-                ).exists():
-                    raise ValueError(
-                        f"Duplicada: {normalized['nombre']} {normalized['apellido']} en {habitacion.numero} con mismas fechas"
-                    )
-
-                # Crear reserva (cálculos automáticos en model.save)
-                Reserva.objects.create(
-                    encargado=normalized.get("encargado", "Desconocido")
-                    or "Desconocido",
-                    nhabitacion=habitacion,
-                    nombre=normalized["nombre"],
-                    apellido=normalized["apellido"],
-                    personas=int(normalized.get("personas", 1) or 1),
-                    fecha_ingreso=fecha_ingreso,
-                    fecha_egreso=fecha_egreso,
-                    monto_total=self._parse_number(normalized.get("monto_total", 0)),
-                    senia=self._parse_number(normalized.get("senia", 0)),
-                    resto=self._parse_number(normalized.get("resto", 0)),
-                    cantidad_habitaciones=int(
-                        normalized.get("cantidad_habitaciones", 1) or 1
-                    ),
-                    telefono=str(normalized.get("telefono", "")),
-                    celiacos=self._parse_bool(normalized.get("celiacos")),
-                    observaciones=str(normalized.get("observaciones", "")),
-                    origen=str(normalized.get("origen", "")),
+                    {"error": "openpyxl no instalado en el servidor"},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
-                resumen["creadas"] += 1
-            except Exception as e:
-                resumen["errores"] += 1
-                nombre = row.get("Nombre") or row.get("nombre") or "?"
-                apellido = row.get("Apellido") or row.get("apellido") or "?"
-                resumen["detalles_error"].append(f"{nombre} {apellido}: {e}")
-
-        return Response(resumen)
-
-    # ==== Helpers de importación ====
-    def _read_csv(self, io_stream) -> List[Dict[str, Any]]:
-        reader = csv.DictReader(io_stream)
-        return list(reader)
-
-    def _read_xlsx(self, file_obj) -> List[Dict[str, Any]]:
-        wb = load_workbook(file_obj, data_only=True)
-        ws = wb.active
-        headers = [
-            str(cell.value).strip() if cell.value is not None else ""
-            for cell in next(ws.iter_rows(min_row=1, max_row=1))
-        ]
-        rows: List[Dict[str, Any]] = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            item: Dict[str, Any] = {}
-            for i, header in enumerate(headers):
-                item[header] = row[i] if i < len(row) else None
-            rows.append(item)
-        return rows
-
-    def _normalize_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        mapping = {
-            "Habitación": "habitacion_numero",
-            "Habitacion": "habitacion_numero",
-            "habitación": "habitacion_numero",
-            "Numero": "habitacion_numero",
-            "Número": "habitacion_numero",
-            "Tipo": "habitacion_tipo",
-            "Piso": "habitacion_piso",
-            "Check-In": "check_in",
-            "Check In": "check_in",
-            "Ingreso": "check_in",
-            "Entrada": "check_in",
-            "Check-Out": "check_out",
-            "Check Out": "check_out",
-            "Egreso": "check_out",
-            "Salida": "check_out",
-            "Nombre": "nombre",
-            "Apellido": "apellido",
-            "Personas": "personas",
-            "Noches": "noches",
-            "Precio por noche": "precio_por_noche",
-            "Monto total": "monto_total",
-            "Seña": "senia",
-            "Senia": "senia",
-            "Resto": "resto",
-            "Cantidad\nde habitaciones": "cantidad_habitaciones",
-            "Cantidad de habitaciones": "cantidad_habitaciones",
-            "Telefono": "telefono",
-            "Teléfono": "telefono",
-            "Celiacos": "celiacos",
-            "Observasiones": "observaciones",
-            "Observaciones": "observaciones",
-            "Origen": "origen",
-            "Encargado": "encargado",
-        }
-
-        normalized: Dict[str, Any] = {}
-        for k, v in row.items():
-            key = mapping.get(str(k).strip(), str(k).strip())
-            normalized[key] = v
-
-        required = [
-            "habitacion_numero",
-            "nombre",
-            "apellido",
-            "check_in",
-            "check_out",
-            "monto_total",
-            "senia",
-            "origen",
-        ]
-        missing = [r for r in required if not normalized.get(r)]
-        if missing:
-            raise ValueError(
-                f"Faltan columnas/valores requeridos: {', '.join(missing)}"
+            formato = "xlsx"
+        else:
+            return Response(
+                {"error": "Formato no soportado. Use .csv o .xlsx"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        return normalized
 
-    def _parse_date(self, value: Any) -> date:
-        if value is None or value == "":
-            raise ValueError("Fecha vacía")
-        if hasattr(value, "date"):
-            try:
-                return value.date()
-            except Exception:
-                pass
-        s = str(value).strip()
-        for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s, fmt).date()
-            except ValueError:
-                continue
-        raise ValueError(f"Formato de fecha inválido: {value}")
-
-    def _parse_bool(self, value: Any) -> bool:
-        if value is None:
-            return False
-        s = str(value).strip().lower()
-        return s in ("si", "sí", "true", "1", "x", "s", "t")
-
-    def _parse_number(self, value: Any) -> float:
-        if value is None or value == "":
-            return 0.0
-        if isinstance(value, (int, float)):
-            return float(value)
-        s = str(value)
-        s = s.replace("$", "").replace(".", "").replace(",", ".")
-        try:
-            return float(s)
-        except ValueError:
-            return 0.0
+        # El archivo se guarda y se procesa en segundo plano; el avance y el
+        # resumen final se consultan en /importaciones/<id>/
+        dry_run = parse_bool(
+            request.data.get("dry_run", request.query_params.get("dry_run"))
+        )
+        importacion = crear_importacion(
+            uploaded.chunks(),
+            uploaded.name,
+            formato,
+            usuario=request.user,
+            dry_run=dry_run,
+        )
+        encolar_importacion(importacion)
+        return Response(
+            ImportacionReservaSerializer(importacion).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
 
     @action(detail=False, methods=["get"])
     def por_fecha(self, request):
@@ -1204,19 +930,11 @@ class ReservaViewSet(viewsets.ModelViewSet):
             # Activas: huéspedes presentes esa noche (mantener __gt para no contar check-outs en medialunas)
             reservas_activas = Reserva.objects.filter(
                 Q(fecha_ingreso__lte=fecha) & Q(fecha_egreso__gt=fecha)
-            ).select_related("nhabitacion")
+            )
 
             # Entradas y salidas del día (para UI de entradas/salidas)
-            entradas = (
-                Reserva.objects.filter(fecha_ingreso=fecha)
-                .select_related("nhabitacion")
-                .order_by("id")
-            )
-            salidas = (
-                Reserva.objects.filter(fecha_egreso=fecha)
-                .select_related("nhabitacion")
-                .order_by("id")
-            )
+            entradas = Reserva.objects.filter(fecha_ingreso=fecha).order_by("id")
+            salidas = Reserva.objects.filter(fecha_egreso=fecha).order_by("id")
 
             # Calcular total de personas presentes (para medialunas)
             total_personas_actual = (
@@ -1228,16 +946,12 @@ class ReservaViewSet(viewsets.ModelViewSet):
             docenas_medialunas = round(medialunas_necesarias, 1)
             fecha_siguiente = fecha + timedelta(days=1)
 
-            reservas_serializer = ReservaListSerializer(reservas_activas, many=True)
-            entradas_serializer = ReservaListSerializer(entradas, many=True)
-            salidas_serializer = ReservaListSerializer(salidas, many=True)
-
             return Response(
                 {
                     # Backward compatibility: "reservas" son las activas
-                    "reservas": reservas_serializer.data,
-                    "entradas": entradas_serializer.data,
-                    "salidas": salidas_serializer.data,
+                    "reservas": self._filas(reservas_activas, ReservaListSerializer),
+                    "entradas": self._filas(entradas, ReservaListSerializer),
+                    "salidas": self._filas(salidas, ReservaListSerializer),
                     "medialunas": {
                         "fecha_siguiente": fecha_siguiente.isoformat(),
                         "total_personas": total_personas_actual,
@@ -1265,8 +979,7 @@ class ReservaViewSet(viewsets.ModelViewSet):
 
         try:
             reservas = Reserva.objects.filter(nhabitacion_id=habitacion_id)
-            serializer = self.get_serializer(reservas, many=True)
-            return Response(serializer.data)
+            return Response(self._filas(reservas))
         except ValueError:
             return Response(
                 {"error": "ID de habitación inválido"},
@@ -1275,16 +988,40 @@ class ReservaViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"])
     def limpieza(self, request):
-        """Obtener datos de limpieza para una fecha específica"""
-        # Debug: verificar autenticación
-        print(f"=== DEBUG LIMPIEZA ===")
-        print(f"Usuario autenticado: {request.user.is_authenticated}")
-        print(f"Usuario: {request.user}")
-        print(f"Headers: {dict(request.headers)}")
+        """Obtener datos de limpieza para una fecha o un rango de fechas
 
-        # Temporalmente permitir acceso sin autenticación para pruebas
-        if not request.user.is_authenticated:
-            print("Usuario no autenticado, pero continuando para pruebas...")
+        Query params:
+        - fecha: YYYY-MM-DD (por defecto hoy); devuelve el reporte del día
+        - start_date / end_date: YYYY-MM-DD inclusive; devuelve un reporte
+          por día en `dias` (hasta MAX_DIAS_LIMPIEZA días)
+        """
+        start_str = request.query_params.get("start_date")
+        end_str = request.query_params.get("end_date")
+
+        if start_str or end_str:
+            try:
+                desde = datetime.strptime(start_str or "", "%Y-%m-%d").date()
+                hasta = datetime.strptime(end_str or "", "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {"error": "start_date y end_date son requeridos (YYYY-MM-DD)"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            num_dias = (hasta - desde).days + 1
+            if num_dias < 1 or num_dias > MAX_DIAS_LIMPIEZA:
+                return Response(
+                    {
+                        "error": f"El rango debe tener entre 1 y {MAX_DIAS_LIMPIEZA} días"
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(
+                {
+                    "start_date": desde.isoformat(),
+                    "end_date": hasta.isoformat(),
+                    "dias": reporte_limpieza(desde, hasta),
+                }
+            )
 
         fecha_str = request.GET.get("fecha")
 
@@ -1296,89 +1033,21 @@ class ReservaViewSet(viewsets.ModelViewSet):
         except ValueError:
             fecha = date.today()
 
-        # Obtener todas las habitaciones
-        habitaciones = Habitacion.objects.all()
-
-        # Obtener reservas activas para la fecha
-        reservas_activas = Reserva.objects.filter(
-            fecha_ingreso__lte=fecha, fecha_egreso__gt=fecha
-        ).select_related("nhabitacion")
-
-        # Habitaciones ocupadas
-        habitaciones_ocupadas = set(
-            reservas_activas.values_list("nhabitacion_id", flat=True)
-        )
-
-        # Habitaciones a limpiar (se fueron los pasajeros)
-        a_limpiar = []
-        # Habitaciones a pasajero (está el pasajero pero hay que repasar)
-        a_pasajero = []
-        # Habitaciones a limpiar + pasajero (4ª noche, tiene al menos 1 noche más)
-        a_limpiar_pasajero = []
-
-        for habitacion in habitaciones:
-            if habitacion.id in habitaciones_ocupadas:
-                # Buscar la reserva activa para esta habitación
-                reserva = reservas_activas.filter(nhabitacion=habitacion).first()
-
-                if reserva:
-                    # Calcular noches de estadía hasta la fecha
-                    noches_estadia = (fecha - reserva.fecha_ingreso).days
-
-                    # Si es la 4ª noche o más y tiene al menos 1 noche más
-                    if (
-                        noches_estadia >= 3
-                        and reserva.fecha_egreso > fecha + timedelta(days=1)
-                    ):
-                        a_limpiar_pasajero.append(
-                            {
-                                "id": habitacion.id,
-                                "numero": habitacion.numero,
-                                "tipo": habitacion.tipo,
-                                "noches_estadia": noches_estadia + 1,
-                            }
-                        )
-                    else:
-                        # Repaso normal
-                        a_pasajero.append(
-                            {
-                                "id": habitacion.id,
-                                "numero": habitacion.numero,
-                                "tipo": habitacion.tipo,
-                                "noches_estadia": noches_estadia + 1,
-                            }
-                        )
-            else:
-                # Habitación disponible - verificar si se fue alguien ayer
-                reserva_ayer = Reserva.objects.filter(
-                    nhabitacion=habitacion, fecha_egreso=fecha
-                ).first()
-
-                if reserva_ayer:
-                    a_limpiar.append(
-                        {
-                            "id": habitacion.id,
-                            "numero": habitacion.numero,
-                            "tipo": habitacion.tipo,
-                        }
-                    )
-
-        return Response(
-            {
-                "a_limpiar": a_limpiar,
-                "a_pasajero": a_pasajero,
-                "a_limpiar_pasajero": a_limpiar_pasajero,
-                "fecha": fecha.isoformat(),
-            }
-        )
+        return Response(reporte_limpieza(fecha, fecha)[0])
 
 
-class EstadisticasView(APIView):
+class EstadisticasView(RespuestaCondicionalMixin, APIView):
     """Vista para obtener estadísticas generales"""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
+        supervisor = is_supervisor(request.user)
+        return respuesta_cacheada(
+            request, "estadisticas", supervisor, lambda: self._construir(supervisor)
+        )
+
+    def _construir(self, supervisor):
         hoy = date.today()
 
         # Estadísticas básicas
@@ -1403,7 +1072,7 @@ class EstadisticasView(APIView):
             "habitaciones_ocupadas": habitaciones_ocupadas,
             "habitaciones_disponibles": habitaciones_disponibles,
             # Restringir ingresos para no supervisores
-            "ingresos_totales": ingresos_totales if is_supervisor(request.user) else 0,
+            "ingresos_totales": ingresos_totales if supervisor else 0,
             "reservas_hoy": reservas_hoy,
             "checkouts_hoy": checkouts_hoy,
         }
@@ -1412,12 +1081,24 @@ class EstadisticasView(APIView):
         return Response(serializer.data)
 
 
-class EstadisticasKpiView(APIView):
-    """KPIs por rango de fechas: ingresos_totales, noches_vendidas, ocupacion, adr, revpar"""
+class EstadisticasKpiView(RespuestaCondicionalMixin, APIView):
+    """KPIs por rango de fechas: ingresos_totales, noches_vendidas, ocupacion, adr, revpar
+
+    Con granularity=day|week|month devuelve además la serie por intervalo.
+    """
 
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
+        supervisor = is_supervisor(request.user)
+        return respuesta_cacheada(
+            request,
+            "estadisticas_kpis",
+            supervisor,
+            lambda: self._construir(request, supervisor),
+        )
+
+    def _construir(self, request, supervisor):
         # Query params: start_date, end_date (YYYY-MM-DD)
         start_str = request.query_params.get("start_date")
         end_str = request.query_params.get("end_date")
@@ -1450,100 +1131,100 @@ class EstadisticasKpiView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Obtener habitaciones totales
-        total_habitaciones = Habitacion.objects.count()
+        granularity = request.query_params.get("granularity")
+        if granularity:
+            return self._serie(start_date, end_date, granularity, supervisor)
 
-        # Obtener reservas que solapan el rango [start_date, end_date] por noches
-        reservas = Reserva.objects.filter(
-            fecha_ingreso__lt=end_date + timedelta(days=1),
-            fecha_egreso__gt=start_date,
-        ).only(
-            "fecha_ingreso",
-            "fecha_egreso",
-            "precio_por_noche",
-            "monto_total",
-            "noches",
-            "cantidad_habitaciones",
-        )
+        # Noches e ingresos prorrateados al rango, sumados en la base
+        kpis = calcular_kpis(start_date, end_date)
+        data = self._redondear(kpis, supervisor)
 
-        # Calcular KPIs prorrateados por noches dentro del rango
-        num_dias = (end_date - start_date).days + 1
-        noches_vendidas = 0
-        ingresos_totales = 0.0
-
-        for r in reservas:
-            # intersección de noches [start, end)
-            effective_start = max(r.fecha_ingreso, start_date)
-            effective_end = min(r.fecha_egreso, end_date + timedelta(days=1))
-            nights = max(0, (effective_end - effective_start).days)
-            if nights <= 0:
-                continue
-            cantidad = getattr(r, "cantidad_habitaciones", 1) or 1
-            noches_vendidas += nights * cantidad
-            ppx = getattr(r, "precio_por_noche", None)
-            if ppx is None or ppx == 0:
-                ppx = (
-                    (float(r.monto_total) / r.noches)
-                    if getattr(r, "noches", 0)
-                    else 0.0
-                )
-            ingresos_totales += float(ppx) * nights * cantidad
+        serializer = KpiRangoSerializer(data)
+        return Response(serializer.data)
 
-        habitaciones_disponibles_noches = total_habitaciones * num_dias
-        ocupacion = (
-            (noches_vendidas / habitaciones_disponibles_noches)
-            if habitaciones_disponibles_noches
-            else 0.0
-        )
-        adr = (ingresos_totales / noches_vendidas) if noches_vendidas else 0.0
-        revpar = (
-            (ingresos_totales / habitaciones_disponibles_noches)
-            if habitaciones_disponibles_noches
-            else 0.0
+    def _serie(self, start_date, end_date, granularity, supervisor):
+        """KPIs por día, semana o mes (granularity=day|week|month)"""
+        if granularity not in GRANULARIDADES:
+            return Response(
+                {"error": "granularity debe ser day, week o month"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if cantidad_intervalos(start_date, end_date, granularity) > MAX_PUNTOS_SERIE:
+            return Response(
+                {
+                    "error": f"La serie no puede tener más de {MAX_PUNTOS_SERIE} intervalos"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        series = []
+        for kpis in serie_kpis(start_date, end_date, granularity):
+            data = self._redondear(kpis, supervisor)
+            data["inicio"] = kpis["inicio"]
+            data["fin"] = kpis["fin"]
+            series.append(data)
+
+        return Response(
+            {
+                "granularity": granularity,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "series": KpiIntervaloSerializer(series, many=True).data,
+            }
         )
 
-        data = {
+    def _redondear(self, kpis, supervisor):
+        """Redondea los montos; los ingresos sólo los ven los supervisores"""
+        return {
             "ingresos_totales": (
-                round(ingresos_totales, 2) if is_supervisor(request.user) else 0.0
+                round(kpis["ingresos_totales"], 2) if supervisor else 0.0
+            ),
+            "noches_vendidas": int(kpis["noches_vendidas"]),
+            "ocupacion": kpis["ocupacion"],
+            "adr": round(kpis["adr"], 2),
+            "revpar": round(kpis["revpar"], 2),
+            "num_dias": int(kpis["num_dias"]),
+            "habitaciones_disponibles_noches": int(
+                kpis["habitaciones_disponibles_noches"]
             ),
-            "noches_vendidas": int(noches_vendidas),
-            "ocupacion": float(ocupacion),
-            "adr": round(adr, 2),
-            "revpar": round(revpar, 2),
-            "num_dias": int(num_dias),
-            "habitaciones_disponibles_noches": int(habitaciones_disponibles_noches),
         }
 
-        serializer = KpiRangoSerializer(data)
-        return Response(serializer.data)
 
-
-class DashboardView(APIView):
+class DashboardView(RespuestaCondicionalMixin, APIView):
     """Vista para datos del dashboard"""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
+        return respuesta_cacheada(
+            request, "dashboard", is_supervisor(request.user), self._construir
+        )
+
+    def _construir(self):
         hoy = date.today()
 
+        # Las relaciones que leen los serializers (habitación) van en la
+        # misma consulta: una por lista sin importar cuántas filas haya
+        def reservas(queryset):
+            return optimizar_queryset(queryset, ReservaListSerializer())
+
         # Últimas reservas
-        ultimas_reservas = Reserva.objects.select_related("nhabitacion").order_by(
-            "-id"
-        )[:5]
+        ultimas_reservas = reservas(Reserva.objects.order_by("-id"))[:5]
         reservas_serializer = ReservaListSerializer(ultimas_reservas, many=True)
 
         # Check-ins de hoy
-        checkins_hoy = Reserva.objects.filter(fecha_ingreso=hoy)
+        checkins_hoy = reservas(Reserva.objects.filter(fecha_ingreso=hoy))
         checkins_serializer = ReservaListSerializer(checkins_hoy, many=True)
 
         # Check-outs de hoy
-        checkouts_hoy = Reserva.objects.filter(fecha_egreso=hoy)
+        checkouts_hoy = reservas(Reserva.objects.filter(fecha_egreso=hoy))
         checkouts_serializer = ReservaListSerializer(checkouts_hoy, many=True)
 
-        # Habitaciones disponibles (todas por ahora)
-        habitaciones_disponibles = Habitacion.objects.all()
+        # Estado de las habitaciones hoy (una consulta); las disponibles son
+        # las que no tienen huéspedes esta noche
+        habitaciones = list(habitaciones_con_estado(hoy))
         habitaciones_serializer = HabitacionListSerializer(
-            habitaciones_disponibles, many=True
+            [h for h in habitaciones if not h.ocupantes], many=True
         )
 
         data = {
@@ -1551,11 +1232,33 @@ class DashboardView(APIView):
             "checkins_hoy": checkins_serializer.data,
             "checkouts_hoy": checkouts_serializer.data,
             "habitaciones_disponibles": habitaciones_serializer.data,
+            "estado_habitaciones": [estado_habitacion(h, hoy) for h in habitaciones],
         }
 
         return Response(data)
 
 
+class CacheRespuestasView(APIView):
+    """Aciertos y fallos del cache de dashboard y estadísticas - solo supervisores"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not is_supervisor(request.user):
+            return Response(
+                {
+                    "error": "Acceso denegado. Solo los supervisores pueden ver el cache."
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(
+            {
+                "backend": settings.CACHES["default"]["BACKEND"],
+                "endpoints": contadores(),
+            }
+        )
+
+
 class PerfilUsuarioViewSet(viewsets.ModelViewSet):
     """ViewSet para el modelo PerfilUsuario"""
 
@@ -1586,7 +1289,21 @@ class PerfilUsuarioViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
 
-class UsuarioViewSet(viewsets.ModelViewSet):
+class ImportacionReservaViewSet(viewsets.ReadOnlyModelViewSet):
+    """Consulta del avance de las importaciones de reservas"""
+
+    serializer_class = ImportacionReservaSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = [CsrfExemptSessionAuthentication]
+
+    def get_queryset(self):
+        queryset = ImportacionReserva.objects.select_related("usuario")
+        if is_supervisor(self.request.user):
+            return queryset
+        return queryset.filter(usuario=self.request.user)
+
+
+class UsuarioViewSet(CamposParcialesMixin, viewsets.ModelViewSet):
     """ViewSet para el modelo User"""
 
     from django.contrib.auth.models import User
@@ -1613,7 +1330,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             )
 
         print("=== LISTANDO USUARIOS ===")
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         print(f"Queryset: {queryset}")
         print(f"Cantidad de usuarios: {queryset.count()}")
 
@@ -1672,16 +1389,39 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         return user
 
 
+class PlanningContentNegotiation(DefaultContentNegotiation):
+    """Acepta `format=runs`, que elige el formato del payload y no un renderer.
+
+    DRF usa `?format=` para forzar el renderer y respondería 404 con "runs";
+    en ese caso se responde siempre JSON.
+    """
+
+    def filter_renderers(self, renderers, format):
+        if format == "runs":
+            return [r for r in renderers if r.format == "json"] or renderers
+        return super().filter_renderers(renderers, format)
+
+
 @method_decorator(csrf_exempt, name="dispatch")
-class PlanningViewSet(viewsets.ViewSet):
+class PlanningViewSet(RespuestaCondicionalMixin, viewsets.ViewSet):
     """ViewSet para el planning de reservas"""
 
     permission_classes = [permissions.AllowAny]  # Permitir acceso sin autenticación
+    content_negotiation_class = PlanningContentNegotiation
 
     @action(detail=False, methods=["get"])
     def planning(self, request):
-        """Obtener datos del planning de reservas"""
+        """Obtener datos del planning de reservas
+
+        Query params soportados:
+        - start_date: YYYY-MM-DD (por defecto, primer día del mes actual)
+        - end_date: YYYY-MM-DD inclusive (tiene prioridad sobre days)
+        - days: cantidad de días (por defecto 60)
+        - format: "runs" para la respuesta compacta por tramos
+        """
         start_date_str = request.GET.get("start_date")
+        end_date_str = request.GET.get("end_date")
+        days_str = request.GET.get("days")
 
         if start_date_str:
             try:
@@ -1691,83 +1431,31 @@ class PlanningViewSet(viewsets.ViewSet):
         else:
             first_day = date.today().replace(day=1)
 
-        # Generar 60 días desde la fecha de inicio
-        days = [first_day + timedelta(days=i) for i in range(60)]
-
-        # Obtener todas las habitaciones ordenadas por tipo
-        habitaciones = list(Habitacion.objects.all())
-        tipo_orden = {"doble": 1, "triple": 2, "cuadruple": 3, "quintuple": 4}
-        habitaciones.sort(key=lambda x: tipo_orden.get(x.tipo, 5))
-
-        # Obtener reservas que se superponen con el período
-        reservas = Reserva.objects.filter(
-            fecha_ingreso__lte=days[-1], fecha_egreso__gte=days[0]
-        ).select_related("nhabitacion")
-
-        planning_data = []
-        for habitacion in habitaciones:
-            ocupaciones = []
-            nombre_mostrado = set()
-            reservas_habitacion = reservas.filter(nhabitacion=habitacion)
-
-            for day in days:
-                ocupacion = None
-                for reserva in reservas_habitacion:
-                    if reserva.fecha_ingreso <= day < reserva.fecha_egreso:
-                        if (
-                            day == reserva.fecha_ingreso
-                            and reserva.id not in nombre_mostrado
-                        ):
-                            nombre_mostrado.add(reserva.id)
-                            ocupacion = {
-                                "is_occupied": True,
-                                "is_last_night": day
-                                == reserva.fecha_egreso - timedelta(days=1),
-                                "nombre": reserva.nombre,
-                                "reserva_id": reserva.id,
-                                "fecha_ingreso": reserva.fecha_ingreso.isoformat(),
-                                "fecha_egreso": reserva.fecha_egreso.isoformat(),
-                            }
-                        else:
-                            ocupacion = {
-                                "is_occupied": True,
-                                "is_last_night": day
-                                == reserva.fecha_egreso - timedelta(days=1),
-                                "nombre": None,
-                                "reserva_id": reserva.id,
-                                "fecha_ingreso": reserva.fecha_ingreso.isoformat(),
-                                "fecha_egreso": reserva.fecha_egreso.isoformat(),
-                            }
-                        break
-
-                if not ocupacion:
-                    ocupacion = {
-                        "is_occupied": False,
-                        "is_last_night": False,
-                        "nombre": None,
-                        "reserva_id": None,
-                        "fecha_ingreso": None,
-                        "fecha_egreso": None,
-                    }
-
-                ocupaciones.append(ocupacion)
+        num_dias = DIAS_PLANNING
+        if end_date_str:
+            try:
+                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {"error": "Formato de fecha inválido (YYYY-MM-DD)"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            num_dias = (end_date - first_day).days + 1
+        elif days_str:
+            try:
+                num_dias = int(days_str)
+            except ValueError:
+                return Response(
+                    {"error": "El parámetro days debe ser numérico"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-            planning_data.append(
-                {
-                    "habitacion": {
-                        "id": habitacion.id,
-                        "numero": habitacion.numero,
-                        "tipo": habitacion.tipo,
-                        "piso": habitacion.piso,
-                    },
-                    "ocupaciones": ocupaciones,
-                }
+        if num_dias < 1 or num_dias > MAX_DIAS_PLANNING:
+            return Response(
+                {"error": f"El rango debe tener entre 1 y {MAX_DIAS_PLANNING} días"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        return Response(
-            {
-                "planning": planning_data,
-                "days": [day.isoformat() for day in days],
-                "first_day": first_day.isoformat(),
-            }
-        )
+        if request.GET.get("format") == "runs":
+            return Response(construir_planning_runs(first_day, num_dias))
+        return Response(construir_planning(first_day, num_dias))
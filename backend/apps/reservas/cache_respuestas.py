@@ -0,0 +1,167 @@
+"""Cache de respuestas de los endpoints de dashboard y estadísticas.
+
+Usa el cache de Django (ver CACHES en settings: locmem por defecto, archivo
+o base de datos con CACHE_BACKEND=file|db cuando hay varios workers).
+
+Las claves incluyen:
+
+- el endpoint y los parámetros de la consulta
+- la fecha del día (los endpoints muestran datos "de hoy")
+- si el usuario es supervisor o no (los ingresos sólo los ven supervisores)
+- la versión de datos, un contador que se incrementa al confirmar cada
+  alta, modificación o baja de Reserva/Habitacion (ver signals.py)
+
+Así invalidar es sólo incrementar la versión: las respuestas anteriores
+dejan de usarse y expiran solas a los RESPUESTAS_CACHE_TTL segundos.
+Los aciertos y fallos se cuentan por endpoint en el mismo cache.
+
+La versión de datos y la fecha de la última modificación están en la tabla
+VersionDatos (una fila), no en el cache: con locmem cada proceso tiene su
+propio cache y no vería las escrituras de los otros (worker de
+importaciones, comandos, shells). También se usan para los ETag y
+Last-Modified de las respuestas (ver condicional.py), que no expiran.
+"""
+
+import hashlib
+import time
+from datetime import date
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import VersionDatos
+
+PREFIJO = "reservas:respuesta"
+# Endpoints con cache (para listar los contadores)
+ENDPOINTS = ("dashboard", "estadisticas", "estadisticas_kpis")
+
+
+def _version_inicial() -> int:
+    # Basada en la hora: si se pierde la fila, la versión nueva no repite una
+    # anterior (y no valida ETags viejos)
+    return int(time.time() * 1000)
+
+
+def _fila_version() -> VersionDatos:
+    fila, _ = VersionDatos.objects.get_or_create(
+        pk=1,
+        defaults={"version": _version_inicial(), "modificado": timezone.now()},
+    )
+    return fila
+
+
+def estado_datos() -> Tuple[int, float]:
+    """(versión, timestamp de la última modificación), en una consulta"""
+    fila = (
+        VersionDatos.objects.filter(pk=1).values_list("version", "modificado").first()
+    )
+    if fila is None:
+        fila = _fila_version()
+        fila = (fila.version, fila.modificado)
+    return fila[0], fila[1].timestamp()
+
+
+def version_datos() -> int:
+    """Versión actual de los datos de reservas y habitaciones"""
+    return estado_datos()[0]
+
+
+def modificacion_datos() -> float:
+    """Timestamp de la última modificación registrada"""
+    return estado_datos()[1]
+
+
+def incrementar_version_datos() -> None:
+    actualizadas = VersionDatos.objects.filter(pk=1).update(
+        version=F("version") + 1, modificado=timezone.now()
+    )
+    if not actualizadas:
+        _fila_version()
+
+
+def incrementar_al_confirmar(using: Optional[str] = None) -> None:
+    """Incrementa la versión cuando se confirma la transacción en curso (o
+    ya, fuera de una). Una sola vez por transacción aunque se escriban
+    muchas filas."""
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block and any(
+        funcion is incrementar_version_datos
+        for _, funcion, *_ in connection.run_on_commit
+    ):
+        return
+    transaction.on_commit(incrementar_version_datos, using=using)
+
+
+def clave_respuesta(
+    endpoint: str, params, supervisor: bool, version: Optional[int] = None
+) -> str:
+    valores = "&".join(
+        f"{nombre}={','.join(params.getlist(nombre))}" for nombre in sorted(params)
+    )
+    resumen = hashlib.sha1(valores.encode("utf-8")).hexdigest()[:16]
+    visibilidad = "supervisor" if supervisor else "conserje"
+    return (
+        f"{PREFIJO}:{endpoint}:v{version or version_datos()}:{date.today().isoformat()}:"
+        f"{visibilidad}:{resumen}"
+    )
+
+
+def _contar(endpoint: str, resultado: str) -> None:
+    clave = f"{PREFIJO}:contador:{endpoint}:{resultado}"
+    try:
+        cache.incr(clave)
+    except ValueError:
+        if not cache.add(clave, 1, timeout=None):
+            cache.incr(clave)
+
+
+def contadores() -> Dict[str, Dict[str, int]]:
+    """{endpoint: {"hits": n, "misses": n}}"""
+    claves = {
+        (endpoint, resultado): f"{PREFIJO}:contador:{endpoint}:{resultado}"
+        for endpoint in ENDPOINTS
+        for resultado in ("hits", "misses")
+    }
+    valores = cache.get_many(claves.values())
+    return {
+        endpoint: {
+            resultado: int(valores.get(claves[(endpoint, resultado)], 0))
+            for resultado in ("hits", "misses")
+        }
+        for endpoint in ENDPOINTS
+    }
+
+
+def respuesta_cacheada(
+    request, endpoint: str, supervisor: bool, construir: Callable[[], Response]
+) -> Response:
+    """Devuelve la respuesta guardada o la construye y la guarda.
+
+    Sólo se guardan las respuestas 200; el header X-Cache indica HIT o MISS.
+    """
+    # RespuestaCondicionalMixin ya leyó la versión para el ETag
+    clave = clave_respuesta(
+        endpoint,
+        request.query_params,
+        supervisor,
+        getattr(request, "version_datos", None),
+    )
+    data = cache.get(clave)
+    if data is not None:
+        _contar(endpoint, "hits")
+        response = Response(data)
+        response["X-Cache"] = "HIT"
+        return response
+
+    _contar(endpoint, "misses")
+    response = construir()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(clave, response.data, settings.RESPUESTAS_CACHE_TTL)
+    response["X-Cache"] = "MISS"
+    return response
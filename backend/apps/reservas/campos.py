@@ -0,0 +1,212 @@
+"""Campos parciales (sparse fieldsets) para las vistas de la API.
+
+En los GET, `?fields=id,nombre_completo` devuelve sólo esos campos y
+`?exclude=observaciones,telefono` todos menos esos. Vale para las vistas de
+reservas, habitaciones y usuarios. Los objetos anidados declarados en
+`Meta.opcionales` no salen por defecto: sólo con `?fields=` que los nombre
+(p. ej. `?fields=id,habitacion`).
+
+Además de recortar la respuesta, el queryset trae sólo las columnas que
+usan los campos que quedan (`.only()`) y únicamente las relaciones que se
+van a mostrar: las relaciones a uno con `select_related` y las relaciones a
+muchos con `prefetch_related`. Así ningún listado hace una consulta por
+fila, y si no se pide la habitación no se hace el JOIN ni se serializa el
+objeto anidado. Fuera de los ViewSets se usa `optimizar_queryset()`.
+El comando `verificar_consultas` controla que la cantidad de consultas de
+cada endpoint no dependa de la cantidad de filas.
+
+Para saber qué columnas necesita cada campo se usa su `source`. Los campos
+calculados (SerializerMethodField, métodos del modelo) las declaran en
+`Meta.columnas` del serializer, como rutas del ORM. Si algún campo no se
+puede resolver, el queryset se deja entero: es más lento pero correcto.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+PARAM_CAMPOS = "fields"
+PARAM_EXCLUIR = "exclude"
+METODOS_LECTURA = ("GET", "HEAD")
+
+
+class CamposInvalidos(Exception):
+    """Se pidieron campos que el serializer no tiene"""
+
+
+def _lista(valor: Optional[str]) -> List[str]:
+    if not valor:
+        return []
+    return [nombre.strip() for nombre in valor.split(",") if nombre.strip()]
+
+
+class CamposDinamicosMixin:
+    """Serializer que acepta `campos` (los que quedan) y `excluir`.
+
+    Va antes de la clase de serializer de DRF. Los nombres desconocidos
+    lanzan CamposInvalidos. Los campos de `Meta.opcionales` (objetos
+    anidados) sólo se incluyen si se piden por nombre en `campos`.
+    """
+
+    def __init__(self, *args, campos=None, excluir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        opcionales = getattr(getattr(self, "Meta", None), "opcionales", ())
+        pedidos = set(campos or ()) | set(excluir or ())
+        desconocidos = sorted(pedidos - set(self.fields))
+        if desconocidos:
+            raise CamposInvalidos(
+                f"Campos desconocidos: {', '.join(desconocidos)}. "
+                f"Disponibles: {', '.join(self.fields)}"
+            )
+        for nombre in list(self.fields):
+            if (
+                (campos and nombre not in campos)
+                or nombre in (excluir or ())
+                or (nombre in opcionales and nombre not in (campos or ()))
+            ):
+                self.fields.pop(nombre)
+
+
+def _ruta_modelo(modelo, atributos: List[str]) -> Optional[str]:
+    """Ruta del ORM de un `source` con puntos, o None si no es un campo"""
+    partes = []
+    for atributo in atributos:
+        if modelo is None:
+            return None
+        try:
+            campo = modelo._meta.get_field(atributo)
+        except FieldDoesNotExist:
+            return None
+        partes.append(campo.name)
+        modelo = campo.related_model if campo.is_relation else None
+    return "__".join(partes)
+
+
+class Consulta(NamedTuple):
+    """Lo que necesita un serializer: campos para only() y relaciones"""
+
+    campos: List[str]
+    select_related: List[str]
+    prefetch_related: List[str]
+
+
+def _relaciones(modelo, ruta: str, anidado: bool) -> Tuple[List[str], Optional[str]]:
+    """Relaciones de una ruta del ORM: (para select_related, para prefetch).
+
+    Las relaciones a uno se traen con JOIN; desde la primera relación a
+    muchos la ruta se resuelve con prefetch_related. La última parte sólo
+    cuenta si es un objeto anidado o una relación a muchos: para un id
+    alcanza con la columna de la clave foránea.
+    """
+    partes = ruta.split("__")
+    campos = []
+    for atributo in partes:
+        campo = modelo._meta.get_field(atributo)
+        campos.append(campo)
+        modelo = campo.related_model
+    select = []
+    for i, campo in enumerate(campos, start=1):
+        if campo.many_to_many or campo.one_to_many:
+            fin = max(j for j, c in enumerate(campos, start=1) if c.is_relation)
+            return select, "__".join(partes[:fin])
+        if not campo.is_relation or (i == len(partes) and not anidado):
+            break
+        select.append("__".join(partes[:i]))
+    return select, None
+
+
+def consulta_serializer(serializer) -> Optional[Consulta]:
+    """Columnas y relaciones que lee un serializer, a partir de los `source`
+    de sus campos y de `Meta.columnas`.
+
+    Devuelve None si algún campo no se puede resolver a columnas.
+    """
+    modelo = serializer.Meta.model
+    declaradas: Dict[str, Iterable[str]] = getattr(serializer.Meta, "columnas", {})
+    campos, select, prefetch = set(), set(), set()
+    for nombre, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+        anidado = isinstance(campo, serializers.BaseSerializer)
+        if nombre in declaradas:
+            rutas = list(declaradas[nombre])
+        elif campo.source == "*":
+            return None
+        else:
+            ruta = _ruta_modelo(modelo, campo.source_attrs)
+            if ruta is None:
+                return None
+            rutas = [ruta]
+        for ruta in rutas:
+            relaciones, a_muchos = _relaciones(modelo, ruta, anidado)
+            select.update(relaciones)
+            if a_muchos:
+                # only() no acepta relaciones a muchos: basta con lo que
+                # las une (la clave primaria o las relaciones a uno previas)
+                prefetch.add(a_muchos)
+                campos.update(relaciones)
+            else:
+                campos.add(ruta)
+    return Consulta(sorted(campos), sorted(select), sorted(prefetch))
+
+
+def optimizar_queryset(queryset, serializer):
+    """only(), select_related() y prefetch_related() para un serializer.
+
+    Sirve también fuera de los ViewSets (p. ej. el dashboard). Si el
+    serializer no se puede resolver, el queryset queda como estaba.
+    """
+    consulta = consulta_serializer(serializer)
+    if consulta is None:
+        return queryset
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if consulta.select_related:
+        queryset = queryset.select_related(*consulta.select_related)
+    if consulta.prefetch_related:
+        queryset = queryset.prefetch_related(*consulta.prefetch_related)
+    return queryset.only(*consulta.campos)
+
+
+class CamposParcialesMixin:
+    """Aplica `?fields=` / `?exclude=` a los serializers y querysets de un
+    ViewSet (sólo en lectura y con serializers que usan CamposDinamicosMixin).
+
+    Las acciones que arman su propio queryset lo pasan por
+    `reducir_queryset()`; los que pasan por `filter_queryset()` (listado y
+    detalle) ya se reducen solos.
+    """
+
+    def _campos_pedidos(self):
+        params = self.request.query_params
+        return _lista(params.get(PARAM_CAMPOS)), _lista(params.get(PARAM_EXCLUIR))
+
+    def _aplica_campos(self, serializer_class) -> bool:
+        return (
+            getattr(self, "request", None) is not None
+            and self.request.method in METODOS_LECTURA
+            and issubclass(serializer_class, CamposDinamicosMixin)
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if self._aplica_campos(serializer_class):
+            campos, excluir = self._campos_pedidos()
+            kwargs.setdefault("campos", campos or None)
+            kwargs.setdefault("excluir", excluir)
+        return super().get_serializer(*args, **kwargs)
+
+    def reducir_queryset(self, queryset):
+        """only() y las relaciones según los campos que se van a serializar"""
+        if not self._aplica_campos(self.get_serializer_class()):
+            return queryset
+        return optimizar_queryset(queryset, self.get_serializer())
+
+    def filter_queryset(self, queryset):
+        return self.reducir_queryset(super().filter_queryset(queryset))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, CamposInvalidos):
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().handle_exception(exc)
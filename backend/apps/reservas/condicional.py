@@ -0,0 +1,107 @@
+"""GET condicional (ETag / Last-Modified) para las vistas de la API.
+
+Todo lo que devuelven las vistas de reservas, habitaciones, planning,
+dashboard y estadísticas sale de Reserva y Habitacion, así que la versión
+de datos (tabla VersionDatos, ver cache_respuestas.py; se incrementa con
+cada escritura de cualquier proceso) alcanza para saber si la copia del
+cliente sigue vigente. El ETag combina:
+
+- la versión de datos
+- el usuario y si es supervisor (los ingresos se ocultan a los conserjes:
+  si cambia el rol, cambia el ETag aunque no cambien los datos)
+- la fecha del día (endpoints "de hoy" y rangos por defecto)
+- el formato negociado (JSON o la API navegable)
+
+Si el If-None-Match del pedido coincide se responde 304 antes de ejecutar
+la vista: con una sola consulta (la versión) y sin serialización. Last-Modified se informa a modo
+de referencia; como la respuesta depende del usuario, el 304 sólo se decide
+por ETag.
+"""
+
+import hashlib
+from datetime import date, datetime, time
+
+from django.utils.http import http_date, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache_respuestas import estado_datos
+
+METODOS_CONDICIONALES = ("GET", "HEAD")
+
+
+class NoModificado(Exception):
+    """La copia del cliente está vigente: se responde 304"""
+
+
+def etag_respuesta(request, version: int) -> str:
+    # api_views importa este módulo
+    from .api_views import is_supervisor
+
+    partes = (
+        str(version),
+        str(request.user.pk),
+        "supervisor" if is_supervisor(request.user) else "conserje",
+        date.today().isoformat(),
+        getattr(request, "accepted_media_type", "") or "",
+    )
+    resumen = hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{resumen}"'
+
+
+def ultima_modificacion(modificacion: float) -> float:
+    """Última escritura, o el inicio del día si fue antes (cambia "hoy")"""
+    inicio_dia = datetime.combine(date.today(), time.min).timestamp()
+    return max(modificacion, inicio_dia)
+
+
+def _sin_debil(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def coincide(if_none_match: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match contra el ETag actual"""
+    etags = parse_etags(if_none_match)
+    return "*" in etags or _sin_debil(etag) in {_sin_debil(e) for e in etags}
+
+
+class RespuestaCondicionalMixin:
+    """Agrega ETag/Last-Modified a los GET y responde 304 si no hubo cambios.
+
+    Va antes de la clase de vista de DRF. La verificación se hace en
+    `initial()`, después de la autenticación, los permisos y la negociación
+    de contenido.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._etag = None
+        if request.method not in METODOS_CONDICIONALES:
+            return
+        # Una consulta a VersionDatos; la reutilizan respuesta_cacheada y
+        # finalize_response
+        request.version_datos, self._modificacion = estado_datos()
+        self._etag = etag_respuesta(request, request.version_datos)
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and coincide(if_none_match, self._etag):
+            raise NoModificado()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NoModificado):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, "_etag", None)
+        if etag and response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(
+                ultima_modificacion(self._modificacion)
+            )
+            # El navegador puede guardarla pero debe revalidar siempre
+            response["Cache-Control"] = "private, no-cache"
+        return response
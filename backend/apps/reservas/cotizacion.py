@@ -0,0 +1,109 @@
+"""Cotización del dólar para la página de inicio, sin esperar a la red.
+
+La última cotización obtenida se guarda en la tabla CotizacionDolar (una
+fila) junto con la hora en que se consultó: así el valor que obtiene el
+comando `actualizar_cotizacion` o cualquier proceso lo ven todos los demás,
+aunque el cache sea locmem. `cotizacion_actual()` la devuelve al instante; si
+tiene más de COTIZACION_INTERVALO segundos (o todavía no hay ninguna) lanza
+la actualización en un hilo y sigue con el valor anterior. Si la consulta
+falla se conserva el último valor bueno.
+
+La consulta la hace la función de COTIZACION_FETCHER (por defecto el
+scraping de Bloomberg, con timeout): recibe el timeout en segundos y
+devuelve el texto de la cotización o lanza una excepción. En pruebas se
+reemplaza por una función local. El comando `actualizar_cotizacion` la
+actualiza en primer plano (p. ej. desde cron).
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import CotizacionDolar
+
+logger = logging.getLogger(__name__)
+
+CLAVE_ACTUALIZANDO = "reservas:cotizacion_dolar:actualizando"
+URL_BLOOMBERG = "https://www.bloomberg.com/quote/USDARS:CUR"
+
+_lock = threading.Lock()
+
+
+def cotizacion_bloomberg(timeout: float) -> str:
+    """Cotización USD/ARS publicada en Bloomberg"""
+    response = requests.get(
+        URL_BLOOMBERG, headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout
+    )
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    quote = soup.find(
+        "div", class_="sized-price media-ui-SizedPrice_extraLarge-05pKbJRbUH8-"
+    )
+    if not quote:
+        raise ValueError("No se encontró la cotización en la página")
+    return quote.text.strip()
+
+
+def actualizar_cotizacion() -> Optional[Dict]:
+    """Consulta la cotización y la guarda; devuelve None si falla"""
+    fetcher = import_string(settings.COTIZACION_FETCHER)
+    try:
+        valor = fetcher(settings.COTIZACION_TIMEOUT)
+    except Exception:
+        logger.warning("No se pudo actualizar la cotización del dólar", exc_info=True)
+        return None
+    fila, _ = CotizacionDolar.objects.update_or_create(
+        pk=1, defaults={"valor": valor, "actualizada": timezone.now()}
+    )
+    return {"valor": fila.valor, "actualizada": fila.actualizada.timestamp()}
+
+
+def _actualizar_en_hilo():
+    try:
+        actualizar_cotizacion()
+    finally:
+        # La conexión de este hilo no la cierra ningún pedido
+        connection.close()
+        cache.delete(CLAVE_ACTUALIZANDO)
+        _lock.release()
+
+
+def _actualizar_en_segundo_plano() -> None:
+    # Una sola actualización a la vez en el proceso y, con un cache
+    # compartido, entre procesos
+    if not _lock.acquire(blocking=False):
+        return
+    if not cache.add(
+        CLAVE_ACTUALIZANDO, True, timeout=int(max(settings.COTIZACION_TIMEOUT * 4, 30))
+    ):
+        _lock.release()
+        return
+    threading.Thread(target=_actualizar_en_hilo, name="cotizacion", daemon=True).start()
+
+
+def cotizacion_actual() -> Optional[Dict]:
+    """Última cotización guardada ({"valor", "actualizada"}) o None.
+
+    No hace consultas externas: si está vencida, la renueva en segundo plano.
+    """
+    fila = CotizacionDolar.objects.filter(pk=1).first()
+    cotizacion = (
+        {"valor": fila.valor, "actualizada": fila.actualizada.timestamp()}
+        if fila
+        else None
+    )
+    if (
+        cotizacion is None
+        or time.time() - cotizacion["actualizada"] > settings.COTIZACION_INTERVALO
+    ):
+        _actualizar_en_segundo_plano()
+    return cotizacion
@@ -0,0 +1,224 @@
+"""Índice en memoria de disponibilidad de habitaciones.
+
+Guarda por habitación los rangos reservados [fecha_ingreso, fecha_egreso)
+ordenados por fecha de ingreso, junto con el máximo acumulado de las fechas
+de egreso. Con eso, saber si una habitación está libre en un rango es una
+búsqueda binaria: las reservas con ingreso < egreso buscado son un prefijo
+de la lista, y alguna se solapa si el máximo egreso de ese prefijo es mayor
+que el ingreso buscado. Funciona aunque haya solapamientos históricos.
+
+El índice se invalida con las señales post_save/post_delete de Reserva y
+Habitacion (ver signals.py) y se reconstruye en la siguiente consulta.
+Como cada proceso tiene su propia copia, además se reconstruye cuando
+supera DISPONIBILIDAD_INDICE_TTL segundos, para acotar la diferencia con
+cambios hechos desde otros workers.
+
+Sólo se cargan las reservas con egreso desde hace DISPONIBILIDAD_INDICE_MARGEN
+días: las anteriores no cambian la disponibilidad de ningún rango que empiece
+después. Las consultas que empiezan antes del margen se resuelven contra la
+base con una consulta acotada a ese rango.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from .models import Habitacion, Reserva
+
+Rango = Tuple[date, date, int]  # (fecha_ingreso, fecha_egreso, reserva_id)
+
+
+def tipos_para_personas(personas: int) -> List[str]:
+    """Tipos de habitación aptos para la cantidad de personas.
+
+    Sugiere tipos iguales o más grandes, nunca más chicos.
+    """
+    if personas <= 2:
+        return ["doble", "triple", "cuadruple", "quintuple"]
+    elif personas == 3:
+        return ["triple", "cuadruple", "quintuple"]
+    elif personas == 4:
+        return ["cuadruple", "quintuple"]
+    return ["quintuple"]
+
+
+def agrupar_rangos(
+    habitaciones: List[Habitacion], reservas: Iterable[Tuple[int, date, date, int]]
+) -> Dict[int, "RangosHabitacion"]:
+    """Rangos por habitación a partir de tuplas (habitacion_id, ingreso, egreso, id)"""
+    por_habitacion: Dict[int, List[Rango]] = {h.id: [] for h in habitaciones}
+    for habitacion_id, ingreso, egreso, reserva_id in reservas:
+        if habitacion_id in por_habitacion:
+            por_habitacion[habitacion_id].append((ingreso, egreso, reserva_id))
+    return {hid: RangosHabitacion(lista) for hid, lista in por_habitacion.items()}
+
+
+class RangosHabitacion:
+    """Rangos reservados de una habitación, ordenados por fecha de ingreso"""
+
+    __slots__ = ("rangos", "inicios", "max_egresos")
+
+    def __init__(self, rangos: List[Rango]):
+        self.rangos = sorted(rangos)
+        self.inicios = [r[0] for r in self.rangos]
+        self.max_egresos = []
+        maximo = None
+        for _, egreso, _ in self.rangos:
+            maximo = egreso if maximo is None or egreso > maximo else maximo
+            self.max_egresos.append(maximo)
+
+    def esta_libre(self, fecha_ingreso: date, fecha_egreso: date) -> bool:
+        k = bisect_left(self.inicios, fecha_egreso)
+        return k == 0 or self.max_egresos[k - 1] <= fecha_ingreso
+
+
+class IndiceDisponibilidad:
+    """Índice de rangos reservados por habitación"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # (habitaciones, rangos por habitación, primer día cubierto); se
+        # reemplaza de una sola vez. None cubre toda la historia
+        self._datos: Tuple[
+            List[Habitacion], Dict[int, RangosHabitacion], Optional[date]
+        ] = ([], {}, None)
+        # Cada invalidación suma una generación; el índice está vigente si se
+        # construyó en la generación actual y no superó el TTL
+        self._generacion = 0
+        self._generacion_construida: Optional[int] = None
+        self._construido_en = 0.0
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "DISPONIBILIDAD_INDICE_TTL", 60)
+
+    @property
+    def margen(self) -> int:
+        return getattr(settings, "DISPONIBILIDAD_INDICE_MARGEN", 30)
+
+    def invalidar(self) -> None:
+        self._generacion += 1
+
+    def _vigente(self) -> bool:
+        return (
+            self._generacion_construida == self._generacion
+            and time.monotonic() - self._construido_en < self.ttl
+        )
+
+    def cargar(
+        self,
+        habitaciones: Iterable[Habitacion],
+        reservas: Iterable[Tuple[int, date, date, int]],
+        desde: Optional[date] = None,
+    ) -> None:
+        """Carga el índice desde datos ya obtenidos.
+
+        `reservas` son tuplas (habitacion_id, fecha_ingreso, fecha_egreso, id);
+        `desde` es el primer día que cubren (las que terminan antes no están).
+        """
+        habitaciones = list(habitaciones)
+        self._datos = (habitaciones, agrupar_rangos(habitaciones, reservas), desde)
+
+    @classmethod
+    def desde_datos(
+        cls,
+        habitaciones: Iterable[Habitacion],
+        reservas: Iterable[Tuple[int, date, date, int]],
+    ) -> "IndiceDisponibilidad":
+        """Índice fijo armado con datos ya cargados (no consulta la base)"""
+        indice = cls(ttl=float("inf"))
+        indice.cargar(habitaciones, reservas)
+        indice._generacion_construida = indice._generacion
+        return indice
+
+    def construir(self) -> None:
+        """Reconstruye el índice con dos consultas (habitaciones y reservas)"""
+        generacion = self._generacion
+        desde = date.today() - timedelta(days=self.margen)
+        habitaciones = Habitacion.objects.all().order_by("id")
+        reservas = Reserva.objects.filter(fecha_egreso__gte=desde).values_list(
+            "nhabitacion_id", "fecha_ingreso", "fecha_egreso", "id"
+        )
+        self.cargar(habitaciones, reservas, desde)
+        self._generacion_construida = generacion
+        self._construido_en = time.monotonic()
+
+    def _asegurar(self) -> None:
+        if self._vigente():
+            return
+        with self._lock:
+            if not self._vigente():
+                self.construir()
+
+    def habitaciones(self) -> List[Habitacion]:
+        self._asegurar()
+        return self._datos[0]
+
+    def desde(self) -> Optional[date]:
+        """Primer día cubierto por el índice (None si cubre toda la historia)"""
+        self._asegurar()
+        return self._datos[2]
+
+    def _rangos_para(
+        self, fecha_ingreso: date, fecha_egreso: date
+    ) -> Dict[int, RangosHabitacion]:
+        """Rangos por habitación válidos para consultar [fecha_ingreso, fecha_egreso)"""
+        habitaciones, rangos, desde = self._datos
+        if desde is None or fecha_ingreso >= desde:
+            return rangos
+        # Empieza antes del margen: se consulta la base sólo para ese rango
+        reservas = Reserva.objects.filter(
+            fecha_ingreso__lt=fecha_egreso, fecha_egreso__gt=fecha_ingreso
+        ).values_list("nhabitacion_id", "fecha_ingreso", "fecha_egreso", "id")
+        return agrupar_rangos(habitaciones, reservas)
+
+    def rangos(self, habitacion_id: int) -> List[Rango]:
+        """Rangos de la habitación que terminan desde `desde()` en adelante"""
+        self._asegurar()
+        rangos = self._datos[1].get(habitacion_id)
+        return list(rangos.rangos) if rangos else []
+
+    def esta_libre(
+        self, habitacion_id: int, fecha_ingreso: date, fecha_egreso: date
+    ) -> bool:
+        self._asegurar()
+        rangos = self._rangos_para(fecha_ingreso, fecha_egreso).get(habitacion_id)
+        return rangos is None or rangos.esta_libre(fecha_ingreso, fecha_egreso)
+
+    def disponibles(
+        self,
+        fecha_ingreso: Optional[date] = None,
+        fecha_egreso: Optional[date] = None,
+        personas: Optional[int] = None,
+    ) -> List[Habitacion]:
+        """Habitaciones libres en [fecha_ingreso, fecha_egreso) aptas para `personas`.
+
+        Sin fechas no filtra por ocupación; sin personas no filtra por tipo.
+        """
+        self._asegurar()
+        habitaciones = self._datos[0]
+
+        if personas is not None:
+            tipos = set(tipos_para_personas(personas))
+            habitaciones = [h for h in habitaciones if h.tipo in tipos]
+
+        if fecha_ingreso is not None and fecha_egreso is not None:
+            rangos = self._rangos_para(fecha_ingreso, fecha_egreso)
+            habitaciones = [
+                h
+                for h in habitaciones
+                if h.id not in rangos
+                or rangos[h.id].esta_libre(fecha_ingreso, fecha_egreso)
+            ]
+
+        return habitaciones
+
+
+indice_disponibilidad = IndiceDisponibilidad()
@@ -0,0 +1,65 @@
+"""Estado de las habitaciones en una fecha: ocupada o libre y cuántos días
+faltan para la próxima llegada.
+
+Se resuelve en una sola consulta agrupada por habitación (un COUNT y un MIN
+con filtro sobre sus reservas) en lugar de consultar reserva por reserva.
+Lo usan la vista `home`, `obtener_estado_habitaciones` y DashboardView.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.db.models import Count, Min, Q
+
+from .models import Habitacion
+
+
+def habitaciones_con_estado(fecha: Optional[date] = None, incluir_egreso=False):
+    """Habitaciones anotadas con `ocupantes` (reservas que ocupan la fecha) y
+    `proxima_llegada` (primer ingreso posterior a la fecha, o None).
+
+    Con `incluir_egreso` el día de salida también cuenta como ocupado, como
+    muestra el mapa de la página de inicio.
+    """
+    fecha = fecha or date.today()
+    egreso = (
+        "reserva__fecha_egreso__gte" if incluir_egreso else "reserva__fecha_egreso__gt"
+    )
+    return Habitacion.objects.annotate(
+        ocupantes=Count(
+            "reserva", filter=Q(reserva__fecha_ingreso__lte=fecha, **{egreso: fecha})
+        ),
+        proxima_llegada=Min(
+            "reserva__fecha_ingreso", filter=Q(reserva__fecha_ingreso__gt=fecha)
+        ),
+    ).order_by("id")
+
+
+def estado_habitacion(habitacion, fecha: date) -> Dict:
+    """Dict con el estado de una habitación de `habitaciones_con_estado`"""
+    ocupada = habitacion.ocupantes > 0
+    dias = None
+    if not ocupada and habitacion.proxima_llegada is not None:
+        dias = (habitacion.proxima_llegada - fecha).days
+    return {
+        "id": habitacion.id,
+        "numero": habitacion.numero,
+        "tipo": habitacion.tipo,
+        "ocupada": ocupada,
+        "dias_hasta_proxima": dias,
+    }
+
+
+def estado_habitaciones(
+    fecha: Optional[date] = None, incluir_egreso=False
+) -> List[Dict]:
+    """Estado de todas las habitaciones en la fecha (por defecto hoy).
+
+    `dias_hasta_proxima` es None si la habitación está ocupada o no tiene
+    llegadas futuras.
+    """
+    fecha = fecha or date.today()
+    return [
+        estado_habitacion(habitacion, fecha)
+        for habitacion in habitaciones_con_estado(fecha, incluir_egreso)
+    ]
@@ -0,0 +1,184 @@
+"""Exportación masiva de vouchers: muchas reservas en un ZIP o en un PDF.
+
+Lo usan la acción `vouchers-exportar` de ReservaViewSet y el comando
+`exportar_vouchers`, con el mismo diseño que el voucher individual
+(vouchers.py).
+
+- ZIP (un PDF por reserva): ReportLab consume CPU y retiene el GIL, así que
+  los PDFs que no están en el cache se generan en un ProcessPoolExecutor
+  de VOUCHERS_EXPORTACION_PROCESOS procesos. A cada proceso sólo se le
+  envía el dict de `datos_voucher`, no la reserva. El ZIP se arma y se
+  devuelve en bloques a medida que llegan los PDFs, en el orden de las
+  reservas, y los PDFs generados quedan en el cache para reimprimirlos.
+- PDF: los mismos PDFs individuales (del cache o del pool) se van
+  agregando con pypdf a un único documento a medida que llegan; el logo
+  repetido se guarda una sola vez. Como el índice de un PDF va al final,
+  el archivo se escribe en un temporal y se devuelve en bloques. Requiere
+  pypdf (PDF_COMBINADO_DISPONIBLE).
+
+El pool usa el método `forkserver` (o `spawn` donde no existe) en lugar de
+`fork`: no se duplica el proceso web con sus hilos (importaciones,
+cotización) a mitad de un pedido. Cada proceso nuevo ejecuta django.setup().
+"""
+
+import multiprocessing
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from io import BytesIO
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except Exception:  # pragma: no cover
+    PdfWriter = None
+
+from .models import Reserva
+from .vouchers import clave_voucher, datos_voucher, generar_voucher
+
+FORMATOS = ("zip", "pdf")
+TAMANIO_BLOQUE = 64 * 1024
+
+PDF_COMBINADO_DISPONIBLE = PdfWriter is not None
+
+
+def _contexto_procesos():
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in metodos else "spawn"
+    )
+
+
+def reservas_para_exportar(
+    ids: Optional[Sequence[int]] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+):
+    """Reservas por ids o por fecha de ingreso entre `desde` y `hasta`
+    (inclusive; sin `hasta`, sólo las que ingresan `desde`).
+
+    Lanza ValueError si no hay criterio o si son más de
+    VOUCHERS_EXPORTACION_MAX.
+    """
+    reservas = Reserva.objects.select_related("nhabitacion")
+    if ids:
+        reservas = reservas.filter(id__in=ids)
+    elif desde:
+        hasta = hasta or desde
+        if desde > hasta:
+            raise ValueError("fecha_desde debe ser anterior o igual a fecha_hasta")
+        reservas = reservas.filter(fecha_ingreso__gte=desde, fecha_ingreso__lte=hasta)
+    else:
+        raise ValueError("Indicar ids o fecha_desde")
+    reservas = list(reservas.order_by("fecha_ingreso", "nhabitacion__numero", "id"))
+    if len(reservas) > settings.VOUCHERS_EXPORTACION_MAX:
+        raise ValueError(
+            f"Son {len(reservas)} reservas; el máximo por exportación es "
+            f"{settings.VOUCHERS_EXPORTACION_MAX}"
+        )
+    return reservas
+
+
+def _generar_en_paralelo(
+    lista: Sequence[Dict[str, str]], procesos: int
+) -> Iterator[bytes]:
+    """PDFs de `lista` en orden, generados en `procesos` procesos"""
+    procesos = min(procesos, len(lista))
+    if procesos <= 1:
+        yield from map(generar_voucher, lista)
+        return
+    executor = ProcessPoolExecutor(
+        max_workers=procesos,
+        mp_context=_contexto_procesos(),
+        initializer=django.setup,
+    )
+    try:
+        yield from executor.map(
+            generar_voucher, lista, chunksize=max(1, len(lista) // (procesos * 4))
+        )
+    finally:
+        # Si el cliente corta la descarga, no seguir generando
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def pdfs_vouchers(
+    lista: Sequence[Dict[str, str]], procesos: Optional[int] = None
+) -> Iterator[bytes]:
+    """PDF de cada voucher de `lista`, en orden: del cache si está, si no
+    generado en paralelo (y guardado en el cache)"""
+    if procesos is None:
+        procesos = settings.VOUCHERS_EXPORTACION_PROCESOS
+    claves = [clave_voucher(datos) for datos in lista]
+    guardados = cache.get_many(claves)
+    generados = _generar_en_paralelo(
+        [datos for datos, clave in zip(lista, claves) if clave not in guardados],
+        procesos,
+    )
+    for clave in claves:
+        pdf = guardados.get(clave)
+        if pdf is None:
+            pdf = next(generados)
+            cache.set(clave, pdf, timeout=settings.VOUCHER_CACHE_TTL)
+        yield pdf
+
+
+class _Salida:
+    """Destino de escritura sin seek para zipfile: acumula lo escrito hasta
+    que se lo retira con `vaciar()`"""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def exportar_zip(reservas: Iterable, procesos: Optional[int] = None) -> Iterator[bytes]:
+    """ZIP con `voucher_reserva_<id>.pdf` por reserva, en bloques"""
+    lista = [datos_voucher(reserva) for reserva in reservas]
+    salida = _Salida()
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as archivo:
+        for datos, pdf in zip(lista, pdfs_vouchers(lista, procesos)):
+            archivo.writestr(f"voucher_reserva_{datos['id']}.pdf", pdf)
+            yield salida.vaciar()
+    yield salida.vaciar()
+
+
+def exportar_pdf(reservas: Iterable, procesos: Optional[int] = None) -> Iterator[bytes]:
+    """Un solo PDF con los vouchers de todas las reservas, en bloques"""
+    lista = [datos_voucher(reserva) for reserva in reservas]
+    combinado = PdfWriter()
+    for pdf in pdfs_vouchers(lista, procesos):
+        combinado.append(PdfReader(BytesIO(pdf)))
+    combinado.compress_identical_objects()
+    with tempfile.TemporaryFile() as archivo:
+        combinado.write(archivo)
+        archivo.seek(0)
+        while bloque := archivo.read(TAMANIO_BLOQUE):
+            yield bloque
+
+
+def exportar_vouchers(
+    reservas: Iterable, formato: str = "zip", procesos: Optional[int] = None
+) -> Iterator[bytes]:
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (zip o pdf)")
+    if formato == "pdf":
+        if not PDF_COMBINADO_DISPONIBLE:
+            raise ValueError("pypdf no instalado: usar formato zip")
+        return exportar_pdf(reservas, procesos)
+    return exportar_zip(reservas, procesos)
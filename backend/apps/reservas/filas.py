@@ -0,0 +1,181 @@
+"""Serialización rápida de reservas a partir de filas de `.values()`.
+
+Las acciones de sólo lectura que devuelven muchas reservas (hoy,
+checkins_hoy, checkouts_hoy, por_fecha y por_habitacion) no necesitan
+instancias del modelo ni pasar cada campo por un Field de DRF: arman los
+dicts directamente desde `.values()`.
+
+Cada serializer tiene su definición en DEFINICIONES: nombre del campo de
+salida → (columnas del ORM que lee, función que arma el valor desde la
+fila). La salida tiene que ser idéntica a la del serializer, con los mismos
+campos, en el mismo orden y con los mismos tipos. Si se agrega un campo a
+un serializer hay que agregarlo también acá: SerializacionFilasTests
+(tests.py) falla si falta o si la salida difiere. El comando
+`benchmark_serializacion` mide el costo por fila.
+
+También aceptan `?fields=` / `?exclude=` con los mismos nombres que el
+serializer (ver campos.py).
+"""
+
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .campos import CamposInvalidos
+from .moneda import formato_moneda
+from .serializers import HabitacionSerializer, ReservaListSerializer, ReservaSerializer
+
+
+class Campo(NamedTuple):
+    columnas: Tuple[str, ...]
+    valor: Callable[[Dict[str, Any]], Any]
+    # Sólo si se pide por nombre (Meta.opcionales del serializer)
+    opcional: bool = False
+
+
+def columna(ruta: str) -> Campo:
+    """Valor tal cual viene de la base (texto, números, booleanos)"""
+    return Campo((ruta,), itemgetter(ruta))
+
+
+def fecha(ruta: str) -> Campo:
+    """Fecha en ISO 8601, como DateField de DRF"""
+
+    def valor(fila):
+        dato = fila[ruta]
+        return dato.isoformat() if dato is not None else None
+
+    return Campo((ruta,), valor)
+
+
+def convertida(ruta: str, tipo: Callable[[Any], Any]) -> Campo:
+    """Valor convertido (int, float, str) como hace el Field de DRF"""
+
+    def valor(fila):
+        dato = fila[ruta]
+        return tipo(dato) if dato is not None else None
+
+    return Campo((ruta,), valor)
+
+
+def moneda(ruta: str) -> Campo:
+    """Importe formateado en es-AR, como MonedaField"""
+    return Campo((ruta,), lambda fila: formato_moneda(fila[ruta]))
+
+
+def anidado(prefijo: str, definicion: Dict[str, Campo]) -> Campo:
+    """Objeto anidado (un serializer dentro de otro) leído con JOIN"""
+    propias = tuple(
+        dict.fromkeys(c for campo in definicion.values() for c in campo.columnas)
+    )
+    columnas = tuple(f"{prefijo}__{c}" for c in propias)
+
+    def valor(fila):
+        relacionada = {c: fila[f"{prefijo}__{c}"] for c in propias}
+        return {
+            nombre: campo.valor(relacionada) for nombre, campo in definicion.items()
+        }
+
+    return Campo(columnas, valor)
+
+
+def opcional(campo: Campo) -> Campo:
+    return campo._replace(opcional=True)
+
+
+def nombre_completo(fila):
+    return f"{fila['nombre']} {fila['apellido']}"
+
+
+CAMPOS_HABITACION = {
+    "id": columna("id"),
+    "numero": convertida("numero", str),
+    "tipo": convertida("tipo", str),
+    "piso": convertida("piso", str),
+}
+
+CAMPOS_RESERVA_LISTA = {
+    "id": columna("id"),
+    "nombre_completo": Campo(("nombre", "apellido"), nombre_completo),
+    "fecha_ingreso": fecha("fecha_ingreso"),
+    "fecha_egreso": fecha("fecha_egreso"),
+    "noches": convertida("noches", int),
+    "personas": convertida("personas", int),
+    "monto_total": convertida("monto_total", float),
+    "habitacion_numero": convertida("nhabitacion__numero", str),
+    "habitacion_tipo": convertida("nhabitacion__tipo", str),
+    "encargado": convertida("encargado", str),
+    "observaciones": convertida("observaciones", str),
+    "telefono": convertida("telefono", str),
+    "origen": convertida("origen", str),
+}
+
+CAMPOS_RESERVA = {
+    "id": columna("id"),
+    "nombre": convertida("nombre", str),
+    "apellido": convertida("apellido", str),
+    "telefono": convertida("telefono", str),
+    "fecha_ingreso": fecha("fecha_ingreso"),
+    "fecha_egreso": fecha("fecha_egreso"),
+    "noches": convertida("noches", int),
+    "personas": convertida("personas", int),
+    "monto_total": convertida("monto_total", float),
+    "senia": convertida("senia", float),
+    "resto": convertida("resto", float),
+    "precio_por_noche": convertida("precio_por_noche", float),
+    "origen": convertida("origen", str),
+    "observaciones": convertida("observaciones", str),
+    "encargado": convertida("encargado", str),
+    "habitacion": opcional(anidado("nhabitacion", CAMPOS_HABITACION)),
+    "cantidad_habitaciones": convertida("cantidad_habitaciones", int),
+    "celiacos": convertida("celiacos", bool),
+    "monto_total_formateado": moneda("monto_total"),
+    "senia_formateada": moneda("senia"),
+    "resto_formateado": moneda("resto"),
+    "precio_por_noche_formateado": moneda("precio_por_noche"),
+}
+
+DEFINICIONES = {
+    HabitacionSerializer: CAMPOS_HABITACION,
+    ReservaListSerializer: CAMPOS_RESERVA_LISTA,
+    ReservaSerializer: CAMPOS_RESERVA,
+}
+
+
+def elegir_campos(
+    definicion: Dict[str, Campo],
+    campos: Optional[Sequence[str]] = None,
+    excluir: Sequence[str] = (),
+) -> Dict[str, Campo]:
+    """Subconjunto de la definición para `?fields=` / `?exclude=` (los
+    campos opcionales sólo si están en `campos`)"""
+    campos = campos or ()
+    desconocidos = sorted((set(campos) | set(excluir)) - set(definicion))
+    if desconocidos:
+        raise CamposInvalidos(
+            f"Campos desconocidos: {', '.join(desconocidos)}. "
+            f"Disponibles: {', '.join(definicion)}"
+        )
+    return {
+        nombre: campo
+        for nombre, campo in definicion.items()
+        if (nombre in campos or not (campos or campo.opcional))
+        and nombre not in excluir
+    }
+
+
+def serializar_filas(
+    queryset,
+    definicion: Dict[str, Campo],
+    campos: Optional[Sequence[str]] = None,
+    excluir: Sequence[str] = (),
+) -> List[Dict[str, Any]]:
+    """Lista de dicts equivalente a `Serializer(queryset, many=True).data`"""
+    definicion = elegir_campos(definicion, campos, excluir)
+    columnas = list(
+        dict.fromkeys(c for campo in definicion.values() for c in campo.columnas)
+    )
+    valores = [(nombre, campo.valor) for nombre, campo in definicion.items()]
+    return [
+        {nombre: valor(fila) for nombre, valor in valores}
+        for fila in queryset.values(*columnas)
+    ]
@@ -0,0 +1,556 @@
+"""Motor de importación de reservas (CSV / Excel).
+
+Lo usan las importaciones en segundo plano (`tareas_importacion.py`) y el
+comando `import_reservas`.
+
+Procesa las filas en lotes: por cada lote precarga las habitaciones y las
+reservas existentes del rango de fechas del lote, valida solapamientos y
+duplicados en memoria (incluidos los que hay entre filas del mismo archivo)
+e inserta con `bulk_create`. Si la base tiene la restricción de exclusión
+de PostgreSQL (ver restricciones.py) sólo se precargan las reservas
+existentes sin noches (rango vacío, que la restricción no compara) para
+detectar duplicados: los demás choques con la base los rechaza el INSERT y
+se informan fila por fila como solapamientos. Las filas con el egreso
+anterior al ingreso se rechazan siempre antes de insertar. El resumen y los
+mensajes de error por fila son los mismos que producía la importación fila
+por fila.
+
+Los lectores de CSV y Excel son generadores: el archivo se decodifica por
+bloques (CSV) o se recorre con openpyxl en modo `read_only` (Excel), de modo
+que en memoria sólo queda el lote que se está procesando.
+"""
+
+import codecs
+import csv
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+try:
+    from openpyxl import load_workbook
+except Exception:  # pragma: no cover
+    load_workbook = None
+
+from .models import Habitacion, Reserva
+from .restricciones import es_error_solapamiento, solapamiento_en_base
+from .signals import reservas_creadas_en_lote
+
+TAMANIO_LOTE = 500
+# Bytes leídos por vez al decodificar un CSV desde disco
+TAMANIO_BLOQUE = 64 * 1024
+
+MAPEO_COLUMNAS = {
+    "Habitación": "habitacion_numero",
+    "Habitacion": "habitacion_numero",
+    "habitación": "habitacion_numero",
+    "Numero": "habitacion_numero",
+    "Número": "habitacion_numero",
+    "Tipo": "habitacion_tipo",
+    "Piso": "habitacion_piso",
+    "Check-In": "check_in",
+    "Check In": "check_in",
+    "Ingreso": "check_in",
+    "Entrada": "check_in",
+    "Check-Out": "check_out",
+    "Check Out": "check_out",
+    "Egreso": "check_out",
+    "Salida": "check_out",
+    "Nombre": "nombre",
+    "Apellido": "apellido",
+    "Personas": "personas",
+    "Noches": "noches",
+    "Precio por noche": "precio_por_noche",
+    "Monto total": "monto_total",
+    "Seña": "senia",
+    "Senia": "senia",
+    "Resto": "resto",
+    "Cantidad\nde habitaciones": "cantidad_habitaciones",
+    "Cantidad de habitaciones": "cantidad_habitaciones",
+    "Telefono": "telefono",
+    "Teléfono": "telefono",
+    "Celiacos": "celiacos",
+    "Observasiones": "observaciones",
+    "Observaciones": "observaciones",
+    "Origen": "origen",
+    "Encargado": "encargado",
+}
+
+CAMPOS_REQUERIDOS = [
+    "habitacion_numero",
+    "nombre",
+    "apellido",
+    "check_in",
+    "check_out",
+    "monto_total",
+    "senia",
+    "origen",
+]
+
+
+XLSX_DISPONIBLE = load_workbook is not None
+
+
+# ==== Lectores ====
+def lineas_desde_bloques(
+    bloques: Iterable[bytes], encoding: str = "utf-8-sig"
+) -> Iterator[str]:
+    """Decodifica bloques de bytes de a uno y devuelve líneas (con su fin de línea).
+
+    Las secuencias multibyte cortadas entre bloques las resuelve el
+    decodificador incremental; los bytes inválidos se ignoran.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+    pendiente = ""
+    for bloque in bloques:
+        pendiente += decoder.decode(bloque)
+        lineas = pendiente.split("\n")
+        pendiente = lineas.pop()
+        for linea in lineas:
+            yield linea + "\n"
+    pendiente += decoder.decode(b"", final=True)
+    if pendiente:
+        yield pendiente
+
+
+def bloques_de_archivo(path: str, tamanio: int = TAMANIO_BLOQUE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            bloque = f.read(tamanio)
+            if not bloque:
+                return
+            yield bloque
+
+
+def leer_csv(lineas: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Filas del CSV como diccionarios, a medida que se leen"""
+    yield from csv.DictReader(lineas)
+
+
+def leer_xlsx(archivo) -> Iterator[Dict[str, Any]]:
+    """Filas de la hoja activa como diccionarios, a medida que se leen.
+
+    El libro se abre al llamar (los errores de formato se ven enseguida) y
+    se recorre en modo `read_only`, sin cargar la hoja completa.
+    """
+    wb = load_workbook(archivo, read_only=True, data_only=True)
+    return _filas_xlsx(wb)
+
+
+def _filas_xlsx(wb) -> Iterator[Dict[str, Any]]:
+    try:
+        filas = wb.active.iter_rows(values_only=True)
+        encabezados = next(filas, None)
+        if encabezados is None:
+            return
+        headers = [
+            str(value).strip() if value is not None else "" for value in encabezados
+        ]
+        for row in filas:
+            yield {
+                header: row[i] if i < len(row) else None
+                for i, header in enumerate(headers)
+            }
+    finally:
+        wb.close()
+
+
+def nuevo_resumen() -> Dict[str, Any]:
+    return {
+        "procesadas": 0,
+        "creadas": 0,
+        "errores": 0,
+        "habitaciones_creadas": 0,
+        "detalles_error": [],
+    }
+
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Mapea encabezados posibles a claves estándar y valida los requeridos"""
+    normalized: Dict[str, Any] = {}
+    for k, v in row.items():
+        key = MAPEO_COLUMNAS.get(str(k).strip(), str(k).strip())
+        normalized[key] = v
+
+    missing = [r for r in CAMPOS_REQUERIDOS if not normalized.get(r)]
+    if missing:
+        raise ValueError(f"Faltan columnas/valores requeridos: {', '.join(missing)}")
+    return normalized
+
+
+def parse_date(value: Any) -> date:
+    """Acepta date/datetime (Excel), dd/mm/YYYY o YYYY-MM-DD"""
+    if value is None or value == "":
+        raise ValueError("Fecha vacía")
+    if hasattr(value, "date"):
+        try:
+            return value.date()
+        except Exception:
+            pass
+    s = str(value).strip()
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(s, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Formato de fecha inválido: {value}")
+
+
+def parse_bool(value: Any) -> bool:
+    if value is None:
+        return False
+    s = str(value).strip().lower()
+    return s in ("si", "sí", "true", "1", "x", "s", "t")
+
+
+def parse_number(value: Any) -> float:
+    """Números con formato local ($ 1.234,50); valores inválidos cuentan como 0"""
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = str(value)
+    s = s.replace("$", "").replace(".", "").replace(",", ".")
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def en_lotes(rows: Iterable[Dict[str, Any]], tamanio: int) -> Iterator[List]:
+    lote: List[Dict[str, Any]] = []
+    for row in rows:
+        lote.append(row)
+        if len(lote) >= tamanio:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _etiqueta_fila(row: Dict[str, Any]) -> str:
+    nombre = row.get("Nombre") or row.get("nombre") or "?"
+    apellido = row.get("Apellido") or row.get("apellido") or "?"
+    return f"{nombre} {apellido}"
+
+
+class ParserColumnas:
+    """Convierte columnas enteras de un lote, memorizando cada valor distinto.
+
+    En un archivo grande las fechas, montos y marcas se repiten mucho, así
+    que cada valor distinto se parsea una sola vez. Los errores también se
+    memorizan y se devuelven como la excepción en lugar del valor.
+    """
+
+    MAX_VALORES = 20000
+
+    def __init__(self):
+        self._memo: Dict[Callable, Dict[Tuple[type, Any], Any]] = {}
+
+    def columna(self, parser: Callable[[Any], Any], valores: Iterable[Any]) -> List:
+        memo = self._memo.setdefault(parser, {})
+        if len(memo) > self.MAX_VALORES:
+            memo.clear()
+        resultado = []
+        for valor in valores:
+            clave = (type(valor), valor)
+            try:
+                convertido = memo[clave]
+            except KeyError:
+                try:
+                    convertido = parser(valor)
+                except Exception as e:
+                    convertido = e
+                memo[clave] = convertido
+            resultado.append(convertido)
+        return resultado
+
+
+def _valor(convertido: Any) -> Any:
+    """Devuelve el valor convertido o lanza el error memorizado"""
+    if isinstance(convertido, Exception):
+        raise convertido.with_traceback(None)
+    return convertido
+
+
+class _Fila:
+    """Resultado del parseo previo de una fila del lote"""
+
+    __slots__ = (
+        "row",
+        "normalized",
+        "error",
+        "ingreso",
+        "egreso",
+        "monto_total",
+        "senia",
+        "resto",
+        "celiacos",
+    )
+
+    def __init__(self, row: Dict[str, Any]):
+        self.row = row
+        self.normalized: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+
+
+class ImportadorReservas:
+    """Importa filas de reservas en lotes y acumula el resumen.
+
+    Con `dry_run=True` hace las mismas validaciones (incluidos solapamientos y
+    duplicados entre filas del archivo) sin escribir nada: las habitaciones
+    nuevas y las reservas válidas se cuentan en el resumen como si se hubieran
+    creado.
+    """
+
+    def __init__(
+        self,
+        tamanio_lote: int = TAMANIO_LOTE,
+        al_procesar_lote: Optional[Callable[[Dict[str, Any]], None]] = None,
+        dry_run: bool = False,
+    ):
+        self.tamanio_lote = tamanio_lote
+        # Se llama con el resumen parcial después de cada lote (progreso)
+        self.al_procesar_lote = al_procesar_lote
+        self.dry_run = dry_run
+        self.resumen = nuevo_resumen()
+        self.parser = ParserColumnas()
+        self._habitaciones: Optional[Dict[str, List[Habitacion]]] = None
+
+    def importar(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        for lote in en_lotes(rows, self.tamanio_lote):
+            self.procesar_lote(lote)
+            if self.al_procesar_lote is not None:
+                self.al_procesar_lote(self.resumen)
+        return self.resumen
+
+    # ==== Habitaciones ====
+    def _cargar_habitaciones(self) -> Dict[str, List[Habitacion]]:
+        if self._habitaciones is None:
+            self._habitaciones = {}
+            for habitacion in Habitacion.objects.all().order_by("id"):
+                self._habitaciones.setdefault(str(habitacion.numero), []).append(
+                    habitacion
+                )
+        return self._habitaciones
+
+    def _obtener_habitacion(self, normalized: Dict[str, Any]) -> Habitacion:
+        """Equivalente en memoria a Habitacion.objects.get_or_create(numero=...)"""
+        habitaciones = self._cargar_habitaciones()
+        numero = str(normalized["habitacion_numero"])
+        encontradas = habitaciones.get(numero)
+        if encontradas:
+            if len(encontradas) > 1:
+                raise Habitacion.MultipleObjectsReturned(
+                    f"get() returned more than one Habitacion -- it returned {len(encontradas)}!"
+                )
+            return encontradas[0]
+        habitacion = Habitacion(
+            numero=numero,
+            tipo=normalized.get("habitacion_tipo", "doble"),
+            piso=normalized.get("habitacion_piso", "planta baja"),
+        )
+        if not self.dry_run:
+            habitacion.save()
+        habitaciones[numero] = [habitacion]
+        self.resumen["habitaciones_creadas"] += 1
+        return habitacion
+
+    # ==== Lotes ====
+    def _parsear(self, lote: List[Dict[str, Any]]) -> List[_Fila]:
+        """Normaliza las filas y convierte fechas, montos y marcas por columna"""
+        filas = []
+        validas = []
+        for row in lote:
+            fila = _Fila(row)
+            try:
+                fila.normalized = normalize_row(row)
+                validas.append(fila)
+            except Exception as e:
+                fila.error = e
+            filas.append(fila)
+
+        columnas = {
+            "ingreso": (parse_date, "check_in", None),
+            "egreso": (parse_date, "check_out", None),
+            "monto_total": (parse_number, "monto_total", 0),
+            "senia": (parse_number, "senia", 0),
+            "resto": (parse_number, "resto", 0),
+            "celiacos": (parse_bool, "celiacos", None),
+        }
+        for atributo, (parser, campo, defecto) in columnas.items():
+            convertidos = self.parser.columna(
+                parser, (fila.normalized.get(campo, defecto) for fila in validas)
+            )
+            for fila, convertido in zip(validas, convertidos):
+                setattr(fila, atributo, convertido)
+        return filas
+
+    def _precargar_reservas(
+        self, filas: List[_Fila], solo_sin_noches: bool = False
+    ) -> Dict[Any, List[Tuple[date, date, str, str]]]:
+        """Reservas existentes de las habitaciones del lote dentro de su rango
+        de fechas (con `solo_sin_noches`, sólo las de 0 noches)"""
+        habitaciones = self._cargar_habitaciones()
+        ids = set()
+        fechas = []
+        for fila in filas:
+            if fila.normalized is None:
+                continue
+            if isinstance(fila.ingreso, Exception) or isinstance(
+                fila.egreso, Exception
+            ):
+                continue
+            for habitacion in habitaciones.get(
+                str(fila.normalized["habitacion_numero"]), []
+            ):
+                if habitacion.id is not None:
+                    ids.add(habitacion.id)
+            fechas.extend((fila.ingreso, fila.egreso))
+
+        existentes: Dict[Any, List[Tuple[date, date, str, str]]] = {}
+        if not ids:
+            return existentes
+        # Rango inclusivo: cubre solapamientos y duplicados exactos, aun con
+        # filas de 0 noches o fechas invertidas
+        reservas = Reserva.objects.filter(
+            nhabitacion_id__in=ids,
+            fecha_ingreso__lte=max(fechas),
+            fecha_egreso__gte=min(fechas),
+        )
+        if solo_sin_noches:
+            reservas = reservas.filter(fecha_egreso__lte=F("fecha_ingreso"))
+        reservas = reservas.values_list(
+            "nhabitacion_id", "fecha_ingreso", "fecha_egreso", "nombre", "apellido"
+        )
+        for habitacion_id, ingreso, egreso, nombre, apellido in reservas:
+            existentes.setdefault(habitacion_id, []).append(
+                (ingreso, egreso, nombre, apellido)
+            )
+        return existentes
+
+    def _construir_reserva(
+        self,
+        fila: _Fila,
+        habitacion: Habitacion,
+        fecha_ingreso: date,
+        fecha_egreso: date,
+    ) -> Reserva:
+        normalized = fila.normalized
+        reserva = Reserva(
+            encargado=normalized.get("encargado", "Desconocido") or "Desconocido",
+            nhabitacion=habitacion,
+            nombre=normalized["nombre"],
+            apellido=normalized["apellido"],
+            personas=int(normalized.get("personas", 1) or 1),
+            fecha_ingreso=fecha_ingreso,
+            fecha_egreso=fecha_egreso,
+            monto_total=_valor(fila.monto_total),
+            senia=_valor(fila.senia),
+            resto=_valor(fila.resto),
+            cantidad_habitaciones=int(normalized.get("cantidad_habitaciones", 1) or 1),
+            telefono=str(normalized.get("telefono", "")),
+            celiacos=_valor(fila.celiacos),
+            observaciones=str(normalized.get("observaciones", "")),
+            origen=str(normalized.get("origen", "")),
+        )
+        # bulk_create no llama a save(): calcular noches, precio por noche y resto
+        reserva.calcular_campos()
+        return reserva
+
+    def _error(self, row: Dict[str, Any], e: Exception) -> None:
+        self.resumen["errores"] += 1
+        self.resumen["detalles_error"].append(f"{_etiqueta_fila(row)}: {e}")
+
+    def procesar_lote(self, lote: List[Dict[str, Any]]) -> None:
+        filas = self._parsear(lote)
+        # En un dry run no se inserta nada: hay que validar contra la base.
+        # Con la restricción de exclusión el INSERT rechaza los solapamientos,
+        # pero no los duplicados de 0 noches (rango vacío)
+        existentes = self._precargar_reservas(
+            filas, solo_sin_noches=not self.dry_run and solapamiento_en_base()
+        )
+
+        pendientes: List[Tuple[Dict[str, Any], Reserva]] = []
+        for fila in filas:
+            self.resumen["procesadas"] += 1
+            try:
+                if fila.error is not None:
+                    raise fila.error
+                normalized = fila.normalized
+
+                habitacion = self._obtener_habitacion(normalized)
+
+                fecha_ingreso = _valor(fila.ingreso)
+                fecha_egreso = _valor(fila.egreso)
+                if fecha_egreso < fecha_ingreso:
+                    raise ValueError(
+                        f"Fechas inválidas: el check-out ({fecha_egreso}) es anterior al check-in ({fecha_ingreso})"
+                    )
+
+                # Las habitaciones que sólo existirían en un dry run no tienen id
+                ocupadas = existentes.setdefault(
+                    habitacion.id or ("nueva", habitacion.numero), []
+                )
+
+                # Validar solapamiento (contra la base y contra filas previas)
+                if any(
+                    ingreso < fecha_egreso and egreso > fecha_ingreso
+                    for ingreso, egreso, _, _ in ocupadas
+                ):
+                    raise ValueError(
+                        f"Solapamiento: ya existe una reserva en {habitacion.numero} entre {fecha_ingreso} y {fecha_egreso}"
+                    )
+
+                # Duplicado exacto
+                clave = (
+                    fecha_ingreso,
+                    fecha_egreso,
+                    str(normalized["nombre"]),
+                    str(normalized["apellido"]),
+                )
+                if clave in ocupadas:
+                    raise ValueError(
+                        f"Duplicada: {normalized['nombre']} {normalized['apellido']} en {habitacion.numero} con mismas fechas"
+                    )
+
+                reserva = self._construir_reserva(
+                    fila, habitacion, fecha_ingreso, fecha_egreso
+                )
+                ocupadas.append(clave)
+                pendientes.append((fila.row, reserva))
+            except Exception as e:
+                self._error(fila.row, e)
+
+        self._insertar(pendientes)
+
+    def _insertar(self, pendientes: List[Tuple[Dict[str, Any], Reserva]]) -> None:
+        if not pendientes:
+            return
+        if self.dry_run:
+            self.resumen["creadas"] += len(pendientes)
+            return
+        reservas = [reserva for _, reserva in pendientes]
+        try:
+            with transaction.atomic():
+                creadas = Reserva.objects.bulk_create(reservas)
+        except Exception:
+            # Si el lote falla, reintentar fila por fila para reportar el error exacto
+            creadas = []
+            for row, reserva in pendientes:
+                try:
+                    with transaction.atomic():
+                        reserva.save()
+                    creadas.append(reserva)
+                except IntegrityError as e:
+                    if es_error_solapamiento(e):
+                        e = ValueError(
+                            f"Solapamiento: ya existe una reserva en {reserva.nhabitacion.numero} entre {reserva.fecha_ingreso} y {reserva.fecha_egreso}"
+                        )
+                    self._error(row, e)
+                except Exception as e:
+                    self._error(row, e)
+        self.resumen["creadas"] += len(creadas)
+        if creadas:
+            reservas_creadas_en_lote.send(sender=Reserva, reservas=creadas)
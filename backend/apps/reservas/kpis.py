@@ -0,0 +1,284 @@
+"""KPIs de ocupación e ingresos calculados en la base de datos.
+
+Para cada reserva que solapa el rango se recortan sus noches al rango
+(`Greatest`/`Least` sobre las fechas) y se prorratea el ingreso por noche;
+la base devuelve directamente las sumas. Los valores son los mismos que
+daba el recorrido en Python de EstadisticasKpiView:
+
+- noches vendidas = noches dentro del rango × cantidad de habitaciones
+- ingreso de una reserva = precio por noche × noches dentro del rango ×
+  cantidad de habitaciones (si no tiene precio por noche se usa
+  monto_total / noches)
+
+Las series por día/semana/mes (`serie_kpis`) traen las reservas del rango en
+una consulta y las barren una sola vez: cada reserva suma su cantidad e
+ingreso por noche el día de ingreso y los resta el día de egreso, y el
+acumulado de cada día se agrupa en los intervalos pedidos.
+
+Con `KPIS_DESDE_OCUPACION=True` los totales se leen de la tabla de hechos
+OcupacionDiaria (ver ocupacion.py), sumando por fecha sobre un índice.
+
+KpisTests (tests.py) compara ambos caminos y las series contra el recorrido
+anterior; el comando `benchmark_kpis` sólo mide tiempos.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, Least, NullIf
+
+from .models import Habitacion, Reserva
+from .ocupacion import totales_ocupacion, totales_por_dia
+
+GRANULARIDADES = ("day", "week", "month")
+# Máximo de intervalos por serie (unos 3 años por día)
+MAX_PUNTOS_SERIE = 1100
+
+
+class DiasEntre(Func):
+    """Días entre dos fechas (fin - inicio) como entero"""
+
+    arity = 2
+    output_field = IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL: la resta de dos date ya es un entero de días
+        return super().as_sql(
+            compiler, connection, template="(%(expressions)s)", arg_joiner=" - "
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function="DATEDIFF")
+
+
+def noches_en_rango(desde: date, hasta_exclusivo: date):
+    """Expresión: noches de la reserva dentro de [desde, hasta_exclusivo)"""
+    return Greatest(
+        DiasEntre(
+            Least(F("fecha_egreso"), Value(hasta_exclusivo)),
+            Greatest(F("fecha_ingreso"), Value(desde)),
+        ),
+        Value(0),
+    )
+
+
+def cantidad_efectiva():
+    """cantidad_habitaciones, contando 0 como 1"""
+    return Coalesce(NullIf(F("cantidad_habitaciones"), Value(0)), Value(1))
+
+
+def precio_noche_efectivo():
+    """precio_por_noche, o monto_total / noches si no está cargado"""
+    return Case(
+        When(
+            Q(precio_por_noche__isnull=True) | Q(precio_por_noche=0),
+            then=Case(
+                When(noches=0, then=Value(0.0)),
+                default=F("monto_total") / Cast("noches", FloatField()),
+                output_field=FloatField(),
+            ),
+        ),
+        default=F("precio_por_noche"),
+        output_field=FloatField(),
+    )
+
+
+def totales_rango(start_date: date, end_date: date) -> Dict[str, float]:
+    """noches_vendidas e ingresos_totales de [start_date, end_date] en una consulta"""
+    if settings.KPIS_DESDE_OCUPACION:
+        return totales_ocupacion(start_date, end_date)
+    fin = end_date + timedelta(days=1)
+    noches = noches_en_rango(start_date, fin)
+    vendidas = noches * cantidad_efectiva()
+    totales = Reserva.objects.filter(
+        fecha_ingreso__lt=fin, fecha_egreso__gt=start_date
+    ).aggregate(
+        noches_vendidas=Sum(vendidas, output_field=IntegerField()),
+        ingresos_totales=Sum(
+            precio_noche_efectivo() * Cast(vendidas, FloatField()),
+            output_field=FloatField(),
+        ),
+    )
+    return {
+        "noches_vendidas": int(totales["noches_vendidas"] or 0),
+        "ingresos_totales": float(totales["ingresos_totales"] or 0.0),
+    }
+
+
+def calcular_kpis(
+    start_date: date, end_date: date, total_habitaciones: Optional[int] = None
+) -> Dict[str, Any]:
+    """KPIs del rango [start_date, end_date] (ambos inclusive), sin redondear"""
+    if total_habitaciones is None:
+        total_habitaciones = Habitacion.objects.count()
+    totales = totales_rango(start_date, end_date)
+    return kpis_desde_totales(
+        totales["noches_vendidas"],
+        totales["ingresos_totales"],
+        (end_date - start_date).days + 1,
+        total_habitaciones,
+    )
+
+
+def kpis_desde_totales(
+    noches_vendidas: int,
+    ingresos_totales: float,
+    num_dias: int,
+    total_habitaciones: int,
+) -> Dict[str, Any]:
+    habitaciones_disponibles_noches = total_habitaciones * num_dias
+    ocupacion = (
+        (noches_vendidas / habitaciones_disponibles_noches)
+        if habitaciones_disponibles_noches
+        else 0.0
+    )
+    adr = (ingresos_totales / noches_vendidas) if noches_vendidas else 0.0
+    revpar = (
+        (ingresos_totales / habitaciones_disponibles_noches)
+        if habitaciones_disponibles_noches
+        else 0.0
+    )
+    return {
+        "ingresos_totales": ingresos_totales,
+        "noches_vendidas": noches_vendidas,
+        "ocupacion": float(ocupacion),
+        "adr": adr,
+        "revpar": revpar,
+        "num_dias": num_dias,
+        "habitaciones_disponibles_noches": habitaciones_disponibles_noches,
+    }
+
+
+def _inicio_intervalo(dia: date, granularity: str) -> date:
+    if granularity == "week":
+        return dia - timedelta(days=dia.weekday())
+    if granularity == "month":
+        return dia.replace(day=1)
+    return dia
+
+
+def cantidad_intervalos(start_date: date, end_date: date, granularity: str) -> int:
+    if granularity == "month":
+        return (
+            (end_date.year - start_date.year) * 12
+            + end_date.month
+            - start_date.month
+            + 1
+        )
+    if granularity == "week":
+        return (
+            _inicio_intervalo(end_date, "week") - _inicio_intervalo(start_date, "week")
+        ).days // 7 + 1
+    return (end_date - start_date).days + 1
+
+
+def totales_diarios(start_date: date, end_date: date) -> Tuple[List[int], List[float]]:
+    """Noches vendidas e ingresos de cada día de [start_date, end_date]"""
+    num_dias = (end_date - start_date).days + 1
+    if settings.KPIS_DESDE_OCUPACION:
+        por_dia = totales_por_dia(start_date, end_date)
+        dias = [
+            por_dia.get(start_date + timedelta(days=i), (0, 0.0))
+            for i in range(num_dias)
+        ]
+        return [d[0] for d in dias], [d[1] for d in dias]
+
+    delta_noches = [0] * (num_dias + 1)
+    delta_ingresos = [0.0] * (num_dias + 1)
+
+    reservas = (
+        Reserva.objects.filter(
+            fecha_ingreso__lt=end_date + timedelta(days=1),
+            fecha_egreso__gt=start_date,
+        )
+        .annotate(
+            kpi_precio_noche=precio_noche_efectivo(),
+            kpi_cantidad=cantidad_efectiva(),
+        )
+        .values_list(
+            "fecha_ingreso", "fecha_egreso", "kpi_precio_noche", "kpi_cantidad"
+        )
+    )
+    for ingreso, egreso, precio_noche, cantidad in reservas:
+        desde = max((ingreso - start_date).days, 0)
+        hasta = min((egreso - start_date).days, num_dias)
+        if hasta <= desde:
+            continue
+        delta_noches[desde] += cantidad
+        delta_noches[hasta] -= cantidad
+        delta_ingresos[desde] += precio_noche * cantidad
+        delta_ingresos[hasta] -= precio_noche * cantidad
+
+    noches = []
+    ingresos = []
+    activas = 0
+    ingreso_diario = 0.0
+    for i in range(num_dias):
+        activas += delta_noches[i]
+        ingreso_diario += delta_ingresos[i]
+        if activas == 0:
+            # Sin reservas activas: descartar el residuo de redondeo
+            ingreso_diario = 0.0
+        noches.append(activas)
+        ingresos.append(ingreso_diario)
+    return noches, ingresos
+
+
+def serie_kpis(
+    start_date: date,
+    end_date: date,
+    granularity: str,
+    total_habitaciones: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """KPIs por día, semana (lunes a domingo) o mes dentro de [start_date, end_date].
+
+    Los intervalos de los extremos se recortan al rango pedido.
+    """
+    if total_habitaciones is None:
+        total_habitaciones = Habitacion.objects.count()
+    noches, ingresos = totales_diarios(start_date, end_date)
+
+    serie = []
+    actual = None
+    for i, (noches_dia, ingresos_dia) in enumerate(zip(noches, ingresos)):
+        dia = start_date + timedelta(days=i)
+        inicio = _inicio_intervalo(dia, granularity)
+        if actual is None or actual["inicio"] != inicio:
+            actual = {"inicio": inicio, "desde": dia, "noches": 0, "ingresos": 0.0}
+            serie.append(actual)
+        actual["hasta"] = dia
+        actual["noches"] += noches_dia
+        actual["ingresos"] += ingresos_dia
+
+    resultado = []
+    for intervalo in serie:
+        kpis = kpis_desde_totales(
+            intervalo["noches"],
+            intervalo["ingresos"],
+            (intervalo["hasta"] - intervalo["desde"]).days + 1,
+            total_habitaciones,
+        )
+        kpis["inicio"] = intervalo["desde"]
+        kpis["fin"] = intervalo["hasta"]
+        resultado.append(kpis)
+    return resultado
@@ -0,0 +1,98 @@
+"""Reporte de limpieza por día.
+
+Se arma con dos consultas (estadías activas y salidas del rango) y el cruce
+con las habitaciones se hace en memoria. Por cada día clasifica:
+
+- a_limpiar: habitación libre de la que se fue un pasajero ese día
+- a_pasajero: habitación ocupada, repaso normal
+- a_limpiar_pasajero: 4ª noche o más y le queda al menos una noche más
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Reserva
+
+# Máximo de días por consulta (una semana o un mes de cronograma)
+MAX_DIAS_LIMPIEZA = 31
+
+
+def _habitacion_dict(habitacion_id: int, datos: Tuple[str, str]) -> Dict[str, Any]:
+    numero, tipo = datos
+    return {"id": habitacion_id, "numero": numero, "tipo": tipo}
+
+
+def reporte_limpieza(desde: date, hasta: date) -> List[Dict[str, Any]]:
+    """Reporte de limpieza para cada día de [desde, hasta]"""
+    num_dias = (hasta - desde).days + 1
+    habitaciones: Dict[int, Tuple[str, str]] = {}
+
+    # Estadías activas en algún día del rango. Si una habitación tiene más de
+    # una reserva activa el mismo día, vale la de menor id.
+    estadias: Dict[int, List[Optional[Tuple[date, date]]]] = {}
+    activas = (
+        Reserva.objects.filter(fecha_ingreso__lte=hasta, fecha_egreso__gt=desde)
+        .order_by("id")
+        .values_list(
+            "nhabitacion_id",
+            "nhabitacion__numero",
+            "nhabitacion__tipo",
+            "fecha_ingreso",
+            "fecha_egreso",
+        )
+    )
+    for habitacion_id, numero, tipo, ingreso, egreso in activas:
+        habitaciones[habitacion_id] = (numero, tipo)
+        celdas = estadias.setdefault(habitacion_id, [None] * num_dias)
+        inicio = max((ingreso - desde).days, 0)
+        fin = min((egreso - desde).days, num_dias)
+        for i in range(inicio, fin):
+            if celdas[i] is None:
+                celdas[i] = (ingreso, egreso)
+
+    # Salidas de cada día del rango
+    salidas: Dict[int, set] = defaultdict(set)
+    egresos = (
+        Reserva.objects.filter(fecha_egreso__gte=desde, fecha_egreso__lte=hasta)
+        .values_list(
+            "nhabitacion_id", "nhabitacion__numero", "nhabitacion__tipo", "fecha_egreso"
+        )
+        .distinct()
+    )
+    for habitacion_id, numero, tipo, egreso in egresos:
+        habitaciones[habitacion_id] = (numero, tipo)
+        salidas[(egreso - desde).days].add(habitacion_id)
+
+    orden = sorted(habitaciones)
+    dias = []
+    for i in range(num_dias):
+        fecha = desde + timedelta(days=i)
+        a_limpiar = []
+        a_pasajero = []
+        a_limpiar_pasajero = []
+        for habitacion_id in orden:
+            celdas = estadias.get(habitacion_id)
+            estadia = celdas[i] if celdas else None
+            if estadia is not None:
+                ingreso, egreso = estadia
+                noches_estadia = (fecha - ingreso).days
+                item = _habitacion_dict(habitacion_id, habitaciones[habitacion_id])
+                item["noches_estadia"] = noches_estadia + 1
+                if noches_estadia >= 3 and egreso > fecha + timedelta(days=1):
+                    a_limpiar_pasajero.append(item)
+                else:
+                    a_pasajero.append(item)
+            elif habitacion_id in salidas.get(i, ()):
+                a_limpiar.append(
+                    _habitacion_dict(habitacion_id, habitaciones[habitacion_id])
+                )
+        dias.append(
+            {
+                "a_limpiar": a_limpiar,
+                "a_pasajero": a_pasajero,
+                "a_limpiar_pasajero": a_limpiar_pasajero,
+                "fecha": fecha.isoformat(),
+            }
+        )
+    return dias
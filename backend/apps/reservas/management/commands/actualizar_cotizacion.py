@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reservas.cotizacion import actualizar_cotizacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Consulta la cotización del dólar y la guarda en la base "
+        "(la página de inicio sólo lee el valor guardado)"
+    )
+
+    def handle(self, *args, **options):
+        cotizacion = actualizar_cotizacion()
+        if cotizacion is None:
+            raise CommandError(
+                "No se pudo obtener la cotización; se conserva la anterior"
+            )
+        actualizada = datetime.fromtimestamp(cotizacion["actualizada"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Cotización {cotizacion['valor']} ({actualizada:%Y-%m-%d %H:%M:%S})"
+            )
+        )
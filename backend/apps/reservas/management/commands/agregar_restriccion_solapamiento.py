@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from apps.reservas.restricciones import (
+    NOMBRE_RESTRICCION,
+    agregar_restriccion,
+    reservas_solapadas,
+    solapamiento_en_base,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        f"Agrega la restricción {NOMBRE_RESTRICCION} (PostgreSQL) que la "
+        "migración 0010 omite si hay reservas solapadas; con --listar sólo "
+        "muestra los solapamientos a corregir"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--listar",
+            action="store_true",
+            help="Sólo listar las reservas solapadas, sin modificar la base",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        solapadas = list(reservas_solapadas(using))
+        for reserva in solapadas:
+            self.stdout.write(
+                f"  Habitación {reserva.nhabitacion.numero}: reserva {reserva.id} "
+                f"({reserva.nombre} {reserva.apellido}) "
+                f"{reserva.fecha_ingreso} - {reserva.fecha_egreso}"
+            )
+        if options["listar"]:
+            self.stdout.write(f"{len(solapadas)} reservas solapadas")
+            return
+        if solapadas:
+            raise CommandError(
+                f"{len(solapadas)} reservas solapadas: corregirlas antes de "
+                "agregar la restricción"
+            )
+        if solapamiento_en_base(using):
+            self.stdout.write(f"{NOMBRE_RESTRICCION} ya existe")
+            return
+        try:
+            agregar_restriccion(using)
+        except (ValueError, DatabaseError) as e:
+            raise CommandError(f"{NOMBRE_RESTRICCION} no se agregó: {e}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{NOMBRE_RESTRICCION} agregada; reiniciar la aplicación para "
+                "que deje de validar los solapamientos en Python"
+            )
+        )
@@ -0,0 +1,128 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.reservas.management.datos_sinteticos import (
+    Revertir,
+    crear_habitaciones,
+    crear_reservas,
+)
+from apps.reservas.models import Reserva
+from apps.reservas.restricciones import NOMBRE_RESTRICCION, solapamiento_en_base
+
+
+def consultas(habitacion_id, dia):
+    """Consultas representativas de los endpoints (check-ins, check-outs,
+    solapamiento de una habitación y ventana de planning)"""
+    fin = dia + timedelta(days=5)
+    return [
+        ("check-ins del día", Reserva.objects.filter(fecha_ingreso=dia)),
+        ("check-outs del día", Reserva.objects.filter(fecha_egreso=dia)),
+        (
+            "solapamiento de habitación",
+            Reserva.objects.filter(
+                nhabitacion_id=habitacion_id,
+                fecha_ingreso__lt=fin,
+                fecha_egreso__gt=dia,
+            ),
+        ),
+        (
+            "ventana de planning (14 días)",
+            Reserva.objects.filter(
+                fecha_ingreso__lte=dia + timedelta(days=13), fecha_egreso__gte=dia
+            ),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra el plan y el tiempo de las consultas por fecha de Reserva sin "
+        "y con los índices (los datos y los cambios se revierten al terminar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habitaciones", type=int, default=100)
+        parser.add_argument("--anios", type=int, default=3)
+        parser.add_argument("--repeticiones", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        desde = date(date.today().year - options["anios"] + 1, 1, 1)
+        dias = (date(desde.year + options["anios"], 1, 1) - desde).days
+
+        try:
+            with transaction.atomic():
+                habitaciones = crear_habitaciones(options["habitaciones"], rng)
+                n_reservas = crear_reservas(habitaciones, desde, dias, rng)
+                self.stdout.write(
+                    f"{n_reservas} reservas en {len(habitaciones)} habitaciones "
+                    f"({connection.vendor})"
+                )
+                # Estadísticas actualizadas, como en una base en uso
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"ANALYZE {connection.ops.quote_name(Reserva._meta.db_table)}"
+                    )
+                habitacion_id = habitaciones[len(habitaciones) // 2].id
+                dia = desde + timedelta(days=dias // 2)
+
+                # Primero con los índices; después se borran dentro de la
+                # transacción para medir la situación anterior
+                despues = self._medir(habitacion_id, dia, options["repeticiones"], 1)
+                self._quitar_indices()
+                antes = self._medir(habitacion_id, dia, options["repeticiones"], 2)
+
+                for (nombre, plan_antes, t_antes), (_, plan_despues, t_despues) in zip(
+                    antes, despues
+                ):
+                    self.stdout.write(self.style.MIGRATE_HEADING(nombre))
+                    self.stdout.write(f"  antes:   {t_antes * 1000:.3f} ms")
+                    self.stdout.write(self._sangrar(plan_antes))
+                    self.stdout.write(f"  después: {t_despues * 1000:.3f} ms")
+                    self.stdout.write(self._sangrar(plan_despues))
+                raise Revertir()
+        except Revertir:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finalizado"))
+
+    def _medir(self, habitacion_id, dia, repeticiones, fase):
+        resultados = []
+        for nombre, queryset in consultas(habitacion_id, dia):
+            plan = self._plan(queryset, fase)
+            list(queryset.values_list("id", flat=True))
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                list(queryset.values_list("id", flat=True))
+            duracion = (time.perf_counter() - inicio) / repeticiones
+            resultados.append((nombre, plan, duracion))
+        return resultados
+
+    def _plan(self, queryset, fase):
+        """EXPLAIN de la consulta. El texto varía según la fase porque SQLite
+        reutiliza el plan de una sentencia cacheada aunque se borre un índice"""
+        sql, params = queryset.query.sql_with_params()
+        prefijo = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefijo} {sql}{' ' * fase}", params)
+            return "\n".join(
+                " ".join(str(columna) for columna in fila) for fila in cursor.fetchall()
+            )
+
+    def _quitar_indices(self):
+        tabla = connection.ops.quote_name(Reserva._meta.db_table)
+        with connection.cursor() as cursor:
+            for indice in Reserva._meta.indexes:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(indice.name)}")
+            if solapamiento_en_base():
+                cursor.execute(
+                    f"ALTER TABLE {tabla} DROP CONSTRAINT {NOMBRE_RESTRICCION}"
+                )
+
+    def _sangrar(self, plan):
+        return "\n".join(f"    {linea}" for linea in plan.splitlines())
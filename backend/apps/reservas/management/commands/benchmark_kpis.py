@@ -0,0 +1,142 @@
+import math
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.test.utils import override_settings
+
+from apps.reservas.kpis import calcular_kpis, kpis_desde_totales, serie_kpis
+from apps.reservas.management.commands.benchmark_planning import medir
+from apps.reservas.management.datos_sinteticos import (
+    Revertir,
+    crear_habitaciones,
+    crear_reservas,
+)
+from apps.reservas.models import Habitacion, Reserva
+
+
+def kpis_anterior(start_date, end_date):
+    """Recorrido original en Python sobre las reservas que solapan el rango"""
+    total_habitaciones = Habitacion.objects.count()
+    reservas = Reserva.objects.filter(
+        fecha_ingreso__lt=end_date + timedelta(days=1),
+        fecha_egreso__gt=start_date,
+    ).only(
+        "fecha_ingreso",
+        "fecha_egreso",
+        "precio_por_noche",
+        "monto_total",
+        "noches",
+        "cantidad_habitaciones",
+    )
+    num_dias = (end_date - start_date).days + 1
+    noches_vendidas = 0
+    ingresos_totales = 0.0
+    for r in reservas:
+        effective_start = max(r.fecha_ingreso, start_date)
+        effective_end = min(r.fecha_egreso, end_date + timedelta(days=1))
+        nights = max(0, (effective_end - effective_start).days)
+        if nights <= 0:
+            continue
+        cantidad = getattr(r, "cantidad_habitaciones", 1) or 1
+        noches_vendidas += nights * cantidad
+        ppx = getattr(r, "precio_por_noche", None)
+        if ppx is None or ppx == 0:
+            ppx = (float(r.monto_total) / r.noches) if getattr(r, "noches", 0) else 0.0
+        ingresos_totales += float(ppx) * nights * cantidad
+    return kpis_desde_totales(
+        noches_vendidas, ingresos_totales, num_dias, total_habitaciones
+    )
+
+
+def diferencias(anterior, nuevo):
+    """Campos que no coinciden (los montos admiten error de redondeo)"""
+    distintos = []
+    for campo, valor in anterior.items():
+        if isinstance(valor, float):
+            if not math.isclose(valor, nuevo[campo], rel_tol=1e-9, abs_tol=1e-6):
+                distintos.append(campo)
+        elif valor != nuevo[campo]:
+            distintos.append(campo)
+    return distintos
+
+
+def variar_datos(rng):
+    """Casos borde: sin precio por noche, cantidad 0 o >1, fechas invertidas"""
+    ids = list(
+        Reserva.objects.filter(encargado="benchmark").values_list("id", flat=True)
+    )
+    Reserva.objects.filter(id__in=rng.sample(ids, len(ids) // 5)).update(
+        precio_por_noche=0
+    )
+    for cantidad in (0, 2, 3):
+        Reserva.objects.filter(id__in=rng.sample(ids, len(ids) // 10)).update(
+            cantidad_habitaciones=cantidad
+        )
+    Reserva.objects.filter(id__in=rng.sample(ids, len(ids) // 50)).update(
+        fecha_egreso=F("fecha_ingreso") - timedelta(days=2)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el motor de KPIs en SQL contra el recorrido anterior en un rango "
+        "de varios años con datos sintéticos (se revierten al terminar). La "
+        "comparación de resultados está en KpisTests (tests.py)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habitaciones", type=int, default=100)
+        parser.add_argument("--anios", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        desde = date(date.today().year - options["anios"] + 1, 1, 1)
+        dias = (date(desde.year + options["anios"], 1, 1) - desde).days
+
+        try:
+            with transaction.atomic():
+                habitaciones = crear_habitaciones(options["habitaciones"], rng)
+                n_reservas = crear_reservas(habitaciones, desde, dias, rng)
+                variar_datos(rng)
+
+                fin = desde + timedelta(days=dias - 1)
+                _, t_ant, q_ant = medir(kpis_anterior, desde, fin)
+                _, t_nuevo, q_nuevo = medir(calcular_kpis, desde, fin)
+                self.stdout.write(
+                    f"{desde} - {fin} ({options['anios']} años, {n_reservas} reservas) | "
+                    f"anterior: {t_ant * 1000:.1f} ms, {q_ant} consultas | "
+                    f"SQL: {t_nuevo * 1000:.1f} ms, {q_nuevo} consultas | "
+                    f"x{t_ant / t_nuevo:.1f}"
+                )
+                self._medir_ocupacion(desde, fin, t_nuevo)
+                self._medir_serie(desde)
+                raise Revertir()
+        except Revertir:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finalizado"))
+
+    def _medir_ocupacion(self, desde, fin, t_sql):
+        """Los mismos KPIs leídos de la tabla OcupacionDiaria"""
+        with override_settings(KPIS_DESDE_OCUPACION=True):
+            _, t_tabla, q_tabla = medir(calcular_kpis, desde, fin)
+        self.stdout.write(
+            f"OcupacionDiaria: {t_tabla * 1000:.1f} ms, {q_tabla} consultas | "
+            f"x{t_sql / t_tabla:.1f} respecto de SQL sobre reservas"
+        )
+
+    def _medir_serie(self, desde):
+        fin = date(desde.year, 12, 31)
+        _, t_total, _ = medir(kpis_anterior, desde, fin)
+        _, t_sql, _ = medir(calcular_kpis, desde, fin)
+        serie, t_serie, q_serie = medir(serie_kpis, desde, fin, "day")
+        self.stdout.write(
+            f"Año {desde.year}: total anterior {t_total * 1000:.1f} ms | "
+            f"total SQL {t_sql * 1000:.1f} ms | "
+            f"serie diaria ({len(serie)} días) {t_serie * 1000:.1f} ms, "
+            f"{q_serie} consultas"
+        )
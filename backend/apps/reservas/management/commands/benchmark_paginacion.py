@@ -0,0 +1,138 @@
+import random
+import statistics
+import time
+from datetime import date
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from rest_framework.pagination import Cursor
+from rest_framework.settings import api_settings
+
+from apps.reservas.management.datos_sinteticos import (
+    Revertir,
+    crear_habitaciones,
+    crear_reservas,
+)
+from apps.reservas.models import Reserva
+from apps.reservas.paginacion import ReservaCursorPagination
+
+
+def cursor_desde(posicion, reverse=False):
+    """Valor del parámetro cursor que empieza después de `posicion`"""
+    paginacion = ReservaCursorPagination()
+    paginacion.base_url = "http://testserver/"
+    url = paginacion.encode_cursor(
+        Cursor(offset=0, reverse=reverse, position=str(posicion))
+    )
+    return parse_qs(urlparse(url).query)["cursor"][0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el costo de la primera y de una página profunda del listado de "
+        "reservas con paginación por número y por cursor (los datos se revierten)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habitaciones", type=int, default=100)
+        parser.add_argument("--anios", type=int, default=10)
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        desde = date(date.today().year - options["anios"] + 1, 1, 1)
+        dias = (date(desde.year + options["anios"], 1, 1) - desde).days
+        # El mismo tamaño que la paginación por número, para comparar páginas
+        page_size = api_settings.PAGE_SIZE
+
+        try:
+            with transaction.atomic():
+                habitaciones = crear_habitaciones(options["habitaciones"], rng)
+                crear_reservas(habitaciones, desde, dias, rng)
+                total = Reserva.objects.count()
+                usuario = User.objects.create_superuser(
+                    "benchmark_paginacion", password=None
+                )
+                client = Client(HTTP_ACCEPT="application/json")
+                client.force_login(usuario)
+                self.client = client
+                self.repeticiones = options["repeticiones"]
+
+                ultima = (total - 1) // page_size + 1
+                ids = list(Reserva.objects.order_by("-id").values_list("id", flat=True))
+                # Última fila de la página anterior a la última
+                posicion = ids[(ultima - 1) * page_size - 1]
+
+                base = f"/api/reservas/?page_size={page_size}"
+                numero_1, t_num_1 = self._medir("/api/reservas/?page=1")
+                numero_n, t_num_n = self._medir(f"/api/reservas/?page={ultima}")
+                cursor_1, t_cur_1 = self._medir(f"{base}&paginacion=cursor")
+                cursor_n, t_cur_n = self._medir(
+                    f"{base}&cursor={cursor_desde(posicion)}"
+                )
+
+                for por_numero, por_cursor in (
+                    (numero_1, cursor_1),
+                    (numero_n, cursor_n),
+                ):
+                    if [r["id"] for r in por_numero["results"]] != [
+                        r["id"] for r in por_cursor["results"]
+                    ]:
+                        raise CommandError("Las páginas por cursor no coinciden")
+
+                _, t_fecha_1 = self._medir(
+                    f"{base}&paginacion=cursor&orden=fecha_ingreso"
+                )
+                ultimo_anio = desde.replace(year=desde.year + options["anios"] - 1)
+                _, t_fecha_n = self._medir(
+                    f"{base}&orden=fecha_ingreso&cursor={cursor_desde(ultimo_anio)}"
+                )
+
+                # Búsqueda de un huésped puntual (índices de la migración 0011)
+                buscado = f"Huesped{total // 2}"
+                encontrado, t_busqueda = self._medir(
+                    f"{base}&paginacion=cursor&q={buscado}"
+                )
+                if not any(
+                    r["nombre_completo"] == f"{buscado} Sintetico"
+                    for r in encontrado["results"]
+                ):
+                    raise CommandError(f"La búsqueda no encontró a {buscado}")
+
+                self.stdout.write(f"{total} reservas, {ultima} páginas de {page_size}")
+                self.stdout.write(
+                    f"número: página 1 {t_num_1 * 1000:.1f} ms | "
+                    f"página {ultima} {t_num_n * 1000:.1f} ms"
+                )
+                self.stdout.write(
+                    f"cursor -id: página 1 {t_cur_1 * 1000:.1f} ms | "
+                    f"página {ultima} {t_cur_n * 1000:.1f} ms"
+                )
+                self.stdout.write(
+                    f"cursor fecha_ingreso: primera {t_fecha_1 * 1000:.1f} ms | "
+                    f"último año {t_fecha_n * 1000:.1f} ms"
+                )
+                self.stdout.write(
+                    f"búsqueda q={buscado}: {len(encontrado['results'])} "
+                    f"resultados en {t_busqueda * 1000:.1f} ms"
+                )
+                raise Revertir()
+        except Revertir:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finalizado"))
+
+    def _medir(self, url):
+        """Mediana de varias llamadas al endpoint (respuesta, segundos)"""
+        tiempos = []
+        for _ in range(self.repeticiones):
+            inicio = time.perf_counter()
+            response = self.client.get(url)
+            tiempos.append(time.perf_counter() - inicio)
+            if response.status_code != 200:
+                raise CommandError(f"{url}: {response.status_code}")
+        return response.json(), statistics.median(tiempos)
@@ -0,0 +1,157 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from apps.reservas.management.datos_sinteticos import (
+    Revertir,
+    crear_habitaciones,
+    crear_reservas,
+)
+from apps.reservas.models import Habitacion, Reserva
+from apps.reservas.planning import (
+    DIAS_PLANNING,
+    construir_planning,
+    construir_planning_runs,
+)
+
+
+def planning_anterior(first_day, num_dias, orden=None):
+    """Recorrido original (una consulta por habitación y un escaneo por día).
+
+    Las reservas de cada habitación no tenían ORDER BY: si dos se pisan, la
+    celda queda con la primera que devuelva la base. Con `orden` (p. ej.
+    "id") se fija ese orden (ver PlanningTests en tests.py).
+    """
+    days = [first_day + timedelta(days=i) for i in range(num_dias)]
+    habitaciones = list(Habitacion.objects.all())
+    tipo_orden = {"doble": 1, "triple": 2, "cuadruple": 3, "quintuple": 4}
+    habitaciones.sort(key=lambda x: tipo_orden.get(x.tipo, 5))
+    reservas = Reserva.objects.filter(
+        fecha_ingreso__lte=days[-1], fecha_egreso__gte=days[0]
+    ).select_related("nhabitacion")
+
+    planning_data = []
+    for habitacion in habitaciones:
+        ocupaciones = []
+        nombre_mostrado = set()
+        reservas_habitacion = reservas.filter(nhabitacion=habitacion)
+        if orden:
+            reservas_habitacion = reservas_habitacion.order_by(orden)
+        for day in days:
+            ocupacion = None
+            for reserva in reservas_habitacion:
+                if reserva.fecha_ingreso <= day < reserva.fecha_egreso:
+                    mostrar = (
+                        day == reserva.fecha_ingreso
+                        and reserva.id not in nombre_mostrado
+                    )
+                    if mostrar:
+                        nombre_mostrado.add(reserva.id)
+                    ocupacion = {
+                        "is_occupied": True,
+                        "is_last_night": day
+                        == reserva.fecha_egreso - timedelta(days=1),
+                        "nombre": reserva.nombre if mostrar else None,
+                        "reserva_id": reserva.id,
+                        "fecha_ingreso": reserva.fecha_ingreso.isoformat(),
+                        "fecha_egreso": reserva.fecha_egreso.isoformat(),
+                    }
+                    break
+            if not ocupacion:
+                ocupacion = {
+                    "is_occupied": False,
+                    "is_last_night": False,
+                    "nombre": None,
+                    "reserva_id": None,
+                    "fecha_ingreso": None,
+                    "fecha_egreso": None,
+                }
+            ocupaciones.append(ocupacion)
+        planning_data.append(
+            {
+                "habitacion": {
+                    "id": habitacion.id,
+                    "numero": habitacion.numero,
+                    "tipo": habitacion.tipo,
+                    "piso": habitacion.piso,
+                },
+                "ocupaciones": ocupaciones,
+            }
+        )
+    return {
+        "planning": planning_data,
+        "days": [day.isoformat() for day in days],
+        "first_day": first_day.isoformat(),
+    }
+
+
+def medir(func, *args):
+    with CaptureQueriesContext(connection) as ctx:
+        inicio = time.perf_counter()
+        resultado = func(*args)
+        duracion = time.perf_counter() - inicio
+    return resultado, duracion, len(ctx.captured_queries)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el motor de planning contra el recorrido anterior con datos "
+        "sintéticos (se revierten al terminar). La comparación de resultados "
+        "está en PlanningTests (tests.py)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--habitaciones",
+            type=int,
+            nargs="+",
+            default=[25, 50, 100, 200],
+            help="Cantidades de habitaciones a medir",
+        )
+        parser.add_argument("--dias", type=int, default=DIAS_PLANNING)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--sin-anterior",
+            action="store_true",
+            help="No ejecutar el recorrido anterior (útil con muchas habitaciones)",
+        )
+
+    def handle(self, *args, **options):
+        first_day = date.today().replace(day=1)
+        dias = options["dias"]
+
+        for cantidad in options["habitaciones"]:
+            rng = random.Random(options["seed"])
+            try:
+                with transaction.atomic():
+                    habitaciones = crear_habitaciones(cantidad, rng)
+                    n_reservas = crear_reservas(
+                        habitaciones, first_day - timedelta(days=30), dias + 60, rng
+                    )
+                    nuevo, t_nuevo, q_nuevo = medir(construir_planning, first_day, dias)
+                    runs, t_runs, _ = medir(construir_planning_runs, first_day, dias)
+                    bytes_nuevo = len(JSONRenderer().render(nuevo))
+                    bytes_runs = len(JSONRenderer().render(runs))
+                    linea = (
+                        f"habitaciones={cantidad} reservas={n_reservas} | "
+                        f"motor: {t_nuevo * 1000:.1f} ms, {q_nuevo} consultas, "
+                        f"{bytes_nuevo} bytes | runs: {t_runs * 1000:.1f} ms, "
+                        f"{bytes_runs} bytes (x{bytes_nuevo / bytes_runs:.1f} menor)"
+                    )
+                    if not options["sin_anterior"]:
+                        _, t_ant, q_ant = medir(planning_anterior, first_day, dias)
+                        linea += (
+                            f" | anterior: {t_ant * 1000:.1f} ms, {q_ant} consultas"
+                            f" | x{t_ant / t_nuevo:.1f}"
+                        )
+                    self.stdout.write(linea)
+                    raise Revertir()
+            except Revertir:
+                pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finalizado"))
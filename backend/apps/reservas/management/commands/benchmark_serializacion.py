@@ -0,0 +1,138 @@
+import random
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.reservas.filas import DEFINICIONES, serializar_filas
+from apps.reservas.management.datos_sinteticos import (
+    Revertir,
+    crear_habitaciones,
+    crear_reservas,
+)
+from apps.reservas.models import Habitacion, Reserva
+
+
+def mediana(func, repeticiones):
+    """Mediana en segundos de varias ejecuciones de func()"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        func()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def queryset_modelo(serializer_class):
+    modelo = serializer_class.Meta.model
+    if modelo is Reserva:
+        return Reserva.objects.select_related("nhabitacion").order_by("id")
+    return modelo.objects.order_by("id")
+
+
+def con_serializer(serializer_class, queryset, **kwargs):
+    """Camino actual: instancias del modelo y ModelSerializer"""
+    return serializer_class(queryset, many=True, **kwargs).data
+
+
+def diferencias_salida(serializer_class, queryset):
+    """Campos con salida distinta entre el serializer y las filas de .values().
+
+    Compara el JSON renderizado (mismos valores, tipos y orden de campos),
+    con todos los campos y con cada campo por separado (?fields=).
+    """
+    definicion = DEFINICIONES[serializer_class]
+    render = JSONRenderer().render
+    distintos = []
+    if render(con_serializer(serializer_class, queryset)) != render(
+        serializar_filas(queryset, definicion)
+    ):
+        distintos.append("(todos)")
+    for nombre in definicion:
+        esperado = con_serializer(serializer_class, queryset, campos=[nombre])
+        if render(esperado) != render(
+            serializar_filas(queryset, definicion, campos=[nombre])
+        ):
+            distintos.append(nombre)
+    return distintos
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que la serialización rápida desde .values() (filas.py) dé la "
+        "misma salida que los serializers de DRF y compara el costo por fila "
+        "(los datos sintéticos se revierten)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habitaciones", type=int, default=60)
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=365,
+            help="Días de reservas sintéticas a generar (0 = sólo datos existentes)",
+        )
+        parser.add_argument(
+            "--filas",
+            type=int,
+            default=2000,
+            help="Reservas por medición",
+        )
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        try:
+            with transaction.atomic():
+                if options["dias"] > 0:
+                    habitaciones = crear_habitaciones(options["habitaciones"], rng)
+                    crear_reservas(habitaciones, date.today(), options["dias"], rng)
+                self._verificar()
+                self._medir(options["filas"], options["repeticiones"])
+                raise Revertir()
+        except Revertir:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finalizado"))
+
+    def _verificar(self):
+        total = Reserva.objects.count()
+        self.stdout.write(
+            f"Paridad sobre {total} reservas y {Habitacion.objects.count()} "
+            "habitaciones"
+        )
+        for serializer_class in DEFINICIONES:
+            distintos = diferencias_salida(
+                serializer_class, queryset_modelo(serializer_class)
+            )
+            if distintos:
+                raise CommandError(
+                    f"{serializer_class.__name__}: salida distinta en "
+                    f"{', '.join(distintos)}"
+                )
+            self.stdout.write(f"  {serializer_class.__name__}: idéntica")
+
+    def _medir(self, filas, repeticiones):
+        for serializer_class in DEFINICIONES:
+            queryset = queryset_modelo(serializer_class)[:filas]
+            cantidad = queryset.count()
+            if not cantidad:
+                continue
+            definicion = DEFINICIONES[serializer_class]
+            t_serializer = mediana(
+                lambda: con_serializer(serializer_class, queryset.all()),
+                repeticiones,
+            )
+            t_filas = mediana(
+                lambda: serializar_filas(queryset.all(), definicion), repeticiones
+            )
+            self.stdout.write(
+                f"{serializer_class.__name__} ({cantidad} filas): "
+                f"serializer {t_serializer / cantidad * 1e6:.1f} µs/fila | "
+                f"values() {t_filas / cantidad * 1e6:.1f} µs/fila | "
+                f"x{t_serializer / t_filas:.1f}"
+            )
@@ -0,0 +1,84 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reservas.exportacion_vouchers import (
+    FORMATOS,
+    exportar_vouchers,
+    reservas_para_exportar,
+)
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f"Fecha inválida: {valor} (YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los vouchers de varias reservas (por ids o por fecha de "
+        "ingreso) en un ZIP con un PDF por reserva o en un solo PDF"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ids", help="IDs de reservas separados por comas (en lugar de fechas)"
+        )
+        parser.add_argument(
+            "--desde", type=_fecha, help="Fecha de ingreso inicial (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--hasta",
+            type=_fecha,
+            help="Fecha de ingreso final, inclusive (por defecto igual a --desde)",
+        )
+        parser.add_argument("--formato", choices=FORMATOS, default="zip")
+        parser.add_argument(
+            "--procesos",
+            type=int,
+            default=settings.VOUCHERS_EXPORTACION_PROCESOS,
+            help="Procesos que generan los PDFs en paralelo",
+        )
+        parser.add_argument(
+            "--salida",
+            help="Archivo de salida (por defecto vouchers_<fecha>.<formato>)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            ids = [int(x) for x in (options["ids"] or "").split(",") if x.strip()]
+        except ValueError:
+            raise CommandError("Formato de ids inválido")
+        try:
+            reservas = reservas_para_exportar(ids, options["desde"], options["hasta"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not reservas:
+            raise CommandError("No hay reservas para exportar")
+
+        formato = options["formato"]
+        salida = options["salida"]
+        if not salida:
+            sufijo = (
+                options["desde"].isoformat() if options["desde"] and not ids else "ids"
+            )
+            salida = f"vouchers_{sufijo}.{formato}"
+
+        try:
+            bloques = exportar_vouchers(reservas, formato, options["procesos"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        inicio = time.perf_counter()
+        with open(salida, "wb") as archivo:
+            for bloque in bloques:
+                archivo.write(bloque)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(reservas)} vouchers en {salida} "
+                f"({time.perf_counter() - inicio:.1f} s)"
+            )
+        )
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.reservas.tareas_importacion import (
+    ejecutar_importacion,
+    importaciones_pendientes,
+    recuperar_importaciones,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa las importaciones de reservas pendientes (y marca como "
+        "fallidas las interrumpidas). Se usa como worker cuando "
+        "IMPORTACIONES_WORKERS=0 (sin hilos en el proceso web)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--continuo",
+            action="store_true",
+            help="Seguir esperando nuevas importaciones en lugar de terminar",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=5.0,
+            help="Segundos entre consultas en modo continuo",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            recuperadas = recuperar_importaciones()
+            if recuperadas:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{recuperadas} importaciones interrumpidas marcadas como fallidas"
+                    )
+                )
+            for importacion_id in list(
+                importaciones_pendientes().values_list("id", flat=True)
+            ):
+                resumen = ejecutar_importacion(importacion_id)
+                if resumen is not None:
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f"Importación {importacion_id}: procesadas={resumen['procesadas']}, creadas={resumen['creadas']}, errores={resumen['errores']}"
+                        )
+                    )
+            if not options["continuo"]:
+                break
+            time.sleep(options["intervalo"])
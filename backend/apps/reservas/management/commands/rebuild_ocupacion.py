@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reservas.ocupacion import diferencias_ocupacion, reconstruir_ocupacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la tabla OcupacionDiaria desde las reservas (carga inicial "
+        "o después de escrituras que no pasan por el ORM)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verificar",
+            action="store_true",
+            help="Sólo comparar la tabla con las reservas, sin modificarla",
+        )
+
+    def handle(self, *args, **options):
+        if options["verificar"]:
+            errores = diferencias_ocupacion()
+            if errores:
+                for error in errores[:20]:
+                    self.stderr.write(error)
+                raise CommandError(
+                    f"{len(errores)} filas de ocupación no coinciden con las reservas"
+                )
+            self.stdout.write(
+                self.style.SUCCESS("La tabla de ocupación coincide con las reservas")
+            )
+            return
+
+        reservas, filas = reconstruir_ocupacion()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ocupación reconstruida: {reservas} reservas, {filas} filas"
+            )
+        )
@@ -0,0 +1,102 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.reservas.management.conteo_consultas import verificar_consultas_fijas
+from apps.reservas.management.datos_sinteticos import (
+    Revertir,
+    crear_habitaciones,
+    crear_reservas,
+)
+from apps.reservas.models import Reserva
+
+VERSION = 1
+
+
+def consultas_esperadas(habitacion_id, reserva_id):
+    """Consultas de cada endpoint, sin contar sesión ni autenticación.
+
+    Todos menos usuarios leen además la versión de datos para el ETag
+    (VERSION, ver condicional.py).
+    """
+    hoy = date.today().isoformat()
+    return {
+        # COUNT + página
+        "/api/reservas/": VERSION + 2,
+        "/api/reservas/?paginacion=cursor": VERSION + 1,
+        "/api/reservas/?fields=id,nombre_completo": VERSION + 2,
+        f"/api/reservas/{reserva_id}/": VERSION + 1,
+        "/api/reservas/hoy/": VERSION + 1,
+        "/api/reservas/checkins_hoy/": VERSION + 1,
+        "/api/reservas/checkouts_hoy/": VERSION + 1,
+        f"/api/reservas/por_habitacion/?habitacion_id={habitacion_id}": VERSION + 1,
+        # activas, total de personas, entradas y salidas
+        f"/api/reservas/por_fecha/?fecha={hoy}": VERSION + 4,
+        "/api/habitaciones/": VERSION + 2,
+        # el listado imprime el queryset y el total antes de serializar
+        "/api/usuarios/": 3,
+        # últimas, check-ins, check-outs y habitaciones
+        "/api/dashboard/": VERSION + 4,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que los endpoints de lectura ejecuten una cantidad fija de "
+        "consultas al crecer la cantidad de filas (sin N+1; los datos se revierten)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rondas",
+            type=int,
+            default=3,
+            help="Veces que se agregan datos y se vuelve a medir",
+        )
+        parser.add_argument("--habitaciones", type=int, default=15)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        desde = date.today() - timedelta(days=30)
+        mediciones = {}
+        errores = []
+
+        try:
+            with transaction.atomic():
+                usuario = User.objects.create_superuser(
+                    "verificar_consultas", password=None
+                )
+                for ronda in range(1, options["rondas"] + 1):
+                    habitaciones = crear_habitaciones(options["habitaciones"], rng)
+                    crear_reservas(habitaciones, desde, 60, rng)
+                    User.objects.bulk_create(
+                        [
+                            User(username=f"verificar_consultas_{ronda}_{i}")
+                            for i in range(options["habitaciones"])
+                        ]
+                    )
+                    esperadas = consultas_esperadas(
+                        habitaciones[0].id, Reserva.objects.latest("id").id
+                    )
+                    # Los endpoints con id cambian en cada ronda: se comparan
+                    # contra lo esperado pero no entre rondas
+                    self.stdout.write(
+                        f"Ronda {ronda}: {Reserva.objects.count()} reservas, "
+                        f"{User.objects.count()} usuarios"
+                    )
+                    errores.extend(
+                        verificar_consultas_fijas(esperadas, usuario, mediciones)
+                    )
+                raise Revertir()
+        except Revertir:
+            pass
+
+        for url, conteos in mediciones.items():
+            self.stdout.write(f"  {url}: {conteos}")
+        if errores:
+            raise CommandError("\n".join(errores))
+        self.stdout.write(self.style.SUCCESS("Consultas fijas en todos los endpoints"))
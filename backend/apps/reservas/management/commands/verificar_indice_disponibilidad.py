@@ -0,0 +1,93 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from apps.reservas.disponibilidad import indice_disponibilidad, tipos_para_personas
+from apps.reservas.models import Habitacion, Reserva
+
+
+def disponibles_db(fecha_ingreso, fecha_egreso, personas):
+    """Consulta original de HabitacionViewSet.disponibles contra la base"""
+    habitaciones = Habitacion.objects.all()
+    if personas is not None:
+        habitaciones = habitaciones.filter(tipo__in=tipos_para_personas(personas))
+    ocupadas = Reserva.objects.filter(
+        fecha_ingreso__lt=fecha_egreso, fecha_egreso__gt=fecha_ingreso
+    ).values_list("nhabitacion_id", flat=True)
+    return set(habitaciones.exclude(id__in=ocupadas).values_list("id", flat=True))
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que el índice de disponibilidad en memoria coincida con la base: "
+        "compara los rangos por habitación y consultas de disponibilidad al azar"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--consultas",
+            type=int,
+            default=200,
+            help="Cantidad de rangos al azar a comparar",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        indice = indice_disponibilidad
+        indice.invalidar()
+        diferencias = []
+
+        # 1) Rangos por habitación (el índice sólo carga las que terminan
+        # desde su primer día)
+        desde = indice.desde()
+        habitaciones_indice = {h.id for h in indice.habitaciones()}
+        habitaciones_db = set(Habitacion.objects.values_list("id", flat=True))
+        if habitaciones_indice != habitaciones_db:
+            diferencias.append(
+                f"Habitaciones distintas: solo índice={sorted(habitaciones_indice - habitaciones_db)}, "
+                f"solo base={sorted(habitaciones_db - habitaciones_indice)}"
+            )
+        for habitacion_id in sorted(habitaciones_db):
+            reservas = Reserva.objects.filter(nhabitacion_id=habitacion_id)
+            if desde is not None:
+                reservas = reservas.filter(fecha_egreso__gte=desde)
+            rangos_db = sorted(
+                reservas.values_list("fecha_ingreso", "fecha_egreso", "id")
+            )
+            if indice.rangos(habitacion_id) != rangos_db:
+                diferencias.append(f"Rangos distintos en habitación id={habitacion_id}")
+
+        # 2) Consultas de disponibilidad al azar
+        limites = Reserva.objects.aggregate(
+            desde=Min("fecha_ingreso"), hasta=Max("fecha_egreso")
+        )
+        if limites["desde"] and limites["hasta"]:
+            rng = random.Random(options["seed"])
+            span = max((limites["hasta"] - limites["desde"]).days, 1)
+            for _ in range(options["consultas"]):
+                ingreso = limites["desde"] + timedelta(days=rng.randint(-5, span))
+                egreso = ingreso + timedelta(days=rng.randint(1, 14))
+                personas = rng.choice([None, 1, 2, 3, 4, 5])
+                en_indice = {
+                    h.id for h in indice.disponibles(ingreso, egreso, personas)
+                }
+                en_db = disponibles_db(ingreso, egreso, personas)
+                if en_indice != en_db:
+                    diferencias.append(
+                        f"Disponibles distintas para {ingreso}..{egreso} personas={personas}: "
+                        f"solo índice={sorted(en_indice - en_db)}, solo base={sorted(en_db - en_indice)}"
+                    )
+
+        if diferencias:
+            for d in diferencias:
+                self.stderr.write(self.style.WARNING(d))
+            raise CommandError(f"Índice inconsistente: {len(diferencias)} diferencias")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Índice consistente: {len(habitaciones_db)} habitaciones, "
+                f"{options['consultas']} consultas comparadas"
+            )
+        )
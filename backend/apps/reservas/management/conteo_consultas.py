@@ -0,0 +1,94 @@
+"""Conteo de consultas SQL por endpoint.
+
+Se usa para verificar que un endpoint ejecute siempre la misma cantidad de
+consultas, tenga 10 o 10.000 filas (sin N+1). Cuenta con
+`connection.execute_wrapper`, así que no depende de DEBUG ni de
+`connection.queries` (que Django vacía al empezar cada pedido).
+
+Los pedidos se hacen con APIRequestFactory y force_authenticate: no se
+cuentan las consultas de la sesión ni del usuario, sólo las de la vista.
+
+Lo usan el comando `verificar_consultas` y, con ConsultasFijasMixin, los
+tests (tests.py), para que un N+1 haga fallar `manage.py test`.
+"""
+
+from typing import Dict, List
+
+from django.db import connection
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.reservas.cache_respuestas import incrementar_version_datos
+
+
+class ContadorConsultas:
+    """Context manager que registra las consultas ejecutadas"""
+
+    def __init__(self):
+        self.consultas: List[str] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.consultas.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._wrapper.__exit__(*exc)
+
+    @property
+    def total(self) -> int:
+        return len(self.consultas)
+
+
+def consultas_endpoint(url: str, usuario) -> ContadorConsultas:
+    """Hace un GET a `url` y devuelve las consultas que ejecutó la vista.
+
+    Invalida antes el cache de respuestas para que se construya de nuevo.
+    """
+    incrementar_version_datos()
+    request = APIRequestFactory().get(url, HTTP_ACCEPT="application/json")
+    force_authenticate(request, usuario)
+    coincidencia = resolve(request.path_info)
+    with ContadorConsultas() as contador:
+        response = coincidencia.func(request, *coincidencia.args, **coincidencia.kwargs)
+        response.render()
+    if response.status_code != 200:
+        raise AssertionError(f"{url}: respuesta {response.status_code}")
+    return contador
+
+
+def verificar_consultas_fijas(
+    esperadas: Dict[str, int], usuario, mediciones: Dict[str, List[int]]
+) -> List[str]:
+    """Mide cada endpoint y acumula los conteos en `mediciones`.
+
+    Devuelve los errores: endpoints que no ejecutaron las consultas
+    esperadas (o cuyo conteo cambió respecto de una medición anterior).
+    """
+    errores = []
+    for url, cantidad in esperadas.items():
+        total = consultas_endpoint(url, usuario).total
+        anteriores = mediciones.setdefault(url, [])
+        if total != cantidad or any(previo != total for previo in anteriores):
+            errores.append(
+                f"{url}: {total} consultas (esperadas {cantidad}, "
+                f"anteriores {anteriores})"
+            )
+        anteriores.append(total)
+    return errores
+
+
+class ConsultasFijasMixin:
+    """Para TestCase: `assertConsultasFijas` falla si algún endpoint no
+    ejecuta las consultas esperadas o si el conteo cambia entre llamadas"""
+
+    def assertConsultasFijas(
+        self, esperadas: Dict[str, int], usuario, mediciones: Dict[str, List[int]]
+    ) -> None:
+        errores = verificar_consultas_fijas(esperadas, usuario, mediciones)
+        if errores:
+            self.fail("\n".join(errores))
@@ -0,0 +1,71 @@
+"""Generación de datos sintéticos para los comandos de benchmark.
+
+Los comandos crean los datos dentro de una transacción que luego revierten,
+por lo que la base queda intacta al terminar.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import List
+
+from apps.reservas.models import Habitacion, Reserva
+
+TIPOS = ["doble", "triple", "cuadruple", "quintuple"]
+
+
+class Revertir(Exception):
+    """Se lanza al final del benchmark para descartar los datos generados"""
+
+
+def crear_habitaciones(cantidad: int, rng: random.Random) -> List[Habitacion]:
+    return Habitacion.objects.bulk_create(
+        [
+            Habitacion(
+                numero=f"B{i:04d}",
+                tipo=rng.choice(TIPOS),
+                piso=f"piso {i // 20}",
+            )
+            for i in range(cantidad)
+        ]
+    )
+
+
+def crear_reservas(
+    habitaciones: List[Habitacion],
+    desde: date,
+    dias: int,
+    rng: random.Random,
+    max_noches: int = 7,
+    max_hueco: int = 4,
+) -> int:
+    """Crea reservas sin solapamiento por habitación cubriendo [desde, desde+dias)"""
+    hasta = desde + timedelta(days=dias)
+    reservas = []
+    for habitacion in habitaciones:
+        actual = desde - timedelta(days=rng.randint(0, max_noches))
+        while actual < hasta:
+            noches = rng.randint(1, max_noches)
+            monto = float(rng.randint(20, 200) * 1000)
+            senia = round(monto * 0.3, 2)
+            reservas.append(
+                Reserva(
+                    encargado="benchmark",
+                    nhabitacion=habitacion,
+                    nombre=f"Huesped{len(reservas)}",
+                    apellido="Sintetico",
+                    personas=rng.randint(1, 5),
+                    fecha_ingreso=actual,
+                    fecha_egreso=actual + timedelta(days=noches),
+                    noches=noches,
+                    precio_por_noche=monto / noches,
+                    monto_total=monto,
+                    senia=senia,
+                    resto=monto - senia,
+                    cantidad_habitaciones=1,
+                    telefono="0",
+                    origen=rng.choice(["Booking", "Directo", "Despegar"]),
+                )
+            )
+            actual += timedelta(days=noches + rng.randint(0, max_hueco))
+    Reserva.objects.bulk_create(reservas, batch_size=1000)
+    return len(reservas)
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0006_perfilusuario"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportacionReserva",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nombre_archivo", models.CharField(max_length=255)),
+                (
+                    "formato",
+                    models.CharField(
+                        choices=[("csv", "CSV"), ("xlsx", "Excel")], max_length=10
+                    ),
+                ),
+                ("ruta_archivo", models.CharField(max_length=500)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("procesando", "Procesando"),
+                            ("completada", "Completada"),
+                            ("fallida", "Fallida"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                    ),
+                ),
+                ("procesadas", models.IntegerField(default=0)),
+                ("creadas", models.IntegerField(default=0)),
+                ("errores", models.IntegerField(default=0)),
+                ("resultado", models.JSONField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("fecha_creacion", models.DateTimeField(auto_now_add=True)),
+                ("fecha_inicio", models.DateTimeField(blank=True, null=True)),
+                ("fecha_fin", models.DateTimeField(blank=True, null=True)),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="importaciones",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Importación de Reservas",
+                "verbose_name_plural": "Importaciones de Reservas",
+                "ordering": ["-fecha_creacion"],
+            },
+        ),
+    ]
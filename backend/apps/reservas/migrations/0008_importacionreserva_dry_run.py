@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0007_importacionreserva"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importacionreserva",
+            name="dry_run",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0008_importacionreserva_dry_run"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OcupacionDiaria",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fecha", models.DateField()),
+                ("personas", models.IntegerField(default=1)),
+                ("cantidad_habitaciones", models.IntegerField(default=1)),
+                ("ingreso", models.FloatField(default=0)),
+                (
+                    "habitacion",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ocupacion_diaria",
+                        to="reservas.habitacion",
+                    ),
+                ),
+                (
+                    "reserva",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ocupacion_diaria",
+                        to="reservas.reserva",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ocupación Diaria",
+                "verbose_name_plural": "Ocupación Diaria",
+                "indexes": [
+                    models.Index(fields=["fecha"], name="ocupacion_fecha_idx"),
+                    models.Index(
+                        fields=["habitacion", "fecha"], name="ocupacion_hab_fecha_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="ocupaciondiaria",
+            constraint=models.UniqueConstraint(
+                fields=("reserva", "fecha"), name="ocupacion_reserva_fecha_unica"
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:15
+
+import logging
+
+from django.db import DatabaseError, migrations, models, transaction
+
+logger = logging.getLogger(__name__)
+
+RESTRICCION = "reserva_sin_solapamiento"
+RANGO = "daterange(fecha_ingreso, GREATEST(fecha_egreso, fecha_ingreso), '[)')"
+
+
+def agregar_restriccion(apps, schema_editor):
+    """Restricción de exclusión contra reservas solapadas (sólo PostgreSQL).
+
+    No se agrega si ya hay solapamientos o si no se puede usar btree_gist:
+    en ese caso siguen valiendo las validaciones en Python y se puede
+    agregar después con el comando `agregar_restriccion_solapamiento`.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    tabla = schema_editor.quote_name(
+        apps.get_model("reservas", "Reserva")._meta.db_table
+    )
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+                cursor.execute(
+                    f"SELECT EXISTS (SELECT 1 FROM {tabla} a JOIN {tabla} b"
+                    " ON a.nhabitacion_id = b.nhabitacion_id AND a.id < b.id"
+                    " AND a.fecha_ingreso < b.fecha_egreso"
+                    " AND b.fecha_ingreso < a.fecha_egreso)"
+                )
+                if cursor.fetchone()[0]:
+                    logger.warning(
+                        "%s no se agregó: hay reservas solapadas (corregirlas y "
+                        "ejecutar agregar_restriccion_solapamiento)",
+                        RESTRICCION,
+                    )
+                    return
+                cursor.execute(
+                    f"ALTER TABLE {tabla} ADD CONSTRAINT {RESTRICCION} "
+                    f"EXCLUDE USING gist (nhabitacion_id WITH =, {RANGO} WITH &&)"
+                )
+    except DatabaseError as e:
+        logger.warning("%s no se agregó: %s", RESTRICCION, e)
+
+
+def quitar_restriccion(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    tabla = schema_editor.quote_name(
+        apps.get_model("reservas", "Reserva")._meta.db_table
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {tabla} DROP CONSTRAINT IF EXISTS {RESTRICCION}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0009_ocupaciondiaria"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(fields=["fecha_ingreso"], name="reserva_ingreso_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(fields=["fecha_egreso"], name="reserva_egreso_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(
+                fields=["nhabitacion", "fecha_ingreso", "fecha_egreso"],
+                name="reserva_hab_fechas_idx",
+            ),
+        ),
+        migrations.RunPython(agregar_restriccion, quitar_restriccion),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:40
+
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+# Columnas de la búsqueda por huésped y teléfono (ver paginacion.py)
+COLUMNAS = ("nombre", "apellido", "telefono")
+
+
+def _nombre_indice(columna):
+    return f"reserva_{columna}_busq_idx"
+
+
+def agregar_indices(apps, schema_editor):
+    """Índices para buscar huéspedes sin recorrer toda la tabla.
+
+    PostgreSQL: GIN con pg_trgm sobre UPPER(columna::text), la misma
+    expresión que genera icontains, así que sirve para LIKE '%texto%'.
+    SQLite: índices con COLLATE NOCASE, que el optimizador usa para los
+    LIKE por prefijo (istartswith). Otras bases quedan sin índice.
+    """
+    conexion = schema_editor.connection
+    tabla = schema_editor.quote_name(
+        apps.get_model("reservas", "Reserva")._meta.db_table
+    )
+    if conexion.vendor == "postgresql":
+        try:
+            with transaction.atomic(using=conexion.alias):
+                with conexion.cursor() as cursor:
+                    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                    for columna in COLUMNAS:
+                        cursor.execute(
+                            f"CREATE INDEX IF NOT EXISTS {_nombre_indice(columna)} "
+                            f"ON {tabla} USING gin "
+                            f"((UPPER({columna}::text)) gin_trgm_ops)"
+                        )
+        except DatabaseError as e:
+            logger.warning("Índices de búsqueda no agregados: %s", e)
+    elif conexion.vendor == "sqlite":
+        with conexion.cursor() as cursor:
+            for columna in COLUMNAS:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_nombre_indice(columna)} "
+                    f"ON {tabla} ({columna} COLLATE NOCASE)"
+                )
+
+
+def quitar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor not in ("postgresql", "sqlite"):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for columna in COLUMNAS:
+            cursor.execute(f"DROP INDEX IF EXISTS {_nombre_indice(columna)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0010_indices_reserva"),
+    ]
+
+    operations = [
+        migrations.RunPython(agregar_indices, quitar_indices),
+    ]
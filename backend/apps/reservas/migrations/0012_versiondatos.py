@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:59
+
+import time
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def crear_fila(apps, schema_editor):
+    # Versión inicial basada en la hora: no valida ETags de antes del deploy
+    apps.get_model("reservas", "VersionDatos").objects.using(
+        schema_editor.connection.alias
+    ).get_or_create(
+        pk=1,
+        defaults={"version": int(time.time() * 1000), "modificado": timezone.now()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0011_indices_busqueda"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionDatos",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+                ("modificado", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Versión de Datos",
+                "verbose_name_plural": "Versión de Datos",
+            },
+        ),
+        migrations.RunPython(crear_fila, migrations.RunPython.noop),
+    ]
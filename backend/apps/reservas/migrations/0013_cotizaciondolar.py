@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0012_versiondatos"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CotizacionDolar",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("valor", models.CharField(max_length=50)),
+                ("actualizada", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Cotización del Dólar",
+                "verbose_name_plural": "Cotización del Dólar",
+            },
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 class Habitacion(models.Model):
@@ -9,6 +9,33 @@ class Habitacion(models.Model):
     def __str__(self):
         return self.numero
 
+class ReservaQuerySet(models.QuerySet):
+    """Mantiene OcupacionDiaria también en las escrituras masivas del ORM
+    (update y bulk_create no llaman a save ni disparan post_save) y avisa
+    de los update con la señal reservas_actualizadas_en_lote"""
+
+    def update(self, **kwargs):
+        from .ocupacion import CAMPOS_OCUPACION, actualizar_ocupacion
+        from .signals import reservas_actualizadas_en_lote
+
+        with transaction.atomic(using=self.db):
+            ids = list(self.values_list('id', flat=True))
+            filas = super().update(**kwargs)
+            if CAMPOS_OCUPACION.intersection(kwargs):
+                actualizar_ocupacion(ids)
+        if ids:
+            reservas_actualizadas_en_lote.send(sender=Reserva, ids=ids)
+        return filas
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .ocupacion import registrar_ocupacion
+
+        with transaction.atomic(using=self.db):
+            creadas = super().bulk_create(objs, *args, **kwargs)
+            registrar_ocupacion(creadas)
+        return creadas
+
+
 class Reserva(models.Model):
     encargado = models.CharField(max_length=100, null=False)
     nhabitacion = models.ForeignKey(Habitacion, on_delete=models.CASCADE)
@@ -28,19 +55,35 @@ class Reserva(models.Model):
     observaciones = models.TextField(blank=True, null=False)
     origen = models.CharField(max_length=100, null=False)
 
+    objects = ReservaQuerySet.as_manager()
+
     def __str__(self):
         return f'{self.nombre} {self.apellido} - Habitación {self.nhabitacion.numero}'
 
 
-    def save(self, *args, **kwargs):
+    def calcular_campos(self):
+        """Calcula noches, precio por noche y resto (también para bulk_create)"""
         self.noches = (self.fecha_egreso - self.fecha_ingreso).days
         self.precio_por_noche = self.monto_total / self.noches if self.noches else 0
         self.resto = self.monto_total - self.senia
+
+    def save(self, *args, **kwargs):
+        self.calcular_campos()
         super().save(*args, **kwargs)
 
     def get_nombre_huesped(self):
         return self.nombre
 
+    class Meta:
+        # Patrones de acceso reales: check-ins del día, check-outs del día y
+        # solapamiento de una habitación con un rango de fechas. En PostgreSQL
+        # además hay una restricción de exclusión (ver restricciones.py).
+        indexes = [
+            models.Index(fields=['fecha_ingreso'], name='reserva_ingreso_idx'),
+            models.Index(fields=['fecha_egreso'], name='reserva_egreso_idx'),
+            models.Index(fields=['nhabitacion', 'fecha_ingreso', 'fecha_egreso'], name='reserva_hab_fechas_idx'),
+        ]
+
 class PerfilUsuario(models.Model):
     ROLES_CHOICES = [
         ('conserge', 'Conserje'),
@@ -67,4 +110,106 @@ class PerfilUsuario(models.Model):
     
     class Meta:
         verbose_name = "Perfil de Usuario"
-        verbose_name_plural = "Perfiles de Usuario"
\ No newline at end of file
+        verbose_name_plural = "Perfiles de Usuario"
+
+class OcupacionDiaria(models.Model):
+    """Una fila por habitación y noche ocupada (ver ocupacion.py)"""
+
+    habitacion = models.ForeignKey(Habitacion, on_delete=models.CASCADE, related_name='ocupacion_diaria')
+    reserva = models.ForeignKey(Reserva, on_delete=models.CASCADE, related_name='ocupacion_diaria')
+    fecha = models.DateField()
+    personas = models.IntegerField(default=1)
+    cantidad_habitaciones = models.IntegerField(default=1)
+    # Ingreso prorrateado de la noche (precio por noche × cantidad de habitaciones)
+    ingreso = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.habitacion} - {self.fecha}"
+
+    class Meta:
+        verbose_name = "Ocupación Diaria"
+        verbose_name_plural = "Ocupación Diaria"
+        constraints = [
+            models.UniqueConstraint(fields=['reserva', 'fecha'], name='ocupacion_reserva_fecha_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha'], name='ocupacion_fecha_idx'),
+            models.Index(fields=['habitacion', 'fecha'], name='ocupacion_hab_fecha_idx'),
+        ]
+
+
+class VersionDatos(models.Model):
+    """Fila única con la versión de los datos de reservas y habitaciones.
+
+    Está en la base (y no en el cache) para que la vean todos los procesos:
+    web, worker de importaciones, comandos y shells (ver cache_respuestas.py).
+    """
+
+    version = models.BigIntegerField(default=0)
+    modificado = models.DateTimeField()
+
+    def __str__(self):
+        return f"v{self.version} ({self.modificado})"
+
+    class Meta:
+        verbose_name = "Versión de Datos"
+        verbose_name_plural = "Versión de Datos"
+
+
+class CotizacionDolar(models.Model):
+    """Última cotización del dólar obtenida (fila única, ver cotizacion.py).
+
+    En la base para que el valor que guarda el comando `actualizar_cotizacion`
+    lo lean todos los procesos web.
+    """
+
+    valor = models.CharField(max_length=50)
+    actualizada = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.valor} ({self.actualizada})"
+
+    class Meta:
+        verbose_name = "Cotización del Dólar"
+        verbose_name_plural = "Cotización del Dólar"
+
+
+class ImportacionReserva(models.Model):
+    """Importación de reservas en segundo plano (ver tareas_importacion.py)"""
+
+    ESTADOS_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completada', 'Completada'),
+        ('fallida', 'Fallida'),
+    ]
+
+    FORMATOS_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+    ]
+
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='importaciones')
+    nombre_archivo = models.CharField(max_length=255)
+    formato = models.CharField(max_length=10, choices=FORMATOS_CHOICES)
+    ruta_archivo = models.CharField(max_length=500)
+    # Sólo validar: no crea reservas ni habitaciones
+    dry_run = models.BooleanField(default=False)
+    estado = models.CharField(max_length=20, choices=ESTADOS_CHOICES, default='pendiente')
+    procesadas = models.IntegerField(default=0)
+    creadas = models.IntegerField(default=0)
+    errores = models.IntegerField(default=0)
+    # Resumen final, con la misma forma que devolvía /reservas/importar/
+    resultado = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.nombre_archivo} ({self.get_estado_display()})"
+
+    class Meta:
+        verbose_name = "Importación de Reservas"
+        verbose_name_plural = "Importaciones de Reservas"
+        ordering = ['-fecha_creacion']
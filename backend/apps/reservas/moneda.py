@@ -0,0 +1,44 @@
+"""Formato de importes en pesos (es-AR): `$1.234.567,50`.
+
+Un solo formateador para las vistas HTML (filtro `moneda` de
+templatetags/moneda.py) y la API (`MonedaField`). Se formatea al renderizar,
+no al armar el contexto: las plantillas sólo formatean las filas que
+muestran. Los importes se repiten mucho (precios por noche, señas), así que
+el resultado se guarda en un lru_cache por valor.
+"""
+
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from rest_framework import serializers
+
+# "1,234.50" -> "1.234,50" en una sola pasada
+_SEPARADORES_ES_AR = str.maketrans({",": ".", ".": ","})
+
+
+@lru_cache(maxsize=4096)
+def _formatear(valor: Decimal) -> str:
+    return "${:,.2f}".format(valor).translate(_SEPARADORES_ES_AR)
+
+
+def formato_moneda(valor) -> str:
+    """Importe con separador de miles `.` y decimales `,`; "" si no hay valor"""
+    if valor is None or valor == "":
+        return ""
+    try:
+        if not isinstance(valor, Decimal):
+            valor = Decimal(str(valor))
+        return _formatear(valor)
+    except InvalidOperation:
+        return str(valor)
+
+
+class MonedaField(serializers.Field):
+    """Importe formateado en es-AR, de sólo lectura"""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return formato_moneda(value)
@@ -0,0 +1,202 @@
+"""Tabla de hechos OcupacionDiaria: una fila por reserva y noche ocupada.
+
+Se mantiene en forma incremental:
+
+- `Reserva.save()` (alta o modificación): signal post_save en signals.py
+- `Reserva.objects.bulk_create()` y `.update()`: ReservaQuerySet en models.py
+- borrado de reservas o habitaciones: cascada de las claves foráneas
+
+Cada fila guarda la habitación, la fecha de la noche, las personas, la
+cantidad de habitaciones efectiva (0 cuenta como 1) y el ingreso de esa
+noche, calculado igual que en kpis.py (precio por noche, o monto_total /
+noches si no está cargado, por la cantidad de habitaciones). Para cargar o
+reconstruir la tabla completa se usa el comando `rebuild_ocupacion`.
+"""
+
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import OcupacionDiaria, Reserva
+
+# Campos de Reserva de los que dependen las filas de ocupación
+CAMPOS_OCUPACION = frozenset(
+    {
+        "nhabitacion",
+        "nhabitacion_id",
+        "fecha_ingreso",
+        "fecha_egreso",
+        "personas",
+        "noches",
+        "precio_por_noche",
+        "monto_total",
+        "cantidad_habitaciones",
+    }
+)
+CAMPOS_VALORES = (
+    "id",
+    "nhabitacion_id",
+    "fecha_ingreso",
+    "fecha_egreso",
+    "personas",
+    "noches",
+    "precio_por_noche",
+    "monto_total",
+    "cantidad_habitaciones",
+)
+# Reservas por consulta/inserción (límite de parámetros de SQLite)
+TAMANIO_LOTE = 500
+
+
+def _filas(
+    reserva_id,
+    habitacion_id,
+    ingreso,
+    egreso,
+    personas,
+    noches,
+    precio,
+    monto,
+    cantidad,
+) -> Iterator[OcupacionDiaria]:
+    cantidad = cantidad or 1
+    if not precio:
+        precio = (float(monto) / noches) if noches else 0.0
+    ingreso_noche = float(precio) * cantidad
+    for i in range((egreso - ingreso).days):
+        yield OcupacionDiaria(
+            reserva_id=reserva_id,
+            habitacion_id=habitacion_id,
+            fecha=ingreso + timedelta(days=i),
+            personas=personas,
+            cantidad_habitaciones=cantidad,
+            ingreso=ingreso_noche,
+        )
+
+
+def filas_de_reserva(reserva: Reserva) -> List[OcupacionDiaria]:
+    """Filas de ocupación de una reserva (ninguna si las fechas están invertidas)"""
+    return list(_filas(*(getattr(reserva, campo) for campo in CAMPOS_VALORES)))
+
+
+def _lotes(ids: Sequence[int]) -> Iterator[Sequence[int]]:
+    for i in range(0, len(ids), TAMANIO_LOTE):
+        yield ids[i : i + TAMANIO_LOTE]
+
+
+def _insertar(valores: Iterable[Tuple]) -> int:
+    filas = [fila for reserva in valores for fila in _filas(*reserva)]
+    OcupacionDiaria.objects.bulk_create(filas, batch_size=TAMANIO_LOTE)
+    return len(filas)
+
+
+def actualizar_ocupacion(reserva_ids: Iterable[int]) -> int:
+    """Regenera las filas de las reservas indicadas a partir de la base.
+
+    Las reservas que ya no existen sólo pierden sus filas.
+    """
+    ids = sorted(set(reserva_ids))
+    total = 0
+    with transaction.atomic():
+        for lote in _lotes(ids):
+            OcupacionDiaria.objects.filter(reserva_id__in=lote).delete()
+            total += _insertar(
+                Reserva.objects.filter(id__in=lote).values_list(*CAMPOS_VALORES)
+            )
+    return total
+
+
+def registrar_ocupacion(reservas: Iterable[Reserva]) -> int:
+    """Inserta las filas de reservas recién creadas (sin filas previas).
+
+    Las instancias sin id (bulk_create con ignore_conflicts, o bases que no
+    devuelven los ids insertados) no se pueden registrar acá: quedan para
+    `rebuild_ocupacion`.
+    """
+    return _insertar(
+        tuple(getattr(reserva, campo) for campo in CAMPOS_VALORES)
+        for reserva in reservas
+        if reserva.pk is not None
+    )
+
+
+def reconstruir_ocupacion() -> Tuple[int, int]:
+    """Vacía la tabla y la vuelve a generar desde todas las reservas.
+
+    Devuelve (reservas procesadas, filas creadas).
+    """
+    ids = list(Reserva.objects.order_by("id").values_list("id", flat=True))
+    filas = 0
+    with transaction.atomic():
+        OcupacionDiaria.objects.all().delete()
+        for lote in _lotes(ids):
+            filas += _insertar(
+                Reserva.objects.filter(id__in=lote).values_list(*CAMPOS_VALORES)
+            )
+    return len(ids), filas
+
+
+def diferencias_ocupacion() -> List[str]:
+    """Compara la tabla con lo que se generaría desde las reservas actuales"""
+    esperado: Dict[Tuple[int, object], Tuple] = {}
+    for reserva in (
+        Reserva.objects.order_by("id")
+        .values_list(*CAMPOS_VALORES)
+        .iterator(chunk_size=2000)
+    ):
+        for fila in _filas(*reserva):
+            esperado[(fila.reserva_id, fila.fecha)] = (
+                fila.habitacion_id,
+                fila.personas,
+                fila.cantidad_habitaciones,
+                fila.ingreso,
+            )
+
+    errores = []
+    actual = OcupacionDiaria.objects.values_list(
+        "reserva_id",
+        "fecha",
+        "habitacion_id",
+        "personas",
+        "cantidad_habitaciones",
+        "ingreso",
+    )
+    for reserva_id, fecha, *datos in actual.iterator(chunk_size=2000):
+        clave = (reserva_id, fecha)
+        valores = esperado.pop(clave, None)
+        if valores is None:
+            errores.append(f"Reserva {reserva_id} {fecha}: fila sobrante")
+        elif valores[:3] != tuple(datos[:3]) or abs(valores[3] - datos[3]) > 1e-6:
+            errores.append(f"Reserva {reserva_id} {fecha}: {tuple(datos)} != {valores}")
+    for reserva_id, fecha in esperado:
+        errores.append(f"Reserva {reserva_id} {fecha}: fila faltante")
+    return errores
+
+
+def totales_ocupacion(desde, hasta) -> Dict[str, float]:
+    """noches_vendidas e ingresos_totales de [desde, hasta] leídos de la tabla"""
+    totales = OcupacionDiaria.objects.filter(
+        fecha__gte=desde, fecha__lte=hasta
+    ).aggregate(
+        noches_vendidas=Sum("cantidad_habitaciones"), ingresos_totales=Sum("ingreso")
+    )
+    return {
+        "noches_vendidas": int(totales["noches_vendidas"] or 0),
+        "ingresos_totales": float(totales["ingresos_totales"] or 0.0),
+    }
+
+
+def totales_por_dia(desde, hasta) -> Dict[object, Tuple[int, float]]:
+    """{fecha: (noches vendidas, ingresos)} de los días con ocupación en [desde, hasta]"""
+    return {
+        fecha: (int(noches or 0), float(ingresos or 0.0))
+        for fecha, noches, ingresos in OcupacionDiaria.objects.filter(
+            fecha__gte=desde, fecha__lte=hasta
+        )
+        .values("fecha")
+        .annotate(noches=Sum("cantidad_habitaciones"), ingresos=Sum("ingreso"))
+        .values_list("fecha", "noches", "ingresos")
+        .order_by()
+    }
@@ -0,0 +1,145 @@
+"""Paginación por cursor (keyset) y filtros del listado de reservas.
+
+El listado de ReservaViewSet sigue usando PageNumberPagination por defecto
+(COUNT(*) + OFFSET). Con `?paginacion=cursor` (o cuando llega `cursor`) usa
+ReservaCursorPagination: cada página se pide con un WHERE sobre la columna
+de orden a partir de la última fila de la anterior, así que la página N
+cuesta lo mismo que la primera aunque haya cientos de miles de reservas.
+
+Órdenes disponibles (`?orden=`): `-id` (por defecto, más nuevas primero),
+`fecha_ingreso` y `-fecha_ingreso` (desempata por id). El total sólo se
+calcula con `?contar=true`.
+
+Los filtros (`filtrar_reservas`) valen para las dos paginaciones. La
+búsqueda por huésped (`q`) y por teléfono usa los índices de la migración
+0011: en PostgreSQL índices trigram, que sirven para buscar el texto en
+cualquier parte del nombre; en SQLite índices NOCASE, que sólo sirven para
+prefijos, así que ahí se busca por comienzo ("gon" encuentra "González"
+pero "zále" no).
+"""
+
+from datetime import date
+from typing import Optional
+
+from django.db import connection
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from .importacion import parse_bool
+
+ORDENES_CURSOR = {
+    "-id": ("-id",),
+    "fecha_ingreso": ("fecha_ingreso", "id"),
+    "-fecha_ingreso": ("-fecha_ingreso", "-id"),
+}
+MAX_TAMANIO_PAGINA = 500
+
+
+def usa_cursor(request) -> bool:
+    params = request.query_params
+    return params.get("paginacion") == "cursor" or "cursor" in params
+
+
+def _fecha(params, nombre: str) -> Optional[date]:
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f"Formato de fecha inválido en {nombre} (YYYY-MM-DD)")
+
+
+def _lookup_texto() -> str:
+    """Búsqueda por contenido con trigram (PostgreSQL) o por prefijo"""
+    return "icontains" if connection.vendor == "postgresql" else "istartswith"
+
+
+def buscar_huesped(queryset, texto: str):
+    """Cada palabra de `texto` tiene que coincidir con el nombre o el apellido.
+
+    Si el texto es un número también se buscan la reserva con ese id y las
+    reservas de la habitación con ese número.
+    """
+    lookup = _lookup_texto()
+    condicion = Q()
+    for palabra in texto.split():
+        condicion &= Q(**{f"nombre__{lookup}": palabra}) | Q(
+            **{f"apellido__{lookup}": palabra}
+        )
+    if texto.isdigit():
+        condicion |= Q(id=int(texto)) | Q(nhabitacion__numero=texto)
+    return queryset.filter(condicion)
+
+
+def filtrar_reservas(queryset, params):
+    """Filtros del listado: huésped, teléfono, rango de fecha de ingreso,
+    habitación, origen, encargado y celíacos.
+
+    Lanza ValueError con el mensaje para el cliente si un parámetro es inválido.
+    """
+    desde = _fecha(params, "fecha_desde")
+    hasta = _fecha(params, "fecha_hasta")
+    if desde and hasta and desde > hasta:
+        raise ValueError("fecha_desde debe ser anterior o igual a fecha_hasta")
+    if desde:
+        queryset = queryset.filter(fecha_ingreso__gte=desde)
+    if hasta:
+        queryset = queryset.filter(fecha_ingreso__lte=hasta)
+
+    habitacion = params.get("habitacion")
+    if habitacion:
+        try:
+            queryset = queryset.filter(nhabitacion_id=int(habitacion))
+        except ValueError:
+            raise ValueError("ID de habitación inválido")
+
+    origen = params.get("origen")
+    if origen:
+        queryset = queryset.filter(origen__iexact=origen)
+
+    encargado = params.get("encargado")
+    if encargado:
+        queryset = queryset.filter(encargado__iexact=encargado)
+
+    if params.get("celiacos"):
+        queryset = queryset.filter(celiacos=parse_bool(params["celiacos"]))
+
+    texto = (params.get("q") or "").strip()
+    if texto:
+        queryset = buscar_huesped(queryset, texto)
+
+    telefono = (params.get("telefono") or "").strip()
+    if telefono:
+        queryset = queryset.filter(**{f"telefono__{_lookup_texto()}": telefono})
+    return queryset
+
+
+class ReservaCursorPagination(CursorPagination):
+    """Paginación keyset sobre -id o fecha_ingreso, con total opcional"""
+
+    page_size_query_param = "page_size"
+    max_page_size = MAX_TAMANIO_PAGINA
+    ordering = ORDENES_CURSOR["-id"]
+
+    def get_ordering(self, request, queryset, view):
+        orden = request.query_params.get("orden", "-id")
+        if orden not in ORDENES_CURSOR:
+            raise ValueError(
+                f"orden debe ser uno de: {', '.join(sorted(ORDENES_CURSOR))}"
+            )
+        return ORDENES_CURSOR[orden]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total = None
+        if parse_bool(request.query_params.get("contar")):
+            self.total = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        contenido = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.total is not None:
+            contenido["count"] = self.total
+        contenido["results"] = data
+        return Response(contenido)
@@ -0,0 +1,166 @@
+"""Motor del planning de ocupación (habitaciones x días).
+
+Obtiene en una sola consulta todas las reservas que solapan la ventana,
+las agrupa por habitación y completa la grilla recorriendo una única vez
+las noches de cada reserva. El costo es O(habitaciones + noches) en lugar
+de O(habitaciones x días x reservas).
+
+El formato compacto ("runs") envía por habitación tramos
+[offset_inicio, largo, reserva_id] y una tabla compartida con los datos
+de cada reserva, en lugar de un dict por celda.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from .models import Habitacion, Reserva
+
+DIAS_PLANNING = 60
+MAX_DIAS_PLANNING = 366
+
+RESERVA_RUNS_CAMPOS = ["nombre", "fecha_ingreso", "fecha_egreso"]
+
+TIPO_ORDEN = {"doble": 1, "triple": 2, "cuadruple": 3, "quintuple": 4}
+
+
+def habitaciones_ordenadas() -> List[Habitacion]:
+    """Habitaciones ordenadas por tipo (doble, triple, cuadruple, quintuple, resto)"""
+    habitaciones = list(Habitacion.objects.all())
+    habitaciones.sort(key=lambda x: TIPO_ORDEN.get(x.tipo, 5))
+    return habitaciones
+
+
+def grilla_ocupacion(
+    habitaciones: List[Habitacion], first_day: date, num_dias: int
+) -> Dict[int, List[Optional[Reserva]]]:
+    """Devuelve {habitacion_id: [reserva | None, ...]} con una celda por día.
+
+    Si dos reservas de la misma habitación se pisan, la celda queda con la
+    primera por id. El recorrido anterior no ordenaba y tomaba la primera
+    que devolvía la base, que con el índice de la clave foránea (el único
+    que había) era también la de menor id.
+    """
+    last_day = first_day + timedelta(days=num_dias - 1)
+    grilla: Dict[int, List[Optional[Reserva]]] = {
+        habitacion.id: [None] * num_dias for habitacion in habitaciones
+    }
+
+    reservas = Reserva.objects.filter(
+        fecha_ingreso__lte=last_day, fecha_egreso__gte=first_day
+    ).order_by("id")
+
+    for reserva in reservas:
+        celdas = grilla.get(reserva.nhabitacion_id)
+        if celdas is None:
+            continue
+        inicio = max((reserva.fecha_ingreso - first_day).days, 0)
+        fin = min((reserva.fecha_egreso - first_day).days, num_dias)
+        for i in range(inicio, fin):
+            if celdas[i] is None:
+                celdas[i] = reserva
+
+    return grilla
+
+
+def _celda(reserva: Optional[Reserva], day: date) -> Dict[str, Any]:
+    if reserva is None:
+        return {
+            "is_occupied": False,
+            "is_last_night": False,
+            "nombre": None,
+            "reserva_id": None,
+            "fecha_ingreso": None,
+            "fecha_egreso": None,
+        }
+    return {
+        "is_occupied": True,
+        "is_last_night": day == reserva.fecha_egreso - timedelta(days=1),
+        "nombre": reserva.nombre if day == reserva.fecha_ingreso else None,
+        "reserva_id": reserva.id,
+        "fecha_ingreso": reserva.fecha_ingreso.isoformat(),
+        "fecha_egreso": reserva.fecha_egreso.isoformat(),
+    }
+
+
+def _habitacion_dict(habitacion: Habitacion) -> Dict[str, Any]:
+    return {
+        "id": habitacion.id,
+        "numero": habitacion.numero,
+        "tipo": habitacion.tipo,
+        "piso": habitacion.piso,
+    }
+
+
+def construir_planning(
+    first_day: date, num_dias: int = DIAS_PLANNING
+) -> Dict[str, Any]:
+    """Arma la respuesta del endpoint de planning para `num_dias` desde `first_day`"""
+    days = [first_day + timedelta(days=i) for i in range(num_dias)]
+    habitaciones = habitaciones_ordenadas()
+    grilla = grilla_ocupacion(habitaciones, first_day, num_dias)
+
+    planning_data = []
+    for habitacion in habitaciones:
+        celdas = grilla[habitacion.id]
+        planning_data.append(
+            {
+                "habitacion": _habitacion_dict(habitacion),
+                "ocupaciones": [
+                    _celda(reserva, day) for reserva, day in zip(celdas, days)
+                ],
+            }
+        )
+
+    return {
+        "planning": planning_data,
+        "days": [day.isoformat() for day in days],
+        "first_day": first_day.isoformat(),
+    }
+
+
+def construir_planning_runs(
+    first_day: date, num_dias: int = DIAS_PLANNING
+) -> Dict[str, Any]:
+    """Variante compacta del planning codificada por tramos (run-length).
+
+    Cada habitación trae `runs`: lista de [offset_inicio, largo, reserva_id]
+    con los días ocupados consecutivos por la misma reserva. Los días libres
+    no se envían. `reservas` contiene, por id, una lista con los valores de
+    `reservas_campos` (nombre y fechas) de cada reserva referenciada; el
+    cliente reconstruye `is_last_night` y el nombre en el día de ingreso a
+    partir de esas fechas.
+    """
+    days = [first_day + timedelta(days=i) for i in range(num_dias)]
+    habitaciones = habitaciones_ordenadas()
+    grilla = grilla_ocupacion(habitaciones, first_day, num_dias)
+
+    reservas: Dict[str, List[str]] = {}
+    planning_data = []
+    for habitacion in habitaciones:
+        runs: List[List[int]] = []
+        anterior = None
+        for i, reserva in enumerate(grilla[habitacion.id]):
+            if reserva is None:
+                anterior = None
+                continue
+            if reserva is anterior:
+                runs[-1][1] += 1
+            else:
+                runs.append([i, 1, reserva.id])
+                anterior = reserva
+                if str(reserva.id) not in reservas:
+                    reservas[str(reserva.id)] = [
+                        reserva.nombre,
+                        reserva.fecha_ingreso.isoformat(),
+                        reserva.fecha_egreso.isoformat(),
+                    ]
+        planning_data.append({"habitacion": _habitacion_dict(habitacion), "runs": runs})
+
+    return {
+        "format": "runs",
+        "planning": planning_data,
+        "reservas_campos": RESERVA_RUNS_CAMPOS,
+        "reservas": reservas,
+        "days": [day.isoformat() for day in days],
+        "first_day": first_day.isoformat(),
+    }
@@ -0,0 +1,106 @@
+"""Restricción de exclusión contra reservas solapadas (sólo PostgreSQL).
+
+La migración 0010 agrega sobre reservas_reserva:
+
+    EXCLUDE USING gist (
+        nhabitacion_id WITH =,
+        daterange(fecha_ingreso, GREATEST(fecha_egreso, fecha_ingreso), '[)') WITH &&
+    )
+
+El rango es semiabierto, así que una salida y un ingreso el mismo día no se
+solapan; las reservas con fechas invertidas o de 0 noches tienen un rango
+vacío y no chocan con ninguna. Si la base ya tenía solapamientos históricos
+(o no se pudo crear la extensión btree_gist) la migración no la agrega y se
+siguen usando las validaciones en Python. `solapamiento_en_base()` indica
+cuál de los dos caminos corresponde.
+
+Una vez corregidos los solapamientos, el comando
+`agregar_restriccion_solapamiento` los lista y agrega la restricción
+(`agregar_restriccion()`); equivale a ejecutar a mano:
+
+    CREATE EXTENSION IF NOT EXISTS btree_gist;
+    ALTER TABLE reservas_reserva ADD CONSTRAINT reserva_sin_solapamiento
+        EXCLUDE USING gist (
+            nhabitacion_id WITH =,
+            daterange(fecha_ingreso, GREATEST(fecha_egreso, fecha_ingreso), '[)')
+                WITH &&
+        );
+
+Los procesos que ya estaban corriendo recuerdan que no había restricción
+hasta que se reinician.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, F, OuterRef
+
+from .models import Reserva
+
+NOMBRE_RESTRICCION = "reserva_sin_solapamiento"
+RANGO = "daterange(fecha_ingreso, GREATEST(fecha_egreso, fecha_ingreso), '[)')"
+
+_activa = {}
+
+
+def solapamiento_en_base(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """True si la base rechaza por sí misma las reservas solapadas"""
+    if using not in _activa:
+        connection = connections[using]
+        if connection.vendor != "postgresql":
+            _activa[using] = False
+        else:
+            with connection.cursor() as cursor:
+                restricciones = connection.introspection.get_constraints(
+                    cursor, Reserva._meta.db_table
+                )
+            _activa[using] = NOMBRE_RESTRICCION in restricciones
+    return _activa[using]
+
+
+def es_error_solapamiento(error: Exception) -> bool:
+    """True si el IntegrityError lo produjo la restricción de exclusión"""
+    causa = getattr(error, "__cause__", None)
+    diag = getattr(causa, "diag", None)
+    if diag is not None and getattr(diag, "constraint_name", None):
+        return diag.constraint_name == NOMBRE_RESTRICCION
+    return NOMBRE_RESTRICCION in str(error)
+
+
+def reservas_solapadas(using: str = DEFAULT_DB_ALIAS):
+    """Reservas que se solapan con otra de la misma habitación (las que
+    impiden agregar la restricción)"""
+    con_noches = Reserva.objects.using(using).filter(
+        fecha_ingreso__lt=F("fecha_egreso")
+    )
+    otras = con_noches.filter(
+        nhabitacion=OuterRef("nhabitacion"),
+        fecha_ingreso__lt=OuterRef("fecha_egreso"),
+        fecha_egreso__gt=OuterRef("fecha_ingreso"),
+    ).exclude(pk=OuterRef("pk"))
+    return (
+        con_noches.filter(Exists(otras))
+        .select_related("nhabitacion")
+        .order_by("nhabitacion__numero", "fecha_ingreso", "id")
+    )
+
+
+def agregar_restriccion(using: str = DEFAULT_DB_ALIAS) -> None:
+    """Agrega la restricción de exclusión que la migración 0010 no pudo
+    agregar. Lanza ValueError si la base no es PostgreSQL o si todavía hay
+    reservas solapadas."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        raise ValueError("La restricción de exclusión requiere PostgreSQL")
+    _activa.pop(using, None)
+    if solapamiento_en_base(using):
+        return
+    if reservas_solapadas(using).exists():
+        raise ValueError("Hay reservas solapadas: corregirlas antes")
+    tabla = connection.ops.quote_name(Reserva._meta.db_table)
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+            cursor.execute(
+                f"ALTER TABLE {tabla} ADD CONSTRAINT {NOMBRE_RESTRICCION} "
+                f"EXCLUDE USING gist (nhabitacion_id WITH =, {RANGO} WITH &&)"
+            )
+    _activa[using] = True
@@ -1,9 +1,36 @@
 from rest_framework import serializers
-from .models import Reserva, Habitacion, PerfilUsuario
+from .models import Reserva, Habitacion, PerfilUsuario, ImportacionReserva
+from .campos import CamposDinamicosMixin
+from .moneda import MonedaField
+from .restricciones import es_error_solapamiento, solapamiento_en_base
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+
+def guardar_sin_solapamiento(guardar, habitacion_id):
+    """Ejecuta `guardar()` traduciendo el rechazo de la restricción de exclusión
+    (reservas solapadas, ver restricciones.py) a un error de validación"""
+    try:
+        with transaction.atomic():
+            return guardar()
+    except IntegrityError as e:
+        if not es_error_solapamiento(e):
+            raise
+        numero = (
+            Habitacion.objects.filter(id=habitacion_id)
+            .values_list("numero", flat=True)
+            .first()
+        )
+        raise serializers.ValidationError(
+            {
+                "non_field_errors": [
+                    f"Solapamiento: ya existe una reserva en {numero} en ese rango"
+                ]
+            }
+        )
 
 
-class HabitacionSerializer(serializers.ModelSerializer):
+class HabitacionSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo Habitacion"""
 
     class Meta:
@@ -12,11 +39,16 @@ class HabitacionSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class ReservaSerializer(serializers.ModelSerializer):
+class ReservaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo Reserva"""
 
-    habitacion = HabitacionSerializer(read_only=True)
+    habitacion = HabitacionSerializer(source="nhabitacion", read_only=True)
     habitacion_id = serializers.IntegerField(write_only=True, source="nhabitacion_id")
+    # Importes en es-AR ("$1.234,50"), para mostrar sin formatear en el cliente
+    monto_total_formateado = MonedaField(source="monto_total")
+    senia_formateada = MonedaField(source="senia")
+    resto_formateado = MonedaField(source="resto")
+    precio_por_noche_formateado = MonedaField(source="precio_por_noche")
 
     class Meta:
         model = Reserva
@@ -40,8 +72,14 @@ class ReservaSerializer(serializers.ModelSerializer):
             "habitacion_id",
             "cantidad_habitaciones",
             "celiacos",
+            "monto_total_formateado",
+            "senia_formateada",
+            "resto_formateado",
+            "precio_por_noche_formateado",
         ]
         read_only_fields = ["id", "noches", "resto", "precio_por_noche"]
+        # La habitación anidada sólo con ?fields=habitacion (ver campos.py)
+        opcionales = ["habitacion"]
 
     def validate(self, data):
         """Validación personalizada"""
@@ -58,40 +96,44 @@ class ReservaSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """Crear reserva con cálculos automáticos"""
-        habitacion_id = validated_data.pop("habitacion_id")
+        habitacion_id = validated_data.pop("nhabitacion_id")
         habitacion = Habitacion.objects.get(id=habitacion_id)
 
-        # Validar solapamiento con fechas
+        # Con la restricción de exclusión de PostgreSQL es la base la que
+        # rechaza el solapamiento (ver guardar_sin_solapamiento); si no, se
+        # valida antes
         fecha_ingreso = validated_data["fecha_ingreso"]
         fecha_egreso = validated_data["fecha_egreso"]
-        if Reserva.objects.filter(
-            nhabitacion=habitacion,
-            fecha_ingreso__lt=fecha_egreso,
-            fecha_egreso__gt=fecha_ingreso,
-        ).exists():
-            raise serializers.ValidationError(
-                {
-                    "non_field_errors": [
-                        f"Solapamiento: ya existe una reserva en {habitacion.numero} en ese rango"
-                    ]
-                }
-            )
+        if not solapamiento_en_base():
+            # Validar solapamiento con fechas
+            if Reserva.objects.filter(
+                nhabitacion=habitacion,
+                fecha_ingreso__lt=fecha_egreso,
+                fecha_egreso__gt=fecha_ingreso,
+            ).exists():
+                raise serializers.ValidationError(
+                    {
+                        "non_field_errors": [
+                            f"Solapamiento: ya existe una reserva en {habitacion.numero} en ese rango"
+                        ]
+                    }
+                )
 
-        # Validar duplicado exacto
-        if Reserva.objects.filter(
-            nhabitacion=habitacion,
-            nombre=validated_data.get("nombre"),
-            apellido=validated_data.get("apellido"),
-            fecha_ingreso=fecha_ingreso,
-            fecha_egreso=fecha_egreso,
-        ).exists():
-            raise serializers.ValidationError(
-                {
-                    "non_field_errors": [
-                        "Reserva duplicada para el mismo huésped, habitación y fechas"
-                    ]
-                }
-            )
+            # Validar duplicado exacto
+            if Reserva.objects.filter(
+                nhabitacion=habitacion,
+                nombre=validated_data.get("nombre"),
+                apellido=validated_data.get("apellido"),
+                fecha_ingreso=fecha_ingreso,
+                fecha_egreso=fecha_egreso,
+            ).exists():
+                raise serializers.ValidationError(
+                    {
+                        "non_field_errors": [
+                            "Reserva duplicada para el mismo huésped, habitación y fechas"
+                        ]
+                    }
+                )
 
         # Calcular noches
         noches = (fecha_egreso - fecha_ingreso).days
@@ -111,10 +153,18 @@ class ReservaSerializer(serializers.ModelSerializer):
         # Asignar habitación
         validated_data["nhabitacion"] = habitacion
 
-        return super().create(validated_data)
+        return guardar_sin_solapamiento(
+            lambda: super(ReservaSerializer, self).create(validated_data), habitacion_id
+        )
+
+    def update(self, instance, validated_data):
+        return guardar_sin_solapamiento(
+            lambda: super(ReservaSerializer, self).update(instance, validated_data),
+            validated_data.get("nhabitacion_id", instance.nhabitacion_id),
+        )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo User"""
 
     class Meta:
@@ -265,7 +315,7 @@ class PerfilUsuarioSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "es_supervisor"]
 
 
-class ReservaListSerializer(serializers.ModelSerializer):
+class ReservaListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer simplificado para listar reservas"""
 
     habitacion_numero = serializers.CharField(
@@ -292,12 +342,14 @@ class ReservaListSerializer(serializers.ModelSerializer):
             "origen",
         ]
         read_only_fields = ["id", "noches"]
+        # Columnas de los campos calculados (ver campos.py)
+        columnas = {"nombre_completo": ("nombre", "apellido")}
 
     def get_nombre_completo(self, obj):
         return f"{obj.nombre} {obj.apellido}"
 
 
-class HabitacionListSerializer(serializers.ModelSerializer):
+class HabitacionListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer simplificado para listar habitaciones"""
 
     tipo_display = serializers.CharField(source="get_tipo_display", read_only=True)
@@ -312,6 +364,7 @@ class HabitacionListSerializer(serializers.ModelSerializer):
             "piso",
         ]
         read_only_fields = ["id"]
+        columnas = {"tipo_display": ("tipo",)}
 
 
 # Serializers para estadísticas y reportes
@@ -339,6 +392,13 @@ class KpiRangoSerializer(serializers.Serializer):
     habitaciones_disponibles_noches = serializers.IntegerField()
 
 
+class KpiIntervaloSerializer(KpiRangoSerializer):
+    """KPIs de un intervalo (día, semana o mes) de una serie"""
+
+    inicio = serializers.DateField()
+    fin = serializers.DateField()
+
+
 class ReservaCreateSerializer(serializers.ModelSerializer):
     """Serializer específico para crear reservas"""
 
@@ -376,8 +436,14 @@ class ReservaCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Habitación no encontrada")
         return value
 
+    def create(self, validated_data):
+        return guardar_sin_solapamiento(
+            lambda: super(ReservaCreateSerializer, self).create(validated_data),
+            validated_data["nhabitacion_id"],
+        )
 
-class UsuarioListSerializer(serializers.ModelSerializer):
+
+class UsuarioListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer simplificado para listar usuarios"""
 
     rol = serializers.SerializerMethodField()
@@ -399,6 +465,12 @@ class UsuarioListSerializer(serializers.ModelSerializer):
             "turno_display",
         ]
         read_only_fields = ["id"]
+        columnas = {
+            "rol": ("perfil__rol",),
+            "turno": ("perfil__turno",),
+            "rol_display": ("perfil__rol",),
+            "turno_display": ("perfil__turno",),
+        }
 
     def get_rol(self, obj):
         try:
@@ -423,3 +495,29 @@ class UsuarioListSerializer(serializers.ModelSerializer):
             return obj.perfil.get_turno_display()
         except PerfilUsuario.DoesNotExist:
             return "Mañana"
+
+
+class ImportacionReservaSerializer(serializers.ModelSerializer):
+    """Estado y resultado de una importación en segundo plano"""
+
+    usuario = serializers.CharField(source="usuario.username", read_only=True)
+
+    class Meta:
+        model = ImportacionReserva
+        fields = [
+            "id",
+            "nombre_archivo",
+            "formato",
+            "dry_run",
+            "estado",
+            "procesadas",
+            "creadas",
+            "errores",
+            "resultado",
+            "error",
+            "usuario",
+            "fecha_creacion",
+            "fecha_inicio",
+            "fecha_fin",
+        ]
+        read_only_fields = fields
@@ -1,7 +1,19 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
 from django.contrib.auth.models import User
-from .models import PerfilUsuario
+from .models import PerfilUsuario, Reserva, Habitacion
+from .cache_respuestas import incrementar_al_confirmar
+from .disponibilidad import indice_disponibilidad
+from .ocupacion import actualizar_ocupacion, registrar_ocupacion
+
+# Se envía después de crear reservas con bulk_create (que no dispara post_save).
+# kwargs: reservas (lista de Reserva creadas)
+reservas_creadas_en_lote = Signal()
+
+# Se envía después de Reserva.objects.filter(...).update(...) (tampoco dispara
+# post_save). kwargs: ids (lista de ids de las reservas actualizadas)
+reservas_actualizadas_en_lote = Signal()
 
 
 @receiver(post_save, sender=User)
@@ -25,3 +37,49 @@ def guardar_perfil_usuario(sender, instance, **kwargs):
     """
     if hasattr(instance, 'perfil'):
         instance.perfil.save()
+
+
+@receiver(post_save, sender=Reserva)
+@receiver(post_delete, sender=Reserva)
+@receiver(reservas_creadas_en_lote)
+@receiver(reservas_actualizadas_en_lote)
+@receiver(post_save, sender=Habitacion)
+@receiver(post_delete, sender=Habitacion)
+def invalidar_indice_disponibilidad(sender, **kwargs):
+    """
+    Signal para invalidar el índice de disponibilidad en memoria.
+    Se invalida también al confirmar la transacción, para que una consulta
+    concurrente no lo reconstruya con datos todavía sin confirmar.
+    """
+    indice_disponibilidad.invalidar()
+    transaction.on_commit(indice_disponibilidad.invalidar)
+
+
+@receiver(post_save, sender=Reserva)
+@receiver(post_delete, sender=Reserva)
+@receiver(reservas_creadas_en_lote)
+@receiver(reservas_actualizadas_en_lote)
+@receiver(post_save, sender=Habitacion)
+@receiver(post_delete, sender=Habitacion)
+def incrementar_version(sender, **kwargs):
+    """
+    Signal para invalidar las respuestas cacheadas y los ETag (ver
+    cache_respuestas.py). La versión se incrementa al confirmar la
+    transacción, una vez por transacción: antes las otras conexiones todavía
+    ven los datos anteriores.
+    """
+    incrementar_al_confirmar(kwargs.get('using'))
+
+
+@receiver(post_save, sender=Reserva)
+def actualizar_ocupacion_diaria(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal para mantener las filas de OcupacionDiaria de la reserva.
+    El borrado lo resuelve la cascada de la clave foránea.
+    """
+    if raw:
+        return
+    if created:
+        registrar_ocupacion([instance])
+    else:
+        actualizar_ocupacion([instance.pk])
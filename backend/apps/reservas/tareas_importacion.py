@@ -0,0 +1,224 @@
+"""Importaciones de reservas en segundo plano.
+
+`/reservas/importar/` guarda el archivo subido en IMPORTACIONES_DIR, crea un
+`ImportacionReserva` pendiente y responde enseguida con su id. La importación
+la ejecuta un hilo del proceso web (IMPORTACIONES_WORKERS) o, si no hay hilos
+configurados, el comando `procesar_importaciones`. Mientras avanza, después de
+cada lote se actualizan procesadas/creadas/errores; al terminar, `resultado`
+guarda el resumen completo que antes devolvía el endpoint.
+
+El pool de hilos vive en memoria: si el proceso se reinicia (deploy,
+autoreload) las importaciones encoladas se pierden. Por eso, al arrancar el
+pool (`reanudar_importaciones`, llamado desde wsgi.py) y en cada pasada del
+comando se marcan como fallidas las que quedaron `procesando` más de
+IMPORTACIONES_TIMEOUT segundos (`recuperar_importaciones`) y se vuelven a
+encolar las pendientes. No se reintentan las interrumpidas: lo ya importado
+quedó creado y repetirla duplicaría reservas.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .importacion import (
+    ImportadorReservas,
+    bloques_de_archivo,
+    leer_csv,
+    leer_xlsx,
+    lineas_desde_bloques,
+)
+from .models import ImportacionReserva
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _obtener_executor() -> Optional[ThreadPoolExecutor]:
+    global _executor
+    workers = getattr(settings, "IMPORTACIONES_WORKERS", 0)
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="importacion"
+            )
+            # Lo que quedó de un proceso anterior
+            _executor.submit(_reanudar_en_hilo)
+    return _executor
+
+
+def reanudar_importaciones() -> None:
+    """Arranca el pool (si hay hilos configurados), que recupera las
+    importaciones interrumpidas y encola las pendientes"""
+    _obtener_executor()
+
+
+def _reanudar_en_hilo() -> None:
+    close_old_connections()
+    try:
+        recuperar_importaciones()
+        for importacion_id in importaciones_pendientes().values_list("id", flat=True):
+            _executor.submit(_ejecutar_en_hilo, importacion_id)
+    except Exception:
+        logger.exception("Error reanudando las importaciones pendientes")
+    finally:
+        close_old_connections()
+
+
+def recuperar_importaciones(timeout: Optional[int] = None) -> int:
+    """Marca como fallidas las importaciones `procesando` desde hace más de
+    `timeout` segundos (por defecto IMPORTACIONES_TIMEOUT): su proceso ya no
+    existe. Devuelve cuántas marcó."""
+    if timeout is None:
+        timeout = settings.IMPORTACIONES_TIMEOUT
+    limite = timezone.now() - timedelta(seconds=timeout)
+    colgadas = ImportacionReserva.objects.filter(
+        Q(fecha_inicio__lt=limite) | Q(fecha_inicio__isnull=True),
+        estado="procesando",
+    )
+    recuperadas = 0
+    for importacion in colgadas.only("id", "ruta_archivo"):
+        # Condicional: si terminó mientras tanto no se pisa el resultado
+        marcada = ImportacionReserva.objects.filter(
+            id=importacion.id, estado="procesando"
+        ).update(
+            estado="fallida",
+            error=(
+                f"Importación interrumpida (más de {timeout} s procesando); "
+                "las reservas ya creadas se conservan"
+            ),
+            fecha_fin=timezone.now(),
+        )
+        if marcada:
+            recuperadas += 1
+            logger.warning("Importación %s interrumpida", importacion.id)
+            try:
+                os.remove(importacion.ruta_archivo)
+            except OSError:
+                pass
+    return recuperadas
+
+
+def crear_importacion(
+    bloques: Iterable[bytes],
+    nombre_archivo: str,
+    formato: str,
+    usuario=None,
+    dry_run: bool = False,
+) -> ImportacionReserva:
+    """Guarda el archivo (por bloques) y registra la importación pendiente"""
+    directorio = settings.IMPORTACIONES_DIR
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"{uuid.uuid4().hex}.{formato}")
+    with open(ruta, "wb") as destino:
+        for bloque in bloques:
+            destino.write(bloque)
+    return ImportacionReserva.objects.create(
+        usuario=usuario,
+        nombre_archivo=nombre_archivo[:255],
+        formato=formato,
+        ruta_archivo=ruta,
+        dry_run=dry_run,
+    )
+
+
+def encolar_importacion(importacion: ImportacionReserva) -> None:
+    """Envía la importación al pool de hilos una vez confirmada la transacción"""
+    executor = _obtener_executor()
+    if executor is None:
+        return
+    importacion_id = importacion.id
+    transaction.on_commit(lambda: executor.submit(_ejecutar_en_hilo, importacion_id))
+
+
+def _ejecutar_en_hilo(importacion_id: int) -> None:
+    close_old_connections()
+    try:
+        ejecutar_importacion(importacion_id)
+    except Exception:
+        logger.exception("Error ejecutando la importación %s", importacion_id)
+    finally:
+        close_old_connections()
+
+
+def tomar_importacion(importacion_id: int) -> bool:
+    """Marca la importación como procesando si seguía pendiente.
+
+    El UPDATE condicional evita que dos workers procesen la misma.
+    """
+    return (
+        ImportacionReserva.objects.filter(id=importacion_id, estado="pendiente").update(
+            estado="procesando", fecha_inicio=timezone.now()
+        )
+        == 1
+    )
+
+
+def _filas(importacion: ImportacionReserva):
+    if importacion.formato == "xlsx":
+        return leer_xlsx(importacion.ruta_archivo)
+    return leer_csv(lineas_desde_bloques(bloques_de_archivo(importacion.ruta_archivo)))
+
+
+def ejecutar_importacion(importacion_id: int) -> Optional[Dict[str, Any]]:
+    """Procesa una importación pendiente y devuelve su resumen.
+
+    Devuelve None si otro worker ya la había tomado.
+    """
+    if not tomar_importacion(importacion_id):
+        return None
+    importacion = ImportacionReserva.objects.get(id=importacion_id)
+
+    def progreso(resumen: Dict[str, Any]) -> None:
+        ImportacionReserva.objects.filter(id=importacion_id).update(
+            procesadas=resumen["procesadas"],
+            creadas=resumen["creadas"],
+            errores=resumen["errores"],
+        )
+
+    importador = ImportadorReservas(
+        al_procesar_lote=progreso, dry_run=importacion.dry_run
+    )
+    try:
+        resumen = importador.importar(_filas(importacion))
+    except Exception as e:
+        # Lo ya importado queda; se guarda el resumen parcial
+        logger.exception("Importación %s fallida", importacion_id)
+        ImportacionReserva.objects.filter(id=importacion_id).update(
+            estado="fallida",
+            error=f"Error procesando archivo: {e}",
+            resultado=importador.resumen,
+            fecha_fin=timezone.now(),
+        )
+        return None
+    finally:
+        try:
+            os.remove(importacion.ruta_archivo)
+        except OSError:
+            pass
+
+    ImportacionReserva.objects.filter(id=importacion_id).update(
+        estado="completada",
+        procesadas=resumen["procesadas"],
+        creadas=resumen["creadas"],
+        errores=resumen["errores"],
+        resultado=resumen,
+        fecha_fin=timezone.now(),
+    )
+    return resumen
+
+
+def importaciones_pendientes():
+    return ImportacionReserva.objects.filter(estado="pendiente").order_by("id")
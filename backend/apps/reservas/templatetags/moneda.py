@@ -0,0 +1,11 @@
+from django import template
+
+from apps.reservas.moneda import formato_moneda
+
+register = template.Library()
+
+
+@register.filter(name="moneda")
+def moneda(valor):
+    """{{ reserva.monto_total|moneda }} -> $1.234,50"""
+    return formato_moneda(valor)
@@ -1,3 +1,448 @@
-from django.test import TestCase
+import random
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from .disponibilidad import IndiceDisponibilidad
+from .filas import CAMPOS_RESERVA, DEFINICIONES, serializar_filas
+from .importacion import ImportadorReservas
+from .kpis import GRANULARIDADES, calcular_kpis, serie_kpis
+from .management.commands.benchmark_kpis import (
+    diferencias,
+    kpis_anterior,
+    variar_datos,
+)
+from .management.commands.benchmark_planning import planning_anterior
+from .management.commands.verificar_consultas import consultas_esperadas
+from .management.commands.verificar_indice_disponibilidad import disponibles_db
+from .management.conteo_consultas import ConsultasFijasMixin
+from .management.datos_sinteticos import crear_habitaciones, crear_reservas
+from .models import Habitacion, OcupacionDiaria, Reserva
+from .ocupacion import diferencias_ocupacion
+from .planning import construir_planning, construir_planning_runs
+from .restricciones import solapamiento_en_base
+from .serializers import ReservaSerializer
+
+
+def crear_datos(habitaciones=10, dias=60, seed=42):
+    """Habitaciones y reservas sintéticas alrededor de hoy"""
+    rng = random.Random(seed)
+    creadas = crear_habitaciones(habitaciones, rng)
+    crear_reservas(creadas, date.today() - timedelta(days=dias // 2), dias, rng)
+    return rng, creadas
+
+
+def reservar(habitacion, ingreso, egreso):
+    reserva = Reserva(
+        encargado="test",
+        nhabitacion=habitacion,
+        nombre=f"Huesped {ingreso:%d/%m}",
+        apellido="Test",
+        fecha_ingreso=ingreso,
+        fecha_egreso=egreso,
+        monto_total=10000,
+        senia=0,
+        origen="Directo",
+    )
+    reserva.save()
+    return reserva
+
+
+def expandir_runs(datos):
+    """Reconstruye la grilla celda por celda desde el formato "runs", como
+    lo hace el cliente"""
+    vacia = {
+        "is_occupied": False,
+        "is_last_night": False,
+        "nombre": None,
+        "reserva_id": None,
+        "fecha_ingreso": None,
+        "fecha_egreso": None,
+    }
+    planning = []
+    for fila in datos["planning"]:
+        ocupaciones = [dict(vacia) for _ in datos["days"]]
+        for inicio, largo, reserva_id in fila["runs"]:
+            nombre, ingreso, egreso = datos["reservas"][str(reserva_id)]
+            ultima = (date.fromisoformat(egreso) - timedelta(days=1)).isoformat()
+            for i in range(inicio, inicio + largo):
+                dia = datos["days"][i]
+                ocupaciones[i] = {
+                    "is_occupied": True,
+                    "is_last_night": dia == ultima,
+                    "nombre": nombre if dia == ingreso else None,
+                    "reserva_id": reserva_id,
+                    "fecha_ingreso": ingreso,
+                    "fecha_egreso": egreso,
+                }
+        planning.append({"habitacion": fila["habitacion"], "ocupaciones": ocupaciones})
+    return {
+        "planning": planning,
+        "days": datos["days"],
+        "first_day": datos["first_day"],
+    }
+
+
+class SerializacionFilasTests(TestCase):
+    """filas.py tiene que dar la misma salida que los serializers de DRF"""
+
+    @classmethod
+    def setUpTestData(cls):
+        crear_datos()
+        # Casos borde: observaciones vacías, celíacos, habitación sin reservas
+        Reserva.objects.filter(id__in=Reserva.objects.order_by("id")[:5]).update(
+            observaciones="", celiacos=True
+        )
+        Habitacion.objects.create(numero="SIN", tipo="doble", piso="0")
+
+    def queryset(self, serializer_class):
+        modelo = serializer_class.Meta.model
+        if modelo is Reserva:
+            return Reserva.objects.select_related("nhabitacion").order_by("id")
+        return modelo.objects.order_by("id")
+
+    def test_campos_de_cada_definicion(self):
+        for serializer_class, definicion in DEFINICIONES.items():
+            with self.subTest(serializer=serializer_class.__name__):
+                opcionales = getattr(serializer_class.Meta, "opcionales", [])
+                legibles = [
+                    nombre
+                    for nombre, campo in serializer_class(
+                        campos=list(definicion)
+                    ).fields.items()
+                    if not campo.write_only
+                ]
+                self.assertEqual(list(definicion), legibles)
+                self.assertEqual(
+                    [nombre for nombre, campo in definicion.items() if campo.opcional],
+                    opcionales,
+                )
+
+    def test_opcionales_sin_pedir(self):
+        serializer = ReservaSerializer(Reserva.objects.order_by("id")[:1], many=True)
+        self.assertNotIn("habitacion", serializer.data[0])
+        self.assertNotIn(
+            "habitacion", serializar_filas(Reserva.objects.all()[:1], CAMPOS_RESERVA)[0]
+        )
+        pedida = ReservaSerializer(
+            Reserva.objects.order_by("id")[:1], many=True, campos=["id", "habitacion"]
+        ).data[0]
+        self.assertEqual(list(pedida), ["id", "habitacion"])
+
+    def test_salida_identica(self):
+        render = JSONRenderer().render
+        for serializer_class, definicion in DEFINICIONES.items():
+            queryset = self.queryset(serializer_class)
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertEqual(
+                    render(serializar_filas(queryset, definicion)),
+                    render(serializer_class(queryset, many=True).data),
+                )
+            for nombre in definicion:
+                with self.subTest(serializer=serializer_class.__name__, campo=nombre):
+                    self.assertEqual(
+                        render(serializar_filas(queryset, definicion, campos=[nombre])),
+                        render(
+                            serializer_class(queryset, many=True, campos=[nombre]).data
+                        ),
+                    )
+
+
+class KpisTests(TestCase):
+    """calcular_kpis y serie_kpis (SQL) tienen que coincidir con el recorrido
+    anterior en Python (benchmark_kpis.kpis_anterior)"""
+
+    RANGOS = 50
+    SERIES = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        rng, _ = crear_datos(habitaciones=20, dias=365)
+        variar_datos(rng)
+        cls.desde = date.today() - timedelta(days=365 // 2)
+
+    def rangos(self, cantidad, largo):
+        rng = random.Random(7)
+        for _ in range(cantidad):
+            inicio = self.desde + timedelta(days=rng.randint(-30, 365))
+            yield inicio, inicio + timedelta(days=rng.randint(0, largo))
+
+    def test_rangos_aleatorios(self):
+        for inicio, fin in self.rangos(self.RANGOS, 120):
+            with self.subTest(inicio=inicio, fin=fin):
+                anterior = kpis_anterior(inicio, fin)
+                self.assertEqual(diferencias(anterior, calcular_kpis(inicio, fin)), [])
+                with override_settings(KPIS_DESDE_OCUPACION=True):
+                    self.assertEqual(
+                        diferencias(anterior, calcular_kpis(inicio, fin)), []
+                    )
+
+    def test_series(self):
+        for inicio, fin in self.rangos(self.SERIES, 200):
+            for granularity in GRANULARIDADES:
+                for intervalo in serie_kpis(inicio, fin, granularity):
+                    with self.subTest(
+                        granularity=granularity, inicio=intervalo["inicio"]
+                    ):
+                        anterior = kpis_anterior(intervalo["inicio"], intervalo["fin"])
+                        self.assertEqual(diferencias(anterior, intervalo), [])
+
+
+class ConsultasFijasTests(ConsultasFijasMixin, TestCase):
+    """Los endpoints de lectura ejecutan las mismas consultas con 10 o con
+    muchas más filas: un N+1 hace fallar el test"""
+
+    RONDAS = 3
+    HABITACIONES = 10
+
+    def test_consultas_fijas_al_crecer(self):
+        rng = random.Random(42)
+        usuario = User.objects.create_superuser("consultas", password=None)
+        desde = date.today() - timedelta(days=30)
+        mediciones = {}
+        for ronda in range(self.RONDAS):
+            habitaciones = crear_habitaciones(self.HABITACIONES, rng)
+            crear_reservas(habitaciones, desde, 60, rng)
+            User.objects.bulk_create(
+                [
+                    User(username=f"consultas_{ronda}_{i}")
+                    for i in range(self.HABITACIONES)
+                ]
+            )
+            # Las vistas imprimen trazas de depuración: no ensuciar la salida
+            with self.subTest(
+                ronda=ronda, reservas=Reserva.objects.count()
+            ), redirect_stdout(StringIO()):
+                self.assertConsultasFijas(
+                    consultas_esperadas(
+                        habitaciones[0].id, Reserva.objects.latest("id").id
+                    ),
+                    usuario,
+                    mediciones,
+                )
+
+
+class OcupacionDiariaTests(TestCase):
+    """OcupacionDiaria se mantiene sola en cada camino de escritura del ORM,
+    sin `rebuild_ocupacion`"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # crear_reservas usa bulk_create
+        _, cls.habitaciones = crear_datos(habitaciones=5, dias=40)
+
+    def assertOcupacionAlDia(self):
+        self.assertEqual(diferencias_ocupacion(), [])
+
+    def reserva(self):
+        return Reserva.objects.order_by("id").first()
+
+    def test_bulk_create(self):
+        self.assertTrue(OcupacionDiaria.objects.exists())
+        self.assertOcupacionAlDia()
+
+    def test_alta(self):
+        reserva = Reserva(
+            encargado="test",
+            nhabitacion=self.habitaciones[0],
+            nombre="Alta",
+            apellido="Test",
+            personas=2,
+            fecha_ingreso=date.today() + timedelta(days=100),
+            fecha_egreso=date.today() + timedelta(days=104),
+            monto_total=40000,
+            senia=10000,
+            cantidad_habitaciones=2,
+            origen="Directo",
+        )
+        reserva.save()
+        self.assertEqual(OcupacionDiaria.objects.filter(reserva=reserva).count(), 4)
+        self.assertOcupacionAlDia()
+
+    def test_modificacion(self):
+        cambios = {
+            "fechas": lambda r: setattr(
+                r, "fecha_egreso", r.fecha_egreso + timedelta(days=3)
+            ),
+            "ingreso": lambda r: setattr(
+                r, "fecha_ingreso", r.fecha_ingreso - timedelta(days=2)
+            ),
+            "habitacion": lambda r: setattr(r, "nhabitacion", self.habitaciones[-1]),
+            "personas": lambda r: setattr(r, "personas", r.personas + 1),
+            "monto": lambda r: setattr(r, "monto_total", r.monto_total * 2),
+            "cantidad": lambda r: setattr(r, "cantidad_habitaciones", 3),
+        }
+        for nombre, cambiar in cambios.items():
+            with self.subTest(cambio=nombre):
+                reserva = self.reserva()
+                cambiar(reserva)
+                reserva.save()
+                self.assertOcupacionAlDia()
+
+    def test_update(self):
+        valores = {
+            "nhabitacion": lambda: self.habitaciones[-1],
+            "fecha_ingreso": lambda: F("fecha_ingreso") - timedelta(days=1),
+            "fecha_egreso": lambda: F("fecha_egreso") + timedelta(days=2),
+            "personas": lambda: F("personas") + 1,
+            "noches": lambda: F("noches") + 1,
+            "precio_por_noche": lambda: 0,
+            "monto_total": lambda: F("monto_total") * 2,
+            "cantidad_habitaciones": lambda: 0,
+        }
+        for campo, valor in valores.items():
+            with self.subTest(campo=campo):
+                Reserva.objects.filter(
+                    id__in=Reserva.objects.order_by("id").values("id")[:10]
+                ).update(**{campo: valor()})
+                self.assertOcupacionAlDia()
+
+    def test_borrado(self):
+        self.reserva().delete()
+        self.assertOcupacionAlDia()
+        Reserva.objects.filter(nhabitacion=self.habitaciones[1]).delete()
+        self.assertOcupacionAlDia()
+        self.habitaciones[2].delete()
+        self.assertOcupacionAlDia()
+
+
+class PlanningTests(TestCase):
+    """construir_planning y construir_planning_runs dan el mismo resultado
+    que el recorrido anterior (benchmark_planning.planning_anterior)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        crear_datos(habitaciones=8, dias=120)
+        cls.primer_dia = date.today() - timedelta(days=20)
+        cls.suite = Habitacion.objects.create(numero="S1", tipo="suite", piso="1")
+        cls.doble = Habitacion.objects.create(numero="D1", tipo="doble", piso="0")
+        dia = cls.primer_dia
+        for habitacion, ingreso, egreso in [
+            # Cruzan el inicio y el fin de la ventana, o la cubren entera
+            (cls.suite, dia - timedelta(days=10), dia + timedelta(days=2)),
+            (cls.suite, dia + timedelta(days=55), dia + timedelta(days=70)),
+            (cls.doble, dia - timedelta(days=30), dia + timedelta(days=90)),
+            # Sale el primer día / entra el día después del último
+            (cls.suite, dia - timedelta(days=5), dia),
+            (cls.suite, dia + timedelta(days=60), dia + timedelta(days=62)),
+            # Salida e ingreso el mismo día
+            (cls.suite, dia + timedelta(days=10), dia + timedelta(days=14)),
+            (cls.suite, dia + timedelta(days=14), dia + timedelta(days=15)),
+            # Cero noches y fechas invertidas
+            (cls.suite, dia + timedelta(days=20), dia + timedelta(days=20)),
+            (cls.suite, dia, dia),
+            (cls.suite, dia + timedelta(days=25), dia + timedelta(days=22)),
+        ]:
+            reservar(habitacion, ingreso, egreso)
+
+    def assertIgualAlAnterior(self, num_dias=60, orden=None):
+        anterior = planning_anterior(self.primer_dia, num_dias, orden)
+        self.assertEqual(construir_planning(self.primer_dia, num_dias), anterior)
+        self.assertEqual(
+            expandir_runs(construir_planning_runs(self.primer_dia, num_dias)),
+            anterior,
+        )
+
+    def test_igual_al_anterior(self):
+        for num_dias in (1, 7, 60, 120):
+            with self.subTest(num_dias=num_dias):
+                self.assertIgualAlAnterior(num_dias)
+
+    def test_solapamientos(self):
+        if solapamiento_en_base():
+            self.skipTest("La restricción de exclusión no admite solapamientos")
+        dia = self.primer_dia
+        habitacion = Habitacion.objects.create(numero="X1", tipo="triple", piso="2")
+        # La de menor id empieza antes: cualquier orden da el mismo resultado
+        reservar(habitacion, dia + timedelta(days=3), dia + timedelta(days=9))
+        reservar(habitacion, dia + timedelta(days=6), dia + timedelta(days=12))
+        reservar(habitacion, dia + timedelta(days=4), dia + timedelta(days=5))
+        self.assertIgualAlAnterior()
+
+        # La de menor id empieza después: el recorrido anterior dependía del
+        # orden de la base (por id con los índices de entonces); el motor
+        # fija ese orden
+        reservar(habitacion, dia + timedelta(days=30), dia + timedelta(days=35))
+        reservar(habitacion, dia + timedelta(days=28), dia + timedelta(days=32))
+        self.assertIgualAlAnterior(orden="id")
+
+
+class ImportacionTests(TestCase):
+    def setUp(self):
+        self.habitacion = Habitacion.objects.create(numero="I1", tipo="doble", piso="1")
+        self.dia = date.today() + timedelta(days=10)
+
+    def fila(self, ingreso, egreso, nombre="Huesped"):
+        return {
+            "habitacion_numero": "I1",
+            "nombre": nombre,
+            "apellido": "Test",
+            "check_in": ingreso.isoformat(),
+            "check_out": egreso.isoformat(),
+            "monto_total": "1000",
+            "senia": "0",
+            "origen": "Directo",
+        }
+
+    def importar(self, filas, restriccion):
+        # Con la restricción de exclusión el INSERT rechaza los solapamientos,
+        # pero las validaciones por fila tienen que ser las mismas
+        with mock.patch(
+            "apps.reservas.importacion.solapamiento_en_base", return_value=restriccion
+        ):
+            return ImportadorReservas().importar(filas)
+
+    def test_duplicada_sin_noches(self):
+        reserva = reservar(self.habitacion, self.dia, self.dia)
+        fila = self.fila(self.dia, self.dia, nombre=reserva.nombre)
+        for restriccion in (False, True):
+            with self.subTest(restriccion=restriccion):
+                resumen = self.importar([fila], restriccion)
+                self.assertEqual(resumen["creadas"], 0)
+                self.assertIn("Duplicada", resumen["detalles_error"][0])
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_fechas_invertidas(self):
+        fila = self.fila(self.dia, self.dia - timedelta(days=2))
+        for restriccion in (False, True):
+            with self.subTest(restriccion=restriccion):
+                resumen = self.importar([fila], restriccion)
+                self.assertEqual(resumen["creadas"], 0)
+                self.assertIn("Fechas inválidas", resumen["detalles_error"][0])
+        self.assertFalse(Reserva.objects.exists())
+
+
+@override_settings(DISPONIBILIDAD_INDICE_MARGEN=10)
+class DisponibilidadTests(TestCase):
+    def setUp(self):
+        self.rng, _ = crear_datos(dias=120)
+        self.indice = IndiceDisponibilidad(ttl=float("inf"))
+
+    def test_reconstruccion_acotada(self):
+        desde = date.today() - timedelta(days=10)
+        self.assertEqual(self.indice.desde(), desde)
+        cargadas = sum(
+            len(self.indice.rangos(h.id)) for h in self.indice.habitaciones()
+        )
+        self.assertEqual(
+            cargadas, Reserva.objects.filter(fecha_egreso__gte=desde).count()
+        )
+        self.assertLess(cargadas, Reserva.objects.count())
+
+    def test_igual_a_la_base(self):
+        # Incluye rangos que empiezan antes del margen (se consultan a la base)
+        for _ in range(200):
+            ingreso = date.today() + timedelta(days=self.rng.randint(-70, 70))
+            egreso = ingreso + timedelta(days=self.rng.randint(1, 14))
+            personas = self.rng.choice([None, 1, 2, 3, 4, 5])
+            with self.subTest(ingreso=ingreso, egreso=egreso, personas=personas):
+                self.assertEqual(
+                    {h.id for h in self.indice.disponibles(ingreso, egreso, personas)},
+                    disponibles_db(ingreso, egreso, personas),
+                )
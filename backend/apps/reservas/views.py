@@ -6,12 +6,11 @@ from datetime import datetime, timedelta, date
 from .forms import HabitacionForm, ReservaForm
 from django.db.models import Q
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
-import requests
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -22,6 +21,9 @@ from django.contrib.auth import authenticate, login
 from .forms import UsuarioForm
 from .decorators import supervisor_required
 from .models import PerfilUsuario
+from .planning import grilla_ocupacion, habitaciones_ordenadas
+from .estado_habitaciones import estado_habitaciones
+from .cotizacion import cotizacion_actual
 import json
 
 
@@ -46,18 +48,15 @@ def custom_login(request):
 
 
 def get_dollar_rate():
-    url = "https://www.bloomberg.com/quote/USDARS:CUR"
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, "html.parser")
-        quote = soup.find(
-            "div", class_="sized-price media-ui-SizedPrice_extraLarge-05pKbJRbUH8-"
-        )
-
-        if quote:
-            return quote.text.strip()
-    return "N/A"
+    """Última cotización guardada y su hora, sin esperar a la red (ver
+    cotizacion.py)"""
+    cotizacion = cotizacion_actual()
+    if cotizacion is None:
+        return "N/A", None
+    actualizada = datetime.fromtimestamp(
+        cotizacion["actualizada"], tz=timezone.get_current_timezone()
+    )
+    return cotizacion["valor"], actualizada
 
 
 def update_checkins_checkouts(request):
@@ -126,51 +125,28 @@ def generar_planing(request):
     days = [first_day + timedelta(days=i) for i in range(60)]
     print("Días generados para el planning:", days)
 
-    habitaciones = list(Habitacion.objects.all())
-
-    tipo_orden = {"doble": 1, "triple": 2, "cuadruple": 3, "quintuple": 4}
-
-    habitaciones.sort(key=lambda x: tipo_orden.get(x.tipo, 5))
-
-    reservas = Reserva.objects.filter(
-        fecha_ingreso__lte=days[-1], fecha_egreso__gte=days[0]
-    ).select_related("nhabitacion")
+    habitaciones = habitaciones_ordenadas()
+    grilla = grilla_ocupacion(habitaciones, first_day, len(days))
 
     planing = []
     for habitacion in habitaciones:
         ocupaciones = []
-        nombre_mostrado = set()
-        reservas_habitacion = reservas.filter(nhabitacion=habitacion)
-        for day in days:
-            ocupacion = None
-            for reserva in reservas_habitacion:
-                if reserva.fecha_ingreso <= day < reserva.fecha_egreso:
-                    if (
-                        day == reserva.fecha_ingreso
-                        and reserva.id not in nombre_mostrado
-                    ):
-                        nombre_mostrado.add(reserva.id)
-                        ocupacion = {
-                            "is_occupied": True,
-                            "is_last_night": day
-                            == reserva.fecha_egreso - timedelta(days=1),
-                            "nombre": reserva.nombre,
-                        }
-                    else:
-                        ocupacion = {
-                            "is_occupied": True,
-                            "is_last_night": day
-                            == reserva.fecha_egreso - timedelta(days=1),
-                            "nombre": None,
-                        }
-                    break
-            if not ocupacion:
-                ocupacion = {
-                    "is_occupied": False,
-                    "is_last_night": False,
-                    "nombre": None,
-                }
-            ocupaciones.append(ocupacion)
+        for reserva, day in zip(grilla[habitacion.id], days):
+            if reserva is None:
+                ocupaciones.append(
+                    {"is_occupied": False, "is_last_night": False, "nombre": None}
+                )
+            else:
+                ocupaciones.append(
+                    {
+                        "is_occupied": True,
+                        "is_last_night": day
+                        == reserva.fecha_egreso - timedelta(days=1),
+                        "nombre": (
+                            reserva.nombre if day == reserva.fecha_ingreso else None
+                        ),
+                    }
+                )
         planing.append({"habitacion": habitacion, "ocupaciones": ocupaciones})
 
     return render(
@@ -297,21 +273,10 @@ def cargar_reserva(request):
 
 
 def obtener_estado_habitaciones():
-    today = datetime.today().date()
-    reservas_hoy = Reserva.objects.filter(
-        fecha_ingreso__lte=today, fecha_egreso__gt=today
-    )
-
-    habitaciones = Habitacion.objects.all()
-    estado_habitaciones = []
-
-    for habitacion in habitaciones:
-        ocupada = reservas_hoy.filter(nhabitacion=habitacion).exists()
-        estado_habitaciones.append(
-            {"numero": habitacion.numero, "tipo": habitacion.tipo, "ocupada": ocupada}
-        )
-
-    return estado_habitaciones
+    return [
+        {"numero": e["numero"], "tipo": e["tipo"], "ocupada": e["ocupada"]}
+        for e in estado_habitaciones()
+    ]
 
 
 def detalles_habitacion(request, numero_habitacion):
@@ -338,110 +303,52 @@ def detalles_habitacion(request, numero_habitacion):
 @login_required
 def home(request):
     selected_date = request.GET.get("selected_date", date.today().strftime("%Y-%m-%d"))
+    try:
+        fecha_seleccionada = date.fromisoformat(selected_date)
+    except ValueError:
+        fecha_seleccionada = date.today()
+        selected_date = fecha_seleccionada.strftime("%Y-%m-%d")
 
     # Obtener las reservas del día seleccionado
-    checkin = Reserva.objects.filter(fecha_ingreso=selected_date)
-    checkout = Reserva.objects.filter(fecha_egreso=selected_date)
-
-    # Obtener habitaciones ocupadas en la fecha seleccionada
-    habitaciones_ocupadas = Habitacion.objects.filter(
-        reserva__fecha_ingreso__lte=selected_date,
-        reserva__fecha_egreso__gte=selected_date,
+    checkin = Reserva.objects.filter(fecha_ingreso=selected_date).select_related(
+        "nhabitacion"
+    )
+    checkout = Reserva.objects.filter(fecha_egreso=selected_date).select_related(
+        "nhabitacion"
     )
 
-    # Obtener el estado de todas las habitaciones para el día seleccionado
-    habitaciones = Habitacion.objects.all()
-    estado_habitaciones = []
-
-    for habitacion in habitaciones:
-        ocupada = habitaciones_ocupadas.filter(id=habitacion.id).exists()
-        estado_habitaciones.append(
-            {"numero": habitacion.numero, "tipo": habitacion.tipo, "ocupada": ocupada}
-        )
-
-    habitaciones_disponibles = []
-    for habitacion in habitaciones:
-        reservas_habitacion = Reserva.objects.filter(nhabitacion=habitacion).order_by(
-            "fecha_ingreso"
-        )
-        hoy_ocupada = reservas_habitacion.filter(
-            fecha_ingreso__lte=date.today(), fecha_egreso__gte=date.today()
-        ).exists()
-
-        if not hoy_ocupada:
-            proxima_reserva = reservas_habitacion.filter(
-                fecha_ingreso__gt=date.today()
-            ).first()
-            if proxima_reserva:
-                dias_disponibles = (proxima_reserva.fecha_ingreso - date.today()).days
-            else:
-                dias_disponibles = (
-                    30  # Asumir 30 días disponibles si no hay reservas futuras
-                )
-            habitaciones_disponibles.append(
-                {
-                    "numero": habitacion.numero,
-                    "tipo": habitacion.tipo,
-                    "dias_disponibles": dias_disponibles,
-                }
-            )
+    # Estado de todas las habitaciones para el día seleccionado (el día de
+    # salida cuenta como ocupado)
+    estado_seleccionado = estado_habitaciones(fecha_seleccionada, incluir_egreso=True)
+    estado_hoy = (
+        estado_seleccionado
+        if fecha_seleccionada == date.today()
+        else estado_habitaciones(date.today(), incluir_egreso=True)
+    )
 
-    for reserva in checkin:
-        reserva.monto_total_formatted = (
-            "${:,.2f}".format(reserva.monto_total)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.senia_formatted = (
-            "${:,.2f}".format(reserva.senia)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.resto_formatted = (
-            "${:,.2f}".format(reserva.resto)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.precio_por_noche_formatted = (
-            "${:,.2f}".format(reserva.precio_por_noche)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
+    estado_mapa = [
+        {"numero": e["numero"], "tipo": e["tipo"], "ocupada": e["ocupada"]}
+        for e in estado_seleccionado
+    ]
 
-    for reserva in checkout:
-        reserva.monto_total_formatted = (
-            "${:,.2f}".format(reserva.monto_total)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.senia_formatted = (
-            "${:,.2f}".format(reserva.senia)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.resto_formatted = (
-            "${:,.2f}".format(reserva.resto)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.precio_por_noche_formatted = (
-            "${:,.2f}".format(reserva.precio_por_noche)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
+    # Habitaciones libres hoy y días hasta la próxima llegada
+    habitaciones_disponibles = [
+        {
+            "numero": e["numero"],
+            "tipo": e["tipo"],
+            # Asumir 30 días disponibles si no hay reservas futuras
+            "dias_disponibles": (
+                e["dias_hasta_proxima"] if e["dias_hasta_proxima"] is not None else 30
+            ),
+        }
+        for e in estado_hoy
+        if not e["ocupada"]
+    ]
 
     # Obtener últimas reservas
     reservas = Reserva.objects.all().order_by("-id")[:5]
 
-    dollar_rate = get_dollar_rate()
+    dollar_rate, dollar_rate_actualizada = get_dollar_rate()
 
     return render(
         request,
@@ -451,40 +358,16 @@ def home(request):
             "checkin": checkin,
             "checkout": checkout,
             "habitaciones_disponibles": habitaciones_disponibles,
-            "estado_habitaciones": estado_habitaciones,
+            "estado_habitaciones": estado_mapa,
             "selected_date": selected_date,
             "dollar_rate": dollar_rate,
+            "dollar_rate_actualizada": dollar_rate_actualizada,
         },
     )
 
 
 def detalle_reserva(request, reserva_id):
     reserva = get_object_or_404(Reserva, pk=reserva_id)
-    reserva.monto_total_formatted = (
-        "${:,.2f}".format(reserva.monto_total)
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
-    reserva.senia_formatted = (
-        "${:,.2f}".format(reserva.senia)
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
-    reserva.resto_formatted = (
-        "${:,.2f}".format(reserva.resto)
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
-    reserva.precio_por_noche_formatted = (
-        "${:,.2f}".format(reserva.precio_por_noche)
-        .replace(",", "X")
-        .replace(".", ",")
-        .replace("X", ".")
-    )
-
     return render(request, "detalle_reserva.html", {"reserva": reserva})
 
 
@@ -504,35 +387,54 @@ def eliminar_reserva(request, reserva_id):
     return render(request, "reservas/eliminar_reserva.html", {"reserva": reserva})
 
 
+LISTADO_RESERVAS_POR_PAGINA = 50
+# Ventana de fechas por defecto del listado, relativa a hoy
+LISTADO_RESERVAS_DIAS_ANTES = 30
+LISTADO_RESERVAS_DIAS_DESPUES = 90
+
+
+def _fecha_param(request, nombre, defecto):
+    try:
+        return date.fromisoformat(request.GET.get(nombre, ""))
+    except ValueError:
+        return defecto
+
+
 def listar_reservas(request):
-    reservas = Reserva.objects.all()
-    for reserva in reservas:
-        reserva.monto_total_formatted = (
-            "${:,.2f}".format(reserva.monto_total)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.senia_formatted = (
-            "${:,.2f}".format(reserva.senia)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.resto_formatted = (
-            "${:,.2f}".format(reserva.resto)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
-        reserva.precio_por_noche_formatted = (
-            "${:,.2f}".format(reserva.precio_por_noche)
-            .replace(",", "X")
-            .replace(".", ",")
-            .replace("X", ".")
-        )
+    """Reservas que se solapan con la ventana [desde, hasta], paginadas.
+
+    Sin parámetros muestra desde 30 días atrás hasta 90 días adelante; los
+    importes se formatean en la plantilla sólo para la página visible.
+    """
+    hoy = date.today()
+    desde = _fecha_param(
+        request, "desde", hoy - timedelta(days=LISTADO_RESERVAS_DIAS_ANTES)
+    )
+    hasta = _fecha_param(
+        request, "hasta", hoy + timedelta(days=LISTADO_RESERVAS_DIAS_DESPUES)
+    )
+    if desde > hasta:
+        desde, hasta = hasta, desde
 
-    return render(request, "reservas/listar_reservas.html", {"reservas": reservas})
+    reservas = (
+        Reserva.objects.filter(fecha_egreso__gte=desde, fecha_ingreso__lte=hasta)
+        .select_related("nhabitacion")
+        .order_by("fecha_ingreso", "id")
+    )
+    pagina = Paginator(reservas, LISTADO_RESERVAS_POR_PAGINA).get_page(
+        request.GET.get("page")
+    )
+
+    return render(
+        request,
+        "reservas/listar_reservas.html",
+        {
+            "reservas": pagina,
+            "pagina": pagina,
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+        },
+    )
 
 
 def editar_reserva(request, reserva_id):
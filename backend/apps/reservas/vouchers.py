@@ -0,0 +1,337 @@
+"""Vouchers PDF de reservas (ReportLab).
+
+El armado se hace a partir de `datos_voucher(reserva)`: un dict sólo con
+los valores que aparecen en el voucher, ya convertidos a texto. Así el PDF
+depende únicamente de ese dict:
+
+- `voucher_pdf` / `voucher_multi_pdf` lo guardan en el cache de Django con
+  una clave que es el hash del contenido (más VERSION_VOUCHER). Reimprimir
+  el mismo voucher no vuelve a generar el documento; si la reserva o su
+  habitación cambian, el hash cambia y se genera uno nuevo. Las entradas
+  viejas expiran a los VOUCHER_CACHE_TTL segundos.
+- se puede enviar a otro proceso para generar muchos en paralelo (ver
+  exportacion_vouchers.py).
+
+Las hojas de estilo, los TableStyle y el logo (ImageReader) se cargan una
+sola vez por proceso.
+"""
+
+import hashlib
+import json
+import os
+from decimal import Decimal
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .moneda import formato_moneda
+
+# Incrementar al cambiar el diseño: invalida los PDFs guardados
+VERSION_VOUCHER = 1
+PREFIJO = "reservas:voucher"
+
+NOTAS = [
+    "Check-in a partir de las 12:00 del mediodía.",
+    "Check-out a las 10:00 de la mañana.",
+    "La totalidad de la reserva debe estar abonada para ingresar a la habitación.",
+]
+
+ESTILO_TABLA = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#f9fafb")),
+        (
+            "ROWBACKGROUNDS",
+            (0, 1),
+            (-1, -1),
+            [colors.HexColor("#ffffff"), colors.HexColor("#f3f4f6")],
+        ),
+        ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#e5e7eb")),
+        ("INNERGRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#e5e7eb")),
+    ]
+)
+
+ESTILO_DETALLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#eef2ff")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        (
+            "ROWBACKGROUNDS",
+            (0, 1),
+            (-1, -1),
+            [colors.white, colors.HexColor("#fafafa")],
+        ),
+        ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#e5e7eb")),
+        ("INNERGRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#e5e7eb")),
+    ]
+)
+
+
+@lru_cache(maxsize=None)
+def _estilos():
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=None)
+def _logo() -> Optional[ImageReader]:
+    """Logo decodificado una vez por proceso (None si no está o no se lee)"""
+    ruta = os.path.join(settings.BASE_DIR, "staticfiles", "images", "logo.png")
+    if not os.path.exists(ruta):
+        return None
+    try:
+        logo = ImageReader(ruta)
+        logo.getSize()
+        return logo
+    except Exception:
+        return None
+
+
+def datos_voucher(reserva) -> Dict[str, str]:
+    """Valores de la reserva (y su habitación) que muestra el voucher"""
+    return {
+        "id": str(reserva.id),
+        "habitacion_numero": str(reserva.nhabitacion.numero),
+        "habitacion_tipo": str(reserva.nhabitacion.tipo),
+        "nombre": f"{reserva.nombre} {reserva.apellido}",
+        "telefono": str(reserva.telefono),
+        "origen": str(reserva.origen),
+        "encargado": str(reserva.encargado),
+        "fecha_ingreso": reserva.fecha_ingreso.strftime("%d/%m/%Y"),
+        "fecha_egreso": reserva.fecha_egreso.strftime("%d/%m/%Y"),
+        "noches": str(reserva.noches),
+        "personas": str(reserva.personas),
+        "monto_total": formato_moneda(reserva.monto_total),
+        "senia": formato_moneda(reserva.senia),
+        "resto": formato_moneda(reserva.resto),
+        "precio_por_noche": formato_moneda(reserva.precio_por_noche),
+        "observaciones": reserva.observaciones or "",
+        # Importes sin formato, para los totales del voucher combinado
+        "monto_total_valor": str(reserva.monto_total),
+        "senia_valor": str(reserva.senia),
+        "resto_valor": str(reserva.resto),
+    }
+
+
+def hash_voucher(datos) -> str:
+    contenido = json.dumps([VERSION_VOUCHER, datos], sort_keys=True)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def _documento(destino) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        destino,
+        pagesize=A4,
+        leftMargin=18 * mm,
+        rightMargin=18 * mm,
+        topMargin=18 * mm,
+        bottomMargin=18 * mm,
+    )
+
+
+def _encabezado(canvas_obj, doc_obj):
+    """Logo en la esquina superior derecha"""
+    logo = _logo()
+    if logo is None:
+        return
+    ancho = 35 * mm
+    iw, ih = logo.getSize()
+    alto = ih * ancho / float(iw)
+    x = doc_obj.pagesize[0] - doc_obj.rightMargin - ancho
+    y = doc_obj.pagesize[1] - doc_obj.topMargin - alto
+    canvas_obj.drawImage(
+        logo, x, y, width=ancho, height=alto, preserveAspectRatio=True, mask="auto"
+    )
+
+
+def _tabla(elements: list, titulo: str, data: list) -> Table:
+    estilos = _estilos()
+    elements.extend([Paragraph(f"<b>{titulo}</b>", estilos["Heading3"]), Spacer(1, 6)])
+    table = Table(data, colWidths=[60 * mm, 100 * mm])
+    table.setStyle(ESTILO_TABLA)
+    return table
+
+
+def _titulo(elements: list, subtitulo: str) -> None:
+    estilos = _estilos()
+    elements.extend(
+        [
+            Paragraph(
+                "<para align='center'><b>Voucher de Reserva</b></para>",
+                estilos["Title"],
+            ),
+            Spacer(1, 6),
+            Paragraph(f"<para align='center'>{subtitulo}</para>", estilos["Normal"]),
+            Spacer(1, 12),
+        ]
+    )
+
+
+def _datos_huesped(datos) -> list:
+    return [
+        ["Nombre", datos["nombre"]],
+        ["Teléfono", datos["telefono"]],
+        ["Origen", datos["origen"]],
+        ["Encargado", datos["encargado"]],
+    ]
+
+
+def _elementos_voucher(datos: Dict[str, str]) -> list:
+    estilos = _estilos()
+    elements: list = []
+    _titulo(
+        elements,
+        f"Reserva #{datos['id']} · Habitación {datos['habitacion_numero']} "
+        f"({datos['habitacion_tipo']})",
+    )
+
+    fechas_data = [
+        ["Fecha de ingreso", datos["fecha_ingreso"]],
+        ["Fecha de salida", datos["fecha_egreso"]],
+        ["Noches", datos["noches"]],
+        ["Personas", datos["personas"]],
+    ]
+    montos_data = [
+        ["Monto total", datos["monto_total"]],
+        ["Seña", datos["senia"]],
+        ["Resto", datos["resto"]],
+        ["Precio por noche", datos["precio_por_noche"]],
+    ]
+
+    elements.append(_tabla(elements, "Datos del huésped", _datos_huesped(datos)))
+    elements.append(Spacer(1, 10))
+    elements.append(_tabla(elements, "Estadía", fechas_data))
+    elements.append(Spacer(1, 10))
+    elements.append(_tabla(elements, "Montos", montos_data))
+    elements.append(Spacer(1, 14))
+
+    for nota in NOTAS:
+        elements.append(
+            Paragraph(f"<font color='#111827'>• {nota}</font>", estilos["Normal"])
+        )
+        elements.append(Spacer(1, 4))
+
+    if datos["observaciones"]:
+        elements.append(Spacer(1, 6))
+        elements.append(Paragraph("<b>Observaciones</b>", estilos["Heading3"]))
+        elements.append(Spacer(1, 4))
+        elements.append(Paragraph(datos["observaciones"], estilos["Normal"]))
+    return elements
+
+
+def generar_voucher(datos: Dict[str, str]) -> bytes:
+    """PDF del voucher de una reserva"""
+    salida = BytesIO()
+    _documento(salida).build(
+        _elementos_voucher(datos), onFirstPage=_encabezado, onLaterPages=_encabezado
+    )
+    return salida.getvalue()
+
+
+def generar_voucher_multi(lista: Sequence[Dict[str, str]]) -> bytes:
+    """PDF combinado de varias reservas del mismo huésped (una fila por
+    habitación); los datos generales se toman de la primera"""
+    elements: list = []
+    _titulo(elements, f"Reservas: {', '.join(datos['id'] for datos in lista)}")
+
+    elements.append(_tabla(elements, "Datos del huésped", _datos_huesped(lista[0])))
+    elements.append(Spacer(1, 10))
+
+    detalle_rows = [
+        [
+            "Habitación",
+            "Tipo",
+            "Personas",
+            "Ingreso",
+            "Egreso",
+            "Monto",
+            "Seña",
+            "Resto",
+        ]
+    ]
+    for datos in lista:
+        detalle_rows.append(
+            [
+                datos["habitacion_numero"],
+                datos["habitacion_tipo"],
+                datos["personas"],
+                datos["fecha_ingreso"],
+                datos["fecha_egreso"],
+                datos["monto_total"],
+                datos["senia"],
+                datos["resto"],
+            ]
+        )
+    table = Table(
+        detalle_rows,
+        colWidths=[
+            22 * mm,
+            22 * mm,
+            18 * mm,
+            22 * mm,
+            22 * mm,
+            24 * mm,
+            24 * mm,
+            24 * mm,
+        ],
+    )
+    table.setStyle(ESTILO_DETALLE)
+    elements.append(table)
+    elements.append(Spacer(1, 10))
+
+    def total(campo):
+        return formato_moneda(sum(Decimal(datos[campo]) for datos in lista))
+
+    totales = [
+        ["Total Monto", total("monto_total_valor")],
+        ["Total Seña", total("senia_valor")],
+        ["Total Resto", total("resto_valor")],
+    ]
+    elements.append(_tabla(elements, "Totales", totales))
+
+    salida = BytesIO()
+    _documento(salida).build(elements)
+    return salida.getvalue()
+
+
+def clave_voucher(datos: Dict[str, str]) -> str:
+    return f"{PREFIJO}:{hash_voucher(datos)}"
+
+
+def _cacheado(clave: str, generar) -> bytes:
+    pdf = cache.get(clave)
+    if pdf is None:
+        pdf = generar()
+        cache.set(clave, pdf, timeout=settings.VOUCHER_CACHE_TTL)
+    return pdf
+
+
+def voucher_pdf(reserva) -> bytes:
+    """PDF del voucher, del cache si la reserva no cambió"""
+    datos = datos_voucher(reserva)
+    return _cacheado(clave_voucher(datos), lambda: generar_voucher(datos))
+
+
+def voucher_multi_pdf(reservas) -> bytes:
+    """PDF combinado, del cache si ninguna de las reservas cambió"""
+    lista: List[Dict[str, str]] = [datos_voucher(reserva) for reserva in reservas]
+    return _cacheado(
+        f"{PREFIJO}:multi:{hash_voucher(lista)}", lambda: generar_voucher_multi(lista)
+    )
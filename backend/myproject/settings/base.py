@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -134,6 +135,82 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Índice de disponibilidad en memoria (apps/reservas/disponibilidad.py):
+# segundos máximos antes de reconstruirlo aunque no haya señales en este proceso
+DISPONIBILIDAD_INDICE_TTL = int(os.environ.get("DISPONIBILIDAD_INDICE_TTL", "60"))
+# días hacia atrás de reservas (por fecha de egreso) que carga al reconstruirse
+DISPONIBILIDAD_INDICE_MARGEN = int(os.environ.get("DISPONIBILIDAD_INDICE_MARGEN", "30"))
+
+# Importaciones en segundo plano (apps/reservas/tareas_importacion.py):
+# carpeta donde se guardan los archivos subidos hasta procesarlos e hilos
+# del proceso web que las ejecutan. Con 0 hilos quedan pendientes para el
+# comando `procesar_importaciones`, que debe correr con acceso a la carpeta.
+IMPORTACIONES_DIR = os.environ.get(
+    "IMPORTACIONES_DIR", os.path.join(tempfile.gettempdir(), "hotel_importaciones")
+)
+IMPORTACIONES_WORKERS = int(os.environ.get("IMPORTACIONES_WORKERS", "2"))
+# Segundos en `procesando` tras los cuales una importación se da por
+# interrumpida (el proceso que la ejecutaba se reinició)
+IMPORTACIONES_TIMEOUT = int(os.environ.get("IMPORTACIONES_TIMEOUT", "3600"))
+
+# Leer los KPIs de la tabla OcupacionDiaria en lugar de calcularlos sobre las
+# reservas. Activar después de cargarla con `rebuild_ocupacion`.
+KPIS_DESDE_OCUPACION = (
+    os.environ.get("KPIS_DESDE_OCUPACION", "False").lower() == "true"
+)
+
+# Cache de Django. locmem sirve con un solo proceso; con varios workers hay
+# que compartirlo (CACHE_BACKEND=file o db; para db correr createcachetable)
+# para que la invalidación por señales llegue a todos.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+if CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get(
+                "CACHE_DIR", os.path.join(tempfile.gettempdir(), "hotel_cache")
+            ),
+        }
+    }
+elif CACHE_BACKEND == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "hotel_cache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "hotel",
+        }
+    }
+
+# Respuestas cacheadas de dashboard y estadísticas (apps/reservas/cache_respuestas.py):
+# segundos de vida; los cambios de datos las invalidan antes por señales
+RESPUESTAS_CACHE_TTL = int(os.environ.get("RESPUESTAS_CACHE_TTL", "300"))
+
+# Cotización del dólar (apps/reservas/cotizacion.py): se sirve siempre desde
+# la última guardada en la base (tabla CotizacionDolar) y se renueva en segundo plano cuando tiene más de
+# COTIZACION_INTERVALO segundos. COTIZACION_FETCHER es la función que la
+# consulta (ruta de import; se puede reemplazar por una local en pruebas).
+COTIZACION_INTERVALO = int(os.environ.get("COTIZACION_INTERVALO", "900"))
+COTIZACION_TIMEOUT = float(os.environ.get("COTIZACION_TIMEOUT", "5"))
+COTIZACION_FETCHER = os.environ.get(
+    "COTIZACION_FETCHER", "apps.reservas.cotizacion.cotizacion_bloomberg"
+)
+
+# Vouchers PDF (apps/reservas/vouchers.py): se guardan en el cache con el hash
+# de su contenido; segundos de vida de cada PDF
+VOUCHER_CACHE_TTL = int(os.environ.get("VOUCHER_CACHE_TTL", str(7 * 24 * 3600)))
+# Exportación masiva (apps/reservas/exportacion_vouchers.py): procesos que
+# generan los PDFs en paralelo y máximo de reservas por exportación
+VOUCHERS_EXPORTACION_PROCESOS = int(
+    os.environ.get("VOUCHERS_EXPORTACION_PROCESOS", str(min(4, os.cpu_count() or 1)))
+)
+VOUCHERS_EXPORTACION_MAX = int(os.environ.get("VOUCHERS_EXPORTACION_MAX", "500"))
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -161,8 +238,12 @@ CORS_ALLOW_HEADERS = [
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
+    "if-none-match",
 ]
 
+# Headers que el frontend necesita leer en pedidos cross-origin (GET condicional)
+CORS_EXPOSE_HEADERS = ["etag", "last-modified", "x-cache"]
+
 # CSRF Configuration
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
@@ -89,6 +89,20 @@ else:
         }
     }
 
+# Los archivos de importaciones tienen que sobrevivir a un reinicio (y ser
+# visibles para el worker de `procesar_importaciones` si corre aparte): en
+# Railway, la ruta de un volumen montado. Sin IMPORTACIONES_DIR se usa el tmp
+# del contenedor (base.py), que se borra al reiniciar: las importaciones en
+# curso se marcan fallidas al arrancar y hay que volver a subir el archivo.
+if not os.environ.get("IMPORTACIONES_DIR"):
+    import logging
+
+    logging.getLogger(__name__).warning(
+        "IMPORTACIONES_DIR no definido: los archivos de importación se guardan "
+        "en %s y se pierden al reiniciar; usar la ruta de un volumen",
+        IMPORTACIONES_DIR,
+    )
+
 # Configuración de archivos estáticos
 STATIC_ROOT = Path.joinpath(BASE_DIR, "staticfiles")
 STATIC_URL = "/static/"
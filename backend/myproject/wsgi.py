@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 
 application = get_wsgi_application()
+
+# Retomar las importaciones de reservas que dejó un proceso anterior
+from apps.reservas.tareas_importacion import reanudar_importaciones  # noqa: E402
+
+reanudar_importaciones()
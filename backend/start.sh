@@ -10,6 +10,9 @@ python manage.py wait_for_db
 echo "Ejecutando migraciones..."
 python manage.py migrate
 
+# Tabla del cache (sólo se crea si CACHE_BACKEND=db)
+python manage.py createcachetable
+
 # Crear perfiles de usuario por defecto
 echo "Creando perfiles de usuario por defecto..."
 python manage.py create_default_profiles
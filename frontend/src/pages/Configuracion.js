@@ -3,21 +3,46 @@ import { toast } from 'react-toastify';
 import { reservasService } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 
+const INTERVALO_CONSULTA_MS = 1500;
+
+const esperar = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 const Configuracion = () => {
   const { user } = useAuth();
   const fileInputRef = useRef(null);
+  const dryRunRef = useRef(false);
   const [importing, setImporting] = useState(false);
+  const [procesadas, setProcesadas] = useState(0);
 
-  const handleImport = async (file) => {
+  // La importación corre en segundo plano: consultar el avance hasta que termine
+  const esperarImportacion = async (id) => {
+    for (;;) {
+      const { data } = await reservasService.getImportacion(id);
+      setProcesadas(data.procesadas || 0);
+      if (data.estado === 'completada' || data.estado === 'fallida') {
+        return data;
+      }
+      await esperar(INTERVALO_CONSULTA_MS);
+    }
+  };
+
+  const handleImport = async (file, dryRun) => {
     if (!file) {
       toast.warning('Selecciona un archivo .xlsx o .csv');
       return;
     }
     setImporting(true);
+    setProcesadas(0);
     try {
-      const res = await reservasService.importar(file);
-      const data = res.data || {};
-      toast.success(`Importadas: ${data.creadas || 0} / Errores: ${data.errores || 0}`);
+      const res = await reservasService.importar(file, { dryRun });
+      const importacion = await esperarImportacion(res.data.id);
+      const data = importacion.resultado || {};
+      if (importacion.estado === 'fallida') {
+        toast.error(importacion.error || 'Error al importar');
+      } else {
+        const etiqueta = importacion.dry_run ? 'Válidas' : 'Importadas';
+        toast.success(`${etiqueta}: ${data.creadas || 0} / Errores: ${data.errores || 0}`);
+      }
       if (Array.isArray(data.detalles_error) && data.detalles_error.length > 0) {
         console.warn('Errores de importación:', data.detalles_error);
       }
@@ -49,19 +74,35 @@ const Configuracion = () => {
             onChange={(e) => {
               const file = e.target.files?.[0];
               if (file) {
-                handleImport(file);
+                handleImport(file, dryRunRef.current);
               }
               e.target.value = '';
             }}
           />
-          <button
-            type="button"
-            onClick={() => fileInputRef.current?.click()}
-            disabled={importing}
-            className={`px-4 py-2 rounded-md text-white ${importing ? 'bg-gray-400' : 'bg-blue-600 hover:bg-blue-700'}`}
-          >
-            {importing ? 'Importando...' : 'Seleccionar archivo y importar'}
-          </button>
+          <div className="flex flex-wrap gap-3">
+            <button
+              type="button"
+              onClick={() => {
+                dryRunRef.current = true;
+                fileInputRef.current?.click();
+              }}
+              disabled={importing}
+              className={`px-4 py-2 rounded-md border ${importing ? 'text-gray-400 border-gray-300' : 'text-blue-700 border-blue-600 hover:bg-blue-50'}`}
+            >
+              Validar archivo (sin importar)
+            </button>
+            <button
+              type="button"
+              onClick={() => {
+                dryRunRef.current = false;
+                fileInputRef.current?.click();
+              }}
+              disabled={importing}
+              className={`px-4 py-2 rounded-md text-white ${importing ? 'bg-gray-400' : 'bg-blue-600 hover:bg-blue-700'}`}
+            >
+              {importing ? `Procesando... (${procesadas} filas)` : 'Seleccionar archivo y importar'}
+            </button>
+          </div>
         </div>
       )}
     </div>
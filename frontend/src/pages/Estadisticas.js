@@ -186,6 +186,28 @@ const Estadisticas = () => {
       .catch(() => setKpisError('Error obteniendo KPIs'));
   }, [startDate, endDate, prevRange]);
 
+  // Serie de KPIs calculada en el servidor: por día hasta 2 meses, por semana hasta 1 año, luego por mes
+  const [kpisSerie, setKpisSerie] = useState([]);
+  const granularidad = useMemo(() => {
+    const dias = Math.round((endDate - startDate) / (1000 * 60 * 60 * 24)) + 1;
+    if (dias <= 62) return 'day';
+    if (dias <= 366) return 'week';
+    return 'month';
+  }, [startDate, endDate]);
+
+  useEffect(() => {
+    const fmt = (d) => format(d, 'yyyy-MM-dd');
+    estadisticasService
+      .getKpis({ start_date: fmt(startDate), end_date: fmt(endDate), granularity: granularidad })
+      .then(r => setKpisSerie((r.data?.series || []).map(d => ({
+        fecha: formatShort(new Date(`${d.inicio}T00:00:00`)),
+        ocupacionPct: Number(d.ocupacion ?? 0) * 100,
+        adr: parseFloat(d.adr ?? 0),
+        revpar: parseFloat(d.revpar ?? 0),
+      }))))
+      .catch(() => setKpisSerie([]));
+  }, [startDate, endDate, granularidad]);
+
   const pctChange = (curr, prev) => {
     if (prev === 0) return curr > 0 ? 100 : 0;
     return ((curr - prev) / prev) * 100;
@@ -468,6 +490,30 @@ const Estadisticas = () => {
         </div>
       </div>
 
+      <div className="bg-white rounded-lg shadow p-4">
+        <div className="flex items-center justify-between mb-3">
+          <h3 className="text-lg font-semibold text-gray-800">Evolución de Ocupación, ADR y RevPAR</h3>
+          <span className="text-xs text-gray-500">
+            Por {granularidad === 'day' ? 'día' : granularidad === 'week' ? 'semana' : 'mes'}
+          </span>
+        </div>
+        <div className="w-full h-72">
+          <ResponsiveContainer width="100%" height="100%">
+            <LineChart data={kpisSerie} margin={{ top: 10, right: 20, left: 0, bottom: 0 }}>
+              <CartesianGrid strokeDasharray="3 3" />
+              <XAxis dataKey="fecha" />
+              <YAxis yAxisId="pct" domain={[0, 100]} unit="%" />
+              <YAxis yAxisId="monto" orientation="right" />
+              <Tooltip />
+              <Legend />
+              <Line yAxisId="pct" type="monotone" dataKey="ocupacionPct" name="Ocupación %" stroke="#2563eb" strokeWidth={2} dot={false} />
+              <Line yAxisId="monto" type="monotone" dataKey="adr" name="ADR" stroke="#f59e0b" strokeWidth={2} dot={false} />
+              <Line yAxisId="monto" type="monotone" dataKey="revpar" name="RevPAR" stroke="#10b981" strokeWidth={2} dot={false} />
+            </LineChart>
+          </ResponsiveContainer>
+        </div>
+      </div>
+
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
         <div className="bg-white rounded-lg shadow p-4 overflow-x-auto">
           <div className="flex items-center justify-between mb-3">
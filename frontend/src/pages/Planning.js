@@ -3,6 +3,58 @@ import { toast } from 'react-toastify';
 import { planningService } from '../services/api';
 import { FaCalendarAlt, FaBed } from 'react-icons/fa';
 
+// Día anterior a una fecha YYYY-MM-DD (en UTC para evitar saltos por zona horaria)
+const isoDayBefore = (iso) => {
+  const [year, month, day] = iso.split('-').map(Number);
+  return new Date(Date.UTC(year, month - 1, day - 1)).toISOString().slice(0, 10);
+};
+
+// Reconstruye las celdas `ocupaciones` a partir de la respuesta compacta (format=runs):
+// cada habitación trae tramos [offset_inicio, largo, reserva_id] y `reservas`
+// tiene los valores de `reservas_campos` por id.
+const decodePlanningRuns = (data) => {
+  const campos = data.reservas_campos;
+  const reservas = {};
+  Object.entries(data.reservas).forEach(([id, valores]) => {
+    const reserva = {};
+    campos.forEach((campo, i) => {
+      reserva[campo] = valores[i];
+    });
+    reserva.ultima_noche = isoDayBefore(reserva.fecha_egreso);
+    reservas[id] = reserva;
+  });
+
+  const libre = {
+    is_occupied: false,
+    is_last_night: false,
+    nombre: null,
+    reserva_id: null,
+    fecha_ingreso: null,
+    fecha_egreso: null,
+  };
+
+  const planning = data.planning.map((item) => {
+    const ocupaciones = data.days.map(() => libre);
+    item.runs.forEach(([inicio, largo, reservaId]) => {
+      const reserva = reservas[reservaId];
+      for (let i = inicio; i < inicio + largo; i += 1) {
+        const day = data.days[i];
+        ocupaciones[i] = {
+          is_occupied: true,
+          is_last_night: day === reserva.ultima_noche,
+          nombre: day === reserva.fecha_ingreso ? reserva.nombre : null,
+          reserva_id: reservaId,
+          fecha_ingreso: reserva.fecha_ingreso,
+          fecha_egreso: reserva.fecha_egreso,
+        };
+      }
+    });
+    return { habitacion: item.habitacion, ocupaciones };
+  });
+
+  return { planning, days: data.days, first_day: data.first_day };
+};
+
 const Planning = () => {
   // Función auxiliar para crear fechas de manera segura
   const createSafeDate = (dateString) => {
@@ -31,8 +83,8 @@ const Planning = () => {
   const loadPlanning = useCallback(async () => {
     try {
       setLoading(true);
-      const response = await planningService.getPlanning(startDate);
-      setPlanningData(response.data);
+      const response = await planningService.getPlanning(startDate, { format: 'runs' });
+      setPlanningData(decodePlanningRuns(response.data));
     } catch (error) {
       console.error('Error al cargar el planning:', error);
       toast.error('Error al cargar el planning');
@@ -10,6 +10,7 @@ const Reservas = () => {
   const formContainerRef = useRef(null);
   const [reservas, setReservas] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  const [resultadosBusqueda, setResultadosBusqueda] = useState(null);
   const [visibleCount, setVisibleCount] = useState(20);
   const [loading, setLoading] = useState(true);
   const [habitaciones, setHabitaciones] = useState([]);
@@ -77,6 +78,38 @@ const Reservas = () => {
     });
   }, [formData.cantidad_habitaciones]);
 
+  // Búsqueda en el servidor (con índices) en lugar de filtrar lo ya cargado
+  useEffect(() => {
+    const q = searchQuery.trim();
+    if (!q) {
+      setResultadosBusqueda(null);
+      return undefined;
+    }
+    let vigente = true;
+    const timer = setTimeout(() => {
+      reservasService
+        .getPagina({ q, page_size: 100 })
+        .then((resp) => {
+          if (vigente) {
+            setResultadosBusqueda(resp.data?.results || []);
+            setVisibleCount(20);
+          }
+        })
+        .catch((error) => {
+          if (vigente) {
+            setResultadosBusqueda([]);
+            console.error('Error al buscar reservas:', error);
+          }
+        });
+    }, 300);
+    return () => {
+      vigente = false;
+      clearTimeout(timer);
+    };
+  }, [searchQuery, reservas]);
+
+  const reservasListadas = resultadosBusqueda ?? reservas;
+
   // Importación movida a Configuración
 
   const loadReservas = async () => {
@@ -767,23 +800,7 @@ const Reservas = () => {
                 </tr>
               </thead>
               <tbody className="bg-white divide-y divide-gray-200">
-                {Array.isArray(reservas) && reservas
-                  .filter((r) => {
-                    if (!searchQuery) return true;
-                    const q = searchQuery.trim().toLowerCase();
-                    const idMatch = String(r.id || '').includes(q);
-                    const nombre = (r.nombre || '').toLowerCase();
-                    const apellido = (r.apellido || '').toLowerCase();
-                    const nombreCompleto = (r.nombre_completo || `${r.nombre || ''} ${r.apellido || ''}`).toLowerCase();
-                    const habNum = String(r.habitacion_numero || r.habitacion?.numero || '').toLowerCase();
-                    return (
-                      idMatch ||
-                      nombre.includes(q) ||
-                      apellido.includes(q) ||
-                      nombreCompleto.includes(q) ||
-                      habNum.includes(q)
-                    );
-                  })
+                {Array.isArray(reservasListadas) && reservasListadas
                   .slice(0, visibleCount)
                   .map((reserva) => (
                     <tr key={reserva.id} className="hover:bg-gray-50">
@@ -849,32 +866,16 @@ const Reservas = () => {
             </table>
           </div>
           {/* Cargar más */}
-          {Array.isArray(reservas) && (
-            (() => {
-              const filteredCount = reservas.filter((r) => {
-                if (!searchQuery) return true;
-                const q = searchQuery.trim().toLowerCase();
-                const idMatch = String(r.id || '').includes(q);
-                const nombre = (r.nombre || '').toLowerCase();
-                const apellido = (r.apellido || '').toLowerCase();
-                const nombreCompleto = (r.nombre_completo || `${r.nombre || ''} ${r.apellido || ''}`).toLowerCase();
-                const habNum = String(r.habitacion_numero || r.habitacion?.numero || '').toLowerCase();
-                return (
-                  idMatch || nombre.includes(q) || apellido.includes(q) || nombreCompleto.includes(q) || habNum.includes(q)
-                );
-              }).length;
-              return visibleCount < filteredCount ? (
-                <div className="px-6 py-4">
-                  <button
-                    type="button"
-                    onClick={() => setVisibleCount((v) => v + 20)}
-                    className="w-full px-4 py-2 bg-gray-100 hover:bg-gray-200 text-gray-800 rounded-md"
-                  >
-                    Cargar más
-                  </button>
-                </div>
-              ) : null;
-            })()
+          {Array.isArray(reservasListadas) && visibleCount < reservasListadas.length && (
+            <div className="px-6 py-4">
+              <button
+                type="button"
+                onClick={() => setVisibleCount((v) => v + 20)}
+                className="w-full px-4 py-2 bg-gray-100 hover:bg-gray-200 text-gray-800 rounded-md"
+              >
+                Cargar más
+              </button>
+            </div>
           )}
         </div>
       </div>
@@ -52,6 +52,55 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// GET condicional: se guarda la última respuesta con ETag de cada URL y se
+// reenvía su ETag en If-None-Match. Si el backend responde 304 (no hubo
+// cambios) se devuelve la copia guardada sin volver a descargarla.
+const MAX_RESPUESTAS_ETAG = 100;
+const respuestasEtag = new Map();
+
+const claveEtag = (config) => api.getUri(config);
+
+export const limpiarCacheEtag = () => respuestasEtag.clear();
+
+api.interceptors.request.use((config) => {
+  if ((config.method || 'get').toLowerCase() !== 'get' || config.responseType === 'blob') {
+    return config;
+  }
+  const guardada = respuestasEtag.get(claveEtag(config));
+  if (guardada) {
+    config.headers['If-None-Match'] = guardada.etag;
+    config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+  }
+  return config;
+});
+
+api.interceptors.response.use((response) => {
+  const { config } = response;
+  if ((config.method || 'get').toLowerCase() !== 'get') {
+    return response;
+  }
+  const clave = claveEtag(config);
+  if (response.status === 304) {
+    const guardada = respuestasEtag.get(clave);
+    if (guardada) {
+      // Renovar la posición para que sea la última en descartarse
+      respuestasEtag.delete(clave);
+      respuestasEtag.set(clave, guardada);
+      return { ...response, status: 200, data: guardada.data };
+    }
+    return response;
+  }
+  const etag = response.headers?.etag;
+  if (etag) {
+    respuestasEtag.delete(clave);
+    respuestasEtag.set(clave, { etag, data: response.data });
+    if (respuestasEtag.size > MAX_RESPUESTAS_ETAG) {
+      respuestasEtag.delete(respuestasEtag.keys().next().value);
+    }
+  }
+  return response;
+});
+
 // Interceptor para manejar errores
 api.interceptors.response.use(
   (response) => response,
@@ -65,6 +114,13 @@ api.interceptors.response.use(
 // Servicios de reservas
 export const reservasService = {
   getAll: () => api.get('/reservas/'),
+  // Paginación por cursor: params opcionales orden, page_size, contar, fecha_desde,
+  // fecha_hasta, habitacion, origen, encargado, celiacos, q (nombre/apellido, id o
+  // número de habitación) y telefono. La página siguiente se pide con getPagina(data.next)
+  getPagina: (paramsOUrl = {}) =>
+    typeof paramsOUrl === 'string'
+      ? api.get(paramsOUrl)
+      : api.get(`/reservas/?${new URLSearchParams({ paginacion: 'cursor', ...paramsOUrl }).toString()}`),
   getById: (id) => api.get(`/reservas/${id}/`),
   create: (data) => api.post('/reservas/', data),
   update: (id, data) => api.put(`/reservas/${id}/`, data),
@@ -72,15 +128,29 @@ export const reservasService = {
   getHoy: () => api.get('/reservas/hoy/'),
   getReservasPorFecha: (fecha) => api.get(`/reservas/por_fecha/?fecha=${fecha}`).then(response => response.data),
   getLimpieza: (fecha) => api.get(`/reservas/limpieza/?fecha=${fecha}`).then(response => response.data),
-  importar: (file) => {
+  getLimpiezaRango: (startDate, endDate) =>
+    api.get(`/reservas/limpieza/?start_date=${startDate}&end_date=${endDate}`).then(response => response.data),
+  importar: (file, { dryRun = false } = {}) => {
     const form = new FormData();
     form.append('file', file);
+    if (dryRun) {
+      form.append('dry_run', 'true');
+    }
     return api.post('/reservas/importar/', form, {
       headers: { 'Content-Type': 'multipart/form-data' },
     });
   },
+  getImportacion: (id) => api.get(`/importaciones/${id}/`),
   getVoucherUrl: (id) => `${getApiUrl()}/reservas/${id}/voucher/`,
   getVoucherMultiUrl: (ids) => `${getApiUrl()}/reservas/voucher-multi/?ids=${ids.join(',')}`,
+  // Exportación masiva (sólo supervisores): { ids } o { fecha_desde, fecha_hasta }, formato 'zip' | 'pdf'
+  getVouchersExportarUrl: ({ ids, fecha_desde, fecha_hasta, formato = 'zip' }) => {
+    const params = new URLSearchParams({ formato });
+    if (ids && ids.length) params.set('ids', ids.join(','));
+    if (fecha_desde) params.set('fecha_desde', fecha_desde);
+    if (fecha_hasta) params.set('fecha_hasta', fecha_hasta);
+    return `${getApiUrl()}/reservas/vouchers-exportar/?${params.toString()}`;
+  },
 };
 
 // Servicios de habitaciones
@@ -94,11 +164,17 @@ export const habitacionesService = {
     const query = new URLSearchParams(params).toString();
     return api.get(`/habitaciones/disponibles/${query ? `?${query}` : ''}`);
   },
+  // consultas: [{ fecha_ingreso, fecha_egreso, personas }, ...] resueltas en una sola llamada
+  getDisponiblesLote: (consultas) => api.post('/habitaciones/disponibles-lote/', { consultas }),
 };
 
 // Servicios de planning
 export const planningService = {
-  getPlanning: (startDate) => api.get(`/planning/planning/?start_date=${startDate}`),
+  // params opcionales: end_date, days, format ('runs' para la respuesta compacta)
+  getPlanning: (startDate, params = {}) => {
+    const query = new URLSearchParams({ start_date: startDate, ...params }).toString();
+    return api.get(`/planning/planning/?${query}`);
+  },
 };
 
 // Servicios de usuarios
@@ -122,8 +198,11 @@ export const estadisticasService = {
 
 // Servicios de Autenticación
 export const authService = {
-  login: (credentials) => api.post('/auth/', credentials),
-  logout: () => api.delete('/auth/'),
+  login: (credentials) => {
+    limpiarCacheEtag();
+    return api.post('/auth/', credentials);
+  },
+  logout: () => api.delete('/auth/').finally(limpiarCacheEtag),
   getUser: () => api.get('/auth/'),
 };
 